@@ -28,6 +28,6 @@ class AllianceMemberModel(Base):
     __tablename__ = "AllianceMember"
 
     id: Mapped[str] = mapped_column(primary_key=True)
-    user_id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(primary_key=True, index=True)
     role: Mapped[types.AllianceRoles]
     date_joined: Mapped[datetime]
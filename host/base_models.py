@@ -14,6 +14,22 @@ class NotificationModel(Base):
 
     notification_id: Mapped[str] = mapped_column(primary_key=True)
     user_id: Mapped[int]
-    date: Mapped[datetime]
+    date: Mapped[datetime] = mapped_column(index=True)
     message: Mapped[str]
     data: Mapped[Optional[Dict[str, Any]]]
+
+
+class LeaseModel(Base):
+    __tablename__ = "Leases"
+
+    name: Mapped[str] = mapped_column(primary_key=True)
+    holder: Mapped[str]
+    expires: Mapped[datetime]
+
+
+class SchemaVersionModel(Base):
+    __tablename__ = "SchemaVersion"
+
+    version: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str]
+    applied: Mapped[datetime]
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import ConnectionPoolEntry, Pool, PoolProxiedConnection, QueuePool
+
+T = TypeVar("T")
+
+
+def session_factory(engine: Engine) -> sessionmaker[Session]:
+    """Creates the sessions of the game. A session lives for one interaction, so committing does
+    not expire the models that it loaded, which would reload every attribute read after the
+    commit. Writes that depend on a value that another session could have changed in the meantime
+    refresh the model explicitly before reading it.
+
+    Args:
+        engine (Engine): the engine the sessions connect through
+
+    Returns (sessionmaker[Session]): the factory of the sessions
+    """
+    return sessionmaker(engine, expire_on_commit=False)
+
+
+async def run_async(engine: AsyncEngine, function: Callable[[Session], T]) -> T:
+    """Runs synchronous host layer work inside an AsyncSession, so that every query the function
+    issues is awaited on the event loop through the async driver instead of blocking it.
+
+    The session is committed once the function returns, and is created with
+    expire_on_commit=False so that the models returned by the function stay readable.
+
+    Args:
+        engine (AsyncEngine): the engine created with create_async_engine
+        function (Callable[[Session], T]): host layer work, which receives a synchronous Session
+
+    Returns (T): the result of the function
+    """
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        result = await session.run_sync(function)
+        await session.commit()
+        return result
+
+
+@dataclass
+class ExecutorStatistics:
+    workers: int
+    submitted: int = 0
+    completed: int = 0
+    queued: int = 0
+    running: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def mean_wait(self) -> float:
+        started = self.submitted - self.queued
+        return self.total_wait / started if started else 0.0
+
+
+class SessionExecutor:
+    """Bounded pool of worker threads that runs synchronous host layer work off the event loop.
+
+    Every call opens its own Session inside the worker thread and commits it there, so a session
+    never crosses threads. The statistics track how many calls are waiting for a worker and how
+    long they waited, which is what the pool should be sized against.
+    """
+
+    def __init__(self, engine: Engine, workers: int):
+        self._sessions = session_factory(engine)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="host")
+        self._lock = threading.Lock()
+        self.statistics = ExecutorStatistics(workers=workers)
+
+    def _run(self, submitted: float, function: Callable[[Session], T]) -> T:
+        waited = time.perf_counter() - submitted
+        with self._lock:
+            self.statistics.queued -= 1
+            self.statistics.running += 1
+            self.statistics.total_wait += waited
+            self.statistics.max_wait = max(self.statistics.max_wait, waited)
+        try:
+            with self._sessions() as session:
+                result = function(session)
+                session.commit()
+                return result
+        finally:
+            with self._lock:
+                self.statistics.running -= 1
+                self.statistics.completed += 1
+
+    async def run(self, function: Callable[[Session], T]) -> T:
+        """Runs the function in a worker thread with a fresh session, like asyncio.to_thread the
+        context variables of the caller are visible to the function
+
+        Args:
+            function (Callable[[Session], T]): host layer work, which receives the session
+
+        Returns (T): the result of the function
+        """
+        with self._lock:
+            self.statistics.submitted += 1
+            self.statistics.queued += 1
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, context.run, self._run, time.perf_counter(), function
+        )
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+class PoolSettings(BaseModel, frozen=True):
+    """Tuning of the connection pool, any setting that is left as None keeps the default of the
+    pool class that the dialect picks"""
+
+    size: Optional[int] = None
+    max_overflow: Optional[int] = None
+    timeout: Optional[float] = None
+    recycle: Optional[int] = None
+    pre_ping: bool = False
+
+    def engine_arguments(self) -> Dict[str, Any]:
+        arguments: Dict[str, Any] = {"pool_pre_ping": self.pre_ping}
+        if self.size is not None:
+            arguments["pool_size"] = self.size
+        if self.max_overflow is not None:
+            arguments["max_overflow"] = self.max_overflow
+        if self.timeout is not None:
+            arguments["pool_timeout"] = self.timeout
+        if self.recycle is not None:
+            arguments["pool_recycle"] = self.recycle
+        return arguments
+
+
+@dataclass
+class PoolStatistics:
+    capacity: Optional[int] = None
+    checkouts: int = 0
+    checked_out: int = 0
+    peak_checked_out: int = 0
+    total_checkout_latency: float = 0.0
+    max_checkout_latency: float = 0.0
+    total_hold: float = 0.0
+    max_hold: float = 0.0
+    long_holds: int = 0
+    held_across_await: int = 0
+
+    @property
+    def mean_checkout_latency(self) -> float:
+        return self.total_checkout_latency / self.checkouts if self.checkouts else 0.0
+
+    @property
+    def mean_hold(self) -> float:
+        returned = self.checkouts - self.checked_out
+        return self.total_hold / returned if returned else 0.0
+
+    @property
+    def saturation(self) -> Optional[float]:
+        """The share of the connections that the pool can hand out which are checked out"""
+        if not self.capacity:
+            return None
+        return self.checked_out / self.capacity
+
+
+class PoolMonitor:
+    """Listens to the events of a connection pool, and measures how long a checkout waits for a
+    connection, how saturated the pool is, and how long connections are held before checkin.
+
+    A connection checked out on the event loop is held across an await point when the loop gets
+    to run anything else before it is checked in, which is detected by a callback scheduled on the
+    loop at checkout. Such a connection is unavailable to every other interaction while the holder
+    is suspended, so each one is logged with the task that held it.
+    """
+
+    def __init__(self, long_hold: float = 1.0):
+        self.long_hold = long_hold
+        self.statistics = PoolStatistics()
+        self._lock = threading.Lock()
+
+    def pool_class(self, url: URL) -> Type[Pool]:
+        """Subclasses the pool class that the dialect would pick, so that the wait for a connection
+        is timed, the subclass survives the pool being recreated on dispose"""
+        base: Type[Pool] = url.get_dialect().get_pool_class(url)
+        monitor = self
+
+        class InstrumentedPool(base):  # type: ignore[valid-type, misc]
+            def connect(self) -> PoolProxiedConnection:
+                started = time.perf_counter()
+                connection = super().connect()
+                monitor._record_checkout_latency(time.perf_counter() - started)
+                return connection
+
+        InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+        return InstrumentedPool
+
+    def attach(self, engine: Engine) -> None:
+        if isinstance(engine.pool, QueuePool):
+            self.statistics.capacity = engine.pool.size() + engine.pool._max_overflow
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+
+    def _record_checkout_latency(self, latency: float) -> None:
+        with self._lock:
+            self.statistics.total_checkout_latency += latency
+            self.statistics.max_checkout_latency = max(
+                self.statistics.max_checkout_latency, latency
+            )
+
+    def _on_checkout(self, _: Any, record: ConnectionPoolEntry, __: PoolProxiedConnection) -> None:
+        with self._lock:
+            self.statistics.checkouts += 1
+            self.statistics.checked_out += 1
+            self.statistics.peak_checked_out = max(
+                self.statistics.peak_checked_out, self.statistics.checked_out
+            )
+        record.info["checked_out_at"] = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = asyncio.current_task(loop)
+        record.info["await_guard"] = loop.call_soon(
+            self._on_held_across_await, record, task.get_name() if task else None
+        )
+
+    def _on_held_across_await(self, record: ConnectionPoolEntry, task: Optional[str]) -> None:
+        record.info["held_across_await"] = task
+        with self._lock:
+            self.statistics.held_across_await += 1
+
+    def _on_checkin(self, _: Any, record: ConnectionPoolEntry) -> None:
+        checked_out_at = record.info.pop("checked_out_at", None)
+        if checked_out_at is None:
+            return
+        held = time.perf_counter() - checked_out_at
+        guard: Optional[asyncio.Handle] = record.info.pop("await_guard", None)
+        if guard is not None:
+            guard.cancel()
+        with self._lock:
+            self.statistics.checked_out -= 1
+            self.statistics.total_hold += held
+            self.statistics.max_hold = max(self.statistics.max_hold, held)
+            if held >= self.long_hold:
+                self.statistics.long_holds += 1
+        if "held_across_await" in record.info:
+            logging.warning(
+                "[DATABASE][POOL][HELD_ACROSS_AWAIT] Task=%s, Held=%.3fs",
+                record.info.pop("held_across_await"),
+                held,
+            )
+        elif held >= self.long_hold:
+            logging.warning("[DATABASE][POOL][LONG_HOLD] Held=%.3fs", held)
+
+
+def create_database_engine(
+    url: str, settings: PoolSettings, monitor: Optional[PoolMonitor] = None
+) -> Engine:
+    """Creates the engine with the pool tuned by the settings, and instrumented by the monitor
+
+    Args:
+        url (str): the url of the database
+        settings (PoolSettings): the tuning of the connection pool
+        monitor (Optional[PoolMonitor]): the monitor that listens to the pool
+
+    Returns (Engine): the engine
+    """
+    arguments = settings.engine_arguments()
+    if monitor is not None:
+        arguments["poolclass"] = monitor.pool_class(make_url(url))
+    engine = create_engine(url, echo=False, **arguments)
+    if monitor is not None:
+        monitor.attach(engine)
+    return engine
@@ -1,4 +1,5 @@
 import json
+from typing import Dict
 
 from pydantic import BaseModel
 
@@ -36,12 +37,21 @@ class TradeGameplaySettings(BaseModel):
     maximum_number_of_offers_received: int
 
 
+class StrengthGameplaySettings(BaseModel):
+    infrastructure: float
+    land: float
+    technology: float
+    improvement_price: float
+    boosts: Dict[str, float] = {}
+
+
 class GameplaySettingsModel(BaseModel):
     bank: BankGameplaySettings
     foreign: ForeignGameplaySettings
     interior: InteriorGameplaySettings
     trade: TradeGameplaySettings
     metadata: MetadataGameplaySettings
+    strength: StrengthGameplaySettings
 
 
 with open("settings/gameplay_settings.json", "r") as gameplay_settings_file:
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional
+
+from sqlalchemy import Engine, event
+
+UNATTRIBUTED = "unattributed"
+
+active_command: ContextVar[str] = ContextVar("active_command", default=UNATTRIBUTED)
+
+
+@contextmanager
+def command_scope(name: str) -> Iterator[None]:
+    """Attributes every statement that runs inside the block to the command, the context is copied
+    into the executor threads, so work offloaded by the command is attributed to it as well"""
+    token = active_command.set(name)
+    try:
+        yield
+    finally:
+        active_command.reset(token)
+
+
+@dataclass
+class CommandStatistics:
+    statements: int = 0
+    total_time: float = 0.0
+    slowest_time: float = 0.0
+    slowest_statement: Optional[str] = None
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.statements if self.statements else 0.0
+
+
+class QueryInstrumentation:
+    """Listens to the statements of an engine, and records how many ran, how long they took, and
+    which was the slowest for each command. A statement slower than the threshold is logged.
+    """
+
+    def __init__(self, slow_query: float = 0.25):
+        self.slow_query = slow_query
+        self.commands: Dict[str, CommandStatistics] = {}
+        self._lock = threading.Lock()
+
+    def attach(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def detach(self, engine: Engine) -> None:
+        event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn: Any, _cursor: Any, *_: Any) -> None:
+        # a connection runs one statement at a time, the start of a statement that raised is
+        # overwritten by the next one instead of being left behind
+        conn.info["query_started"] = time.perf_counter()
+
+    def _after_cursor_execute(self, conn: Any, _cursor: Any, statement: str, *_: Any) -> None:
+        elapsed = time.perf_counter() - conn.info.pop("query_started")
+        command = active_command.get()
+        with self._lock:
+            statistics = self.commands.setdefault(command, CommandStatistics())
+            statistics.statements += 1
+            statistics.total_time += elapsed
+            if elapsed > statistics.slowest_time:
+                statistics.slowest_time = elapsed
+                statistics.slowest_statement = statement
+        if elapsed >= self.slow_query:
+            logging.warning(
+                "[DATABASE][SLOW_QUERY] Command=%s, Duration=%.3fs, Statement=%s",
+                command,
+                elapsed,
+                statement,
+            )
+
+    def report(self) -> None:
+        """Logs the statistics of every command, the most expensive first"""
+        with self._lock:
+            commands = sorted(
+                self.commands.items(), key=lambda item: item[1].total_time, reverse=True
+            )
+        for command, statistics in commands:
+            logging.info(
+                "[DATABASE][COMMAND] Command=%s, Statements=%s, Total=%.3fs, Slowest=%.3fs",
+                command,
+                statistics.statements,
+                statistics.total_time,
+                statistics.slowest_time,
+            )
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import copy
+import json
+import logging
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict, Optional
+
+from pydantic import BaseModel
+
+from host.instrumentation import active_command
+
+
+class Lazy:
+    """Argument of a log record that is only evaluated if the record is formatted, so a record
+    below the level of the logger, or dropped by sampling, costs nothing. It is evaluated on the
+    thread that logs, also in queue mode, so it sees the values of the moment it was logged. The
+    function should still only read what is already loaded, such as the columns of a model, and
+    never a property that queries or flushes the session.
+
+    Example:
+        logger.debug("[BANK][ADD] Treasury=%s", Lazy(lambda: self._model.treasury))
+    """
+
+    __slots__ = ("_function",)
+
+    def __init__(self, function: Callable[[], Any]):
+        self._function = function
+
+    def __str__(self) -> str:
+        return str(self._function())
+
+    def __repr__(self) -> str:
+        return repr(self._function())
+
+
+class LoggingSettings(BaseModel, frozen=True):
+    """Where the logs of the process go and how they are written. In queue mode the records are
+    handed to a listener thread which does the I/O, so logging never blocks the event loop. The
+    structured mode writes JSON lines. The sampling maps a logger to the share of its records
+    below WARNING that are kept."""
+
+    file: Optional[str] = None
+    level: str = "INFO"
+    queue: bool = False
+    structured: bool = False
+    sampling: Dict[str, float] = {}
+
+
+class CommandFilter(logging.Filter):
+    """Stamps every record with the command it was logged under, while still in the thread and
+    context of the caller"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.command = active_command.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps the configured share of the records below WARNING of each logger, the most specific
+    logger in the rates applies. Every record at WARNING or above is kept."""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self._rates = rates
+        self._credit: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _rate(self, name: str) -> Optional[str]:
+        while name:
+            if name in self._rates:
+                return name
+            name = name.rpartition(".")[0]
+        return None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        sampled = self._rate(record.name)
+        if sampled is None:
+            return True
+        with self._lock:
+            credit = self._credit.get(sampled, 0.0) + self._rates[sampled]
+            keep = credit >= 1.0
+            self._credit[sampled] = credit - 1.0 if keep else credit
+        return keep
+
+
+class RecordQueueHandler(QueueHandler):
+    """Formats the message on the logging thread, so every Lazy argument reads the model as it was
+    when the record was logged rather than when the listener gets to it. Unlike QueueHandler the
+    exception is kept, so that the formatter of the listener writes its traceback."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Writes each record as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "command": getattr(record, "command", None),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(
+    settings: LoggingSettings, logger: Optional[logging.Logger] = None
+) -> Optional[QueueListener]:
+    """Replaces the handlers of the logger, the root logger by default, with the configured one
+
+    Args:
+        settings (LoggingSettings): the configuration of the logs
+        logger (Optional[logging.Logger]): the logger to configure
+
+    Returns (Optional[QueueListener]): the listener writing the records in queue mode, which must
+        be stopped at exit so that the records still in the queue are written
+    """
+    if settings.file:
+        assert settings.file.endswith(".log"), "LOG FILE MUST END WITH .log"
+        handler: logging.Handler = logging.FileHandler(settings.file)
+    else:
+        handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(
+        JsonFormatter() if settings.structured else logging.Formatter(logging.BASIC_FORMAT)
+    )
+
+    listener: Optional[QueueListener] = None
+    front = handler
+    if settings.queue:
+        records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+        front = RecordQueueHandler(records)
+        listener = QueueListener(records, handler, respect_handler_level=True)
+        listener.start()
+
+    if settings.sampling:
+        front.addFilter(SamplingFilter(settings.sampling))
+    front.addFilter(CommandFilter())
+
+    logger = logger if logger is not None else logging.getLogger()
+    for existing in logger.handlers[:]:
+        logger.removeHandler(existing)
+        existing.close()
+    logger.addHandler(front)
+    logger.setLevel(logging.getLevelNamesMapping()[settings.level])
+    return listener
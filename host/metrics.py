@@ -0,0 +1,382 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from host.database import PoolMonitor, SessionExecutor
+from host.instrumentation import QueryInstrumentation
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[str, ...]
+M = TypeVar("M", bound="Metric")
+T = TypeVar("T")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], *extra: str) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Metric:
+    kind: str
+
+    def __init__(self, name: str, description: str, labels: Labels = ()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+
+    def lines(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: Labels = ()):
+        super().__init__(name, description, labels)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, labels: Labels = ()) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def lines(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labels, labels)} {_format_value(value)}"
+            for labels, value in values
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(Metric):
+    """Counts the observations that fall into each bucket, from which the quantiles of the
+    latency are estimated by the scraper"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: Labels = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: Dict[Labels, List[int]] = {}
+        self._sums: Dict[Labels, float] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.setdefault(labels, [0] * (len(self.buckets) + 1))
+            counts[index] += 1
+            self._sums[labels] = self._sums.get(labels, 0.0) + value
+
+    def count(self, labels: Labels = ()) -> int:
+        with self._lock:
+            return sum(self._counts.get(labels, ()))
+
+    def lines(self) -> List[str]:
+        with self._lock:
+            series = [
+                (labels, list(counts), self._sums[labels])
+                for labels, counts in self._counts.items()
+            ]
+        lines: List[str] = []
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                bucket = _format_labels(self.labels, labels, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{bucket} {cumulative}")
+            suffix = _format_labels(self.labels, labels)
+            lines.append(f"{self.name}_sum{suffix} {_format_value(total)}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+@dataclass(frozen=True)
+class Sample:
+    name: str
+    kind: str
+    description: str
+    value: float
+    labels: Dict[str, str] = field(default_factory=dict)
+
+
+Collector = Callable[[], Iterable[Sample]]
+
+
+class MetricsRegistry:
+    """Holds the metrics of the process, and renders them in the Prometheus text format. The
+    collectors are called on every render, and read the statistics kept by the database layer"""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Collector] = []
+
+    def register(self, metric: M) -> M:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, description: str, labels: Labels = ()) -> Counter:
+        return self.register(Counter(name, description, labels))
+
+    def gauge(self, name: str, description: str, labels: Labels = ()) -> Gauge:
+        return self.register(Gauge(name, description, labels))
+
+    def histogram(self, name: str, description: str, labels: Labels = ()) -> Histogram:
+        return self.register(Histogram(name, description, labels))
+
+    def collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.header())
+            lines.extend(metric.lines())
+        described = set()
+        for collector in self._collectors:
+            for sample in collector():
+                if sample.name not in described:
+                    described.add(sample.name)
+                    lines.append(f"# HELP {sample.name} {sample.description}")
+                    lines.append(f"# TYPE {sample.name} {sample.kind}")
+                labels = _format_labels(tuple(sample.labels), tuple(sample.labels.values()))
+                lines.append(f"{sample.name}{labels} {_format_value(sample.value)}")
+        return "\n".join(lines) + "\n"
+
+
+class HandlerMetrics:
+    """Latency, errors and the number in flight of the handlers of the interactions, labelled by
+    the kind of the handler (command, autocomplete, callback or event) and its name"""
+
+    def __init__(self, registry: MetricsRegistry):
+        labels = ("kind", "handler")
+        self.latency = registry.histogram(
+            "lon_handler_duration_seconds", "Time taken to handle an interaction", labels
+        )
+        self.errors = registry.counter(
+            "lon_handler_errors_total", "Interactions whose handler failed", labels
+        )
+        self.in_flight = registry.gauge(
+            "lon_handlers_in_flight", "Interactions that are being handled", labels
+        )
+
+    @contextmanager
+    def track(self, kind: str, handler: str) -> Iterator[None]:
+        labels = (kind, handler)
+        self.in_flight.inc(labels)
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.errors.inc(labels)
+            raise
+        finally:
+            self.latency.observe(labels, time.perf_counter() - started)
+            self.in_flight.dec(labels)
+
+    def timed(
+        self, kind: str, handler: str, callback: Callable[..., Awaitable[T]]
+    ) -> Callable[..., Awaitable[T]]:
+        async def wrapper(*args, **kwargs) -> T:
+            with self.track(kind, handler):
+                return await callback(*args, **kwargs)
+
+        return wrapper
+
+
+REGISTRY = MetricsRegistry()
+HANDLER_METRICS = HandlerMetrics(REGISTRY)
+
+
+def collect_pool(monitor: PoolMonitor) -> Collector:
+    def collect() -> List[Sample]:
+        statistics = monitor.statistics
+        samples = [
+            Sample(
+                "lon_pool_checkouts_total",
+                "counter",
+                "Connections checked out",
+                statistics.checkouts,
+            ),
+            Sample(
+                "lon_pool_checked_out",
+                "gauge",
+                "Connections checked out now",
+                statistics.checked_out,
+            ),
+            Sample(
+                "lon_pool_checkout_latency_seconds_max",
+                "gauge",
+                "Longest wait for a connection",
+                statistics.max_checkout_latency,
+            ),
+            Sample(
+                "lon_pool_long_holds_total",
+                "counter",
+                "Connections held too long",
+                statistics.long_holds,
+            ),
+            Sample(
+                "lon_pool_held_across_await_total",
+                "counter",
+                "Connections held while awaiting",
+                statistics.held_across_await,
+            ),
+        ]
+        if statistics.saturation is not None:
+            samples.append(
+                Sample(
+                    "lon_pool_saturation",
+                    "gauge",
+                    "Share of the pool checked out",
+                    statistics.saturation,
+                )
+            )
+        return samples
+
+    return collect
+
+
+def collect_executor(executor: SessionExecutor) -> Collector:
+    def collect() -> List[Sample]:
+        statistics = executor.statistics
+        return [
+            Sample(
+                "lon_executor_workers",
+                "gauge",
+                "Threads that run database work",
+                statistics.workers,
+            ),
+            Sample("lon_executor_queued", "gauge", "Work waiting for a thread", statistics.queued),
+            Sample("lon_executor_running", "gauge", "Work running in a thread", statistics.running),
+            Sample(
+                "lon_executor_completed_total", "counter", "Work completed", statistics.completed
+            ),
+            Sample(
+                "lon_executor_wait_seconds_max",
+                "gauge",
+                "Longest wait for a thread",
+                statistics.max_wait,
+            ),
+        ]
+
+    return collect
+
+
+def collect_queries(instrumentation: QueryInstrumentation) -> Collector:
+    def collect() -> List[Sample]:
+        with instrumentation._lock:
+            commands = [
+                (command, statistics.statements, statistics.total_time)
+                for command, statistics in instrumentation.commands.items()
+            ]
+        return [
+            Sample(
+                "lon_statements_total",
+                "counter",
+                "Statements run by each command",
+                statements,
+                {"command": command},
+            )
+            for command, statements, _ in commands
+        ] + [
+            Sample(
+                "lon_statement_seconds_total",
+                "counter",
+                "Time spent in the statements of each command",
+                total_time,
+                {"command": command},
+            )
+            for command, _, total_time in commands
+        ]
+
+    return collect
+
+
+async def serve(registry: MetricsRegistry, host: str, port: int) -> asyncio.Server:
+    """Serves the metrics of the registry at /metrics over plain HTTP, the endpoint is meant to be
+    scraped locally so it should be bound to the loopback interface
+
+    Args:
+        registry (MetricsRegistry): the metrics that are served
+        host (str): the address to bind
+        port (int): the port to bind, 0 picks a free port
+
+    Returns (asyncio.Server): the server, which is closed by the caller
+    """
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = (await reader.readline()).decode("latin-1").split()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            if len(request) >= 2 and request[0] == "GET" and request[1].split("?")[0] == "/metrics":
+                status, body = "200 OK", registry.render().encode()
+            else:
+                status, body = "404 Not Found", b"Not Found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {CONTENT_TYPE}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    logging.info("*[METRICS][SERVING] Address=%s:%s", host, port)
+    return server
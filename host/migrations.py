@@ -0,0 +1,347 @@
+from __future__ import annotations
+
+import json
+import logging
+import random
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Sequence, Set, Tuple, Type
+
+from sqlalchemy import Connection, DateTime, Engine, bindparam, func, insert, inspect, select, text
+from sqlalchemy.orm import Session
+
+import host.alliance.models as alliance_models
+from host.base_models import Base, NotificationModel, SchemaVersionModel
+from host.defaults import defaults
+from host.gameplay_settings import GameplaySettings
+from host.nation import models
+from host.nation.types import resources
+from host.nation.types.government import Governments
+from host.nation.types.improvements import Improvements, boosts_of, dense, ordinal
+
+logger = logging.getLogger(__name__)
+
+Upgrade = Callable[[Connection], None]
+
+
+class MigrationError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    upgrade: Upgrade
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, name: str) -> Callable[[Upgrade], Upgrade]:
+    """Registers an upgrade of the schema, the versions must be registered in increasing order.
+    The upgrade runs once per database, inside the transaction that records its version, and
+    must also succeed on a database whose tables were just created from the models."""
+
+    def decorator(upgrade: Upgrade) -> Upgrade:
+        assert not MIGRATIONS or MIGRATIONS[-1].version < version, "MIGRATIONS MUST BE IN ORDER"
+        MIGRATIONS.append(Migration(version, name, upgrade))
+        return upgrade
+
+    return decorator
+
+
+def index_names(connection: Connection, table: str) -> Set[str]:
+    """The names of the indexes of the table, SQLite does not reflect indexes on expressions so
+    they are read from its schema table instead"""
+    if connection.dialect.name == "sqlite":
+        return set(
+            connection.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"),
+                {"table": table},
+            ).scalars()
+        )
+    return {str(index["name"]) for index in inspect(connection).get_indexes(table)}
+
+
+def create_indexes(connection: Connection, *tables: Type[Base]) -> None:
+    """Creates the indexes declared on the models that the database does not have yet"""
+    for model in tables:
+        table = model.__table__
+        existing = index_names(connection, table.name)
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(connection)
+
+
+@migration(1, "index hot lookup columns")
+def _index_hot_lookup_columns(connection: Connection) -> None:
+    create_indexes(
+        connection,
+        models.TradeModel,
+        models.TradeRequestModel,
+        models.AidModel,
+        models.AidRequestModel,
+        NotificationModel,
+        alliance_models.AllianceMemberModel,
+    )
+
+
+@migration(2, "unique nations and nation names")
+def _unique_nations(connection: Connection) -> None:
+    for column in (models.MetadataModel.user_id, func.lower(models.MetadataModel.nation)):
+        duplicates = (
+            connection.execute(select(column).group_by(column).having(func.count() > 1))
+            .scalars()
+            .all()
+        )
+        if duplicates:
+            raise MigrationError(
+                f"DUPLICATE NATIONS {duplicates} MUST BE RESOLVED BEFORE MIGRATING"
+            )
+    create_indexes(connection, models.MetadataModel)
+
+
+def _unprovisioned(
+    connection: Connection, nations: Sequence[Tuple[int, str]], *tables: str
+) -> List[Tuple[int, str]]:
+    """The user ids and names of the nations that none of the tables has a row for"""
+    provisioned: Set[int] = set()
+    for name in tables:
+        if inspect(connection).has_table(name):
+            provisioned.update(connection.execute(text(f"SELECT user_id FROM {name}")).scalars())
+    return [(user_id, nation) for user_id, nation in nations if user_id not in provisioned]
+
+
+@migration(3, "provision the ministries of existing nations")
+def _provision_ministries(connection: Connection) -> None:
+    # the rows are written as the tables were at this version, the resources are one row each
+    # until the next migration packs them
+    nations = [
+        (user_id, nation)
+        for user_id, nation in connection.execute(text("SELECT user_id, nation FROM Metadata"))
+    ]
+    now = datetime.now()
+    banks = [
+        {
+            "user_id": user_id,
+            "name": defaults.bank.name.format(nation),
+            "treasury": GameplaySettings.bank.starter_funds,
+            "tax_rate": defaults.bank.tax_rate,
+            "last_accessed": now,
+        }
+        for user_id, nation in _unprovisioned(connection, nations, "Bank")
+    ]
+    interiors = [
+        {
+            "user_id": user_id,
+            "infrastructure": GameplaySettings.interior.starter_infrastructure,
+            "land": GameplaySettings.interior.starter_land,
+            "technology": GameplaySettings.interior.starter_technology,
+            "spent_technology": 0,
+        }
+        for user_id, _ in _unprovisioned(connection, nations, "Interior")
+    ]
+    governments = [
+        {"user_id": user_id, "type": "monarchy"}
+        for user_id, _ in _unprovisioned(connection, nations, "Government")
+    ]
+    held = [
+        {"user_id": user_id, "resource": resource}
+        for user_id, _ in _unprovisioned(connection, nations, "Resources", "NationResources")
+        for resource in random.sample(
+            resources.RESOURCE_NAMES, k=GameplaySettings.trade.resources_per_nation
+        )
+    ]
+    for statement, rows in (
+        (
+            text(
+                "INSERT INTO Bank (user_id, name, treasury, tax_rate, last_accessed) "
+                "VALUES (:user_id, :name, :treasury, :tax_rate, :last_accessed)"
+            ).bindparams(bindparam("last_accessed", type_=DateTime)),
+            banks,
+        ),
+        (
+            text(
+                "INSERT INTO Interior "
+                "(user_id, infrastructure, land, technology, spent_technology) "
+                "VALUES (:user_id, :infrastructure, :land, :technology, :spent_technology)"
+            ),
+            interiors,
+        ),
+        (text("INSERT INTO Government (user_id, type) VALUES (:user_id, :type)"), governments),
+    ):
+        if rows:
+            connection.execute(statement, rows)
+    if held:
+        connection.execute(
+            text(
+                "CREATE TABLE IF NOT EXISTS Resources "
+                "(user_id INTEGER NOT NULL, resource VARCHAR NOT NULL, "
+                "PRIMARY KEY (user_id, resource))"
+            )
+        )
+        connection.execute(
+            text("INSERT INTO Resources (user_id, resource) VALUES (:user_id, :resource)"), held
+        )
+
+
+@migration(4, "pack the resources of each nation into a bitmask")
+def _pack_resources(connection: Connection) -> None:
+    if not inspect(connection).has_table("Resources"):
+        return
+    rows = connection.execute(text("SELECT user_id, resource FROM Resources")).all()
+    held: Dict[int, List[str]] = {}
+    for user_id, resource in rows:
+        if resource in resources.RESOURCE_NAMES:
+            held.setdefault(user_id, []).append(resource)
+        else:
+            logger.warning(
+                "[MIGRATION][RESOURCES][UNKNOWN] UserId=%s, Resource=%s", user_id, resource
+            )
+    with Session(connection) as session:
+        for user_id, names in held.items():
+            session.merge(models.ResourcesModel(user_id=user_id, resources=resources.pack(names)))
+        session.flush()
+    connection.execute(text("DROP TABLE Resources"))
+
+
+@migration(5, "count the improvements of each nation in one vector")
+def _count_improvements(connection: Connection) -> None:
+    vectors: Dict[int, List[int]] = {}
+    if inspect(connection).has_table("Improvements"):
+        for user_id, name, amount in connection.execute(
+            text("SELECT user_id, name, amount FROM Improvements")
+        ):
+            if name in Improvements:
+                vectors.setdefault(user_id, dense([]))[ordinal(name)] += amount
+            else:
+                logger.warning(
+                    "[MIGRATION][IMPROVEMENTS][UNKNOWN] UserId=%s, Name=%s", user_id, name
+                )
+        connection.execute(text("DROP TABLE Improvements"))
+    with Session(connection) as session:
+        provisioned = set(session.scalars(select(models.ImprovementModel.user_id)))
+        for (user_id,) in connection.execute(select(models.MetadataModel.user_id)):
+            if user_id not in provisioned:
+                session.add(
+                    models.ImprovementModel(
+                        user_id=user_id, amounts=vectors.get(user_id, dense([]))
+                    )
+                )
+        session.flush()
+
+
+def _score_strength(connection: Connection) -> None:
+    """Scores the strength of every nation that has statistics from the rows of its interior,
+    government and improvements, with the weights of the strength settings"""
+    weights = GameplaySettings.strength
+    prices = [improvement.raw_price for improvement in Improvements.values()]
+    nations = connection.execute(
+        text(
+            "SELECT NationStats.user_id, Interior.infrastructure, Interior.land, "
+            "Interior.technology, Government.type, NationImprovements.amounts "
+            "FROM NationStats "
+            "JOIN Interior ON Interior.user_id = NationStats.user_id "
+            "JOIN Government ON Government.user_id = NationStats.user_id "
+            "LEFT JOIN NationImprovements ON NationImprovements.user_id = NationStats.user_id"
+        )
+    ).all()
+    scores = []
+    for user_id, infrastructure, land, technology, government, amounts in nations:
+        amounts = dense(json.loads(amounts) if amounts else [])
+        boosts = Governments[government].boosts + boosts_of(amounts)
+        base = (
+            infrastructure * weights.infrastructure
+            + land * weights.land
+            + technology * weights.technology
+            + sum(amount * price for amount, price in zip(amounts, prices))
+            * weights.improvement_price
+        )
+        multiplier = 1 + sum(
+            getattr(boosts, boost) * weight for boost, weight in weights.boosts.items()
+        )
+        scores.append({"identifier": user_id, "strength": round(base * multiplier, 2)})
+    if scores:
+        connection.execute(
+            text("UPDATE NationStats SET strength = :strength WHERE user_id = :identifier"), scores
+        )
+
+
+@migration(6, "materialize the statistics of every nation")
+def _materialize_statistics(connection: Connection) -> None:
+    # seeded as a nation is when it is founded, with no revenue until it is happy, the rebuild
+    # of the statistics measures the revenue
+    columns = ["user_id", "revenue", "population", "treasury", "technology", "land"]
+    values = [
+        "Interior.user_id",
+        "0",
+        "Interior.infrastructure * :per_infrastructure",
+        "Bank.treasury",
+        "Interior.technology",
+        "Interior.land",
+    ]
+    scored = "strength" in {
+        column["name"] for column in inspect(connection).get_columns("NationStats")
+    }
+    if scored:  # the table was created from the models, with the column of the next version
+        columns.append("strength")
+        values.append("0")
+    connection.execute(
+        text(
+            f"INSERT INTO NationStats ({', '.join(columns)}) SELECT {', '.join(values)} "
+            "FROM Interior JOIN Bank ON Bank.user_id = Interior.user_id "
+            "WHERE Interior.user_id NOT IN (SELECT user_id FROM NationStats)"
+        ),
+        {"per_infrastructure": GameplaySettings.interior.population_per_infrastructure},
+    )
+    if scored:
+        _score_strength(connection)
+
+
+@migration(7, "score the strength of every nation")
+def _add_strength(connection: Connection) -> None:
+    columns = {column["name"] for column in inspect(connection).get_columns("NationStats")}
+    if "strength" not in columns:
+        connection.execute(
+            text("ALTER TABLE NationStats ADD COLUMN strength FLOAT NOT NULL DEFAULT 0")
+        )
+    create_indexes(connection, models.NationStatsModel)
+    _score_strength(connection)
+
+
+@migration(8, "weigh the boosts in the strength of every nation")
+def _weigh_strength_boosts(connection: Connection) -> None:
+    _score_strength(connection)
+
+
+def schema_version(connection: Connection) -> int:
+    return connection.execute(select(func.max(SchemaVersionModel.version))).scalar() or 0
+
+
+def migrate(engine: Engine) -> List[int]:
+    """Creates the missing tables, then applies every migration newer than the version of the
+    database, each in its own transaction
+
+    Args:
+        engine (Engine): the engine of the database to upgrade
+
+    Returns (List[int]): the versions that were applied
+    """
+    Base.metadata.create_all(engine)
+    applied = []
+    with engine.connect() as connection:
+        current = schema_version(connection)
+    for pending in MIGRATIONS:
+        if pending.version <= current:
+            continue
+        with engine.begin() as connection:
+            pending.upgrade(connection)
+            connection.execute(
+                insert(SchemaVersionModel).values(
+                    version=pending.version, name=pending.name, applied=datetime.now()
+                )
+            )
+        logger.info("[MIGRATION][APPLIED] Version=%s, Name=%s", pending.version, pending.name)
+        applied.append(pending.version)
+    return applied
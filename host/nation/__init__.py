@@ -9,16 +9,19 @@ from host import base_types
 from host.currency import as_currency, as_daily_currency_rate
 from host.defaults import defaults
 from host.gameplay_settings import GameplaySettings
-from host.nation import models, types
+from host.nation import models, names, search, types
 from host.nation.bank import Bank
 from host.nation.foreign import Foreign
 from host.nation.government import Government
 from host.nation.improvements import PublicWorks
 from host.nation.interior import Interior
 from host.nation.meta import Meta
+from host.nation.statistics import Statistics
 from host.nation.ministry import Ministry
 from host.nation.trade import Trade
 from host.nation.types.basic import Population
+from host.pagination import Page
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 
@@ -47,16 +50,21 @@ class Nation:
 
     @staticmethod
     def search_for_nations(
-        name: str, session: Session, with_like: bool = False
+        name: str, session: Session, with_like: bool = False, limit: int = search.SEARCH_LIMIT
     ) -> List[models.MetadataModel]:
         if with_like:
-            return (
-                session.query(models.MetadataModel)
-                .filter(models.MetadataModel.nation.like(f"%{name}%"))
-                .all()
-            )
+            return search.search_nations(name, session, limit)
         return session.query(models.MetadataModel).filter(models.MetadataModel.nation == name).all()
 
+    @staticmethod
+    def search_page(
+        name: str,
+        session: Session,
+        after: Optional[search.SearchKey] = None,
+        limit: int = search.SEARCH_LIMIT,
+    ) -> Page[models.MetadataModel, search.SearchKey]:
+        return search.search_nations_page(name, session, after, limit)
+
     @classmethod
     def fetch_from_name(cls, name: str, session: Session) -> Optional[Nation]:
         nation = cls.search_for_nations(name, session)
@@ -100,6 +108,10 @@ class Nation:
     def foreign(self) -> Foreign:
         return Foreign(self, self._session)
 
+    @cached_property
+    def statistics(self) -> Statistics:
+        return Statistics(self, self._session)
+
     @cached_property
     def ministries(self) -> List[Ministry]:
         return [
@@ -118,11 +130,6 @@ class Nation:
         if len(name) > GameplaySettings.metadata.maximum_nation_name_length:
             return StartResponses.NAME_TOO_LONG
 
-        if user_exists(identifier, session):
-            return StartResponses.ALREADY_EXISTS
-
-        if Nation.fetch_from_name(name, session) is not None:
-            return StartResponses.NAME_TAKEN
         metadata = models.MetadataModel(
             user_id=identifier,
             nation=name,
@@ -130,9 +137,29 @@ class Nation:
             flag=defaults.meta.flag,
             created=datetime.now(UTC),
         )
-
-        session.add(metadata)
-        session.commit()
+        bank = Bank.provision(identifier, name)
+        interior = Interior.provision(identifier)
+        government = Government.provision(identifier)
+        try:
+            with session.begin_nested():
+                session.add_all(
+                    [
+                        metadata,
+                        bank,
+                        interior,
+                        government,
+                        Trade.provision(identifier),
+                        PublicWorks.provision(identifier),
+                        Statistics.provision(bank, interior, government),
+                    ]
+                )
+        except IntegrityError:
+            # the unique indexes decide, so two players can not claim the same name concurrently,
+            # and the savepoint is rolled back so the session can look up which one was violated
+            if user_exists(identifier, session):
+                return StartResponses.ALREADY_EXISTS
+            return StartResponses.NAME_TAKEN
+        names.NATION_NAMES.add_on_commit(session, name)
 
         return StartResponses.SUCCESS
 
@@ -149,7 +176,7 @@ class Nation:
 
     @property
     def strength(self) -> float:
-        return 0.0
+        return self.statistics["strength"]
 
     @property
     def population(self) -> Population:
@@ -6,6 +6,7 @@ from enum import IntEnum, auto
 from functools import cached_property
 from typing import TYPE_CHECKING, Optional, Protocol
 
+from host.base_types import UserId
 from host.currency import (
     Currency,
     CurrencyRate,
@@ -18,6 +19,7 @@ from host.currency import (
 )
 from host.defaults import defaults
 from host.gameplay_settings import GameplaySettings
+from host.logs import Lazy
 from host.nation.ministry import Ministry
 from host.nation.models import BankModel
 from sqlalchemy.orm import Session
@@ -25,6 +27,8 @@ from sqlalchemy.orm import Session
 if TYPE_CHECKING:
     from host.nation import Nation
 
+logger = logging.getLogger(__name__)
+
 
 class SendingResponses(IntEnum):
     SUCCESS = auto()
@@ -68,31 +72,34 @@ class Bank(Ministry, FundReceiver, FundSender):
 
     @cached_property
     def _model(self) -> BankModel:
-        bank: Optional[BankModel] = (
-            self._session.query(BankModel).filter_by(user_id=self._identifier).first()
-        )
+        bank: Optional[BankModel] = self._session.get(BankModel, self._identifier)
         if bank is None:
-            self._session.add(
-                BankModel(
-                    user_id=self._identifier,
-                    name=defaults.bank.name.format(self._player.name),
-                    treasury=GameplaySettings.bank.starter_funds,
-                    tax_rate=defaults.bank.tax_rate,
-                    last_accessed=datetime.now(),
-                )
-            )
-            self._session.commit()
-            bank = self._session.query(BankModel).filter_by(user_id=self._identifier).first()
-        assert bank is not None
+            raise ValueError(f"Bank does not exist for {self._identifier}")
         return bank
 
+    @staticmethod
+    def provision(identifier: UserId, nation_name: str) -> BankModel:
+        """The bank that a nation starts with"""
+        return BankModel(
+            user_id=identifier,
+            name=defaults.bank.name.format(nation_name),
+            treasury=GameplaySettings.bank.starter_funds,
+            tax_rate=defaults.bank.tax_rate,
+            last_accessed=datetime.now(),
+        )
+
+    def refresh(self) -> None:
+        """Reloads the treasury, the write paths call this before reading the funds so that a
+        transfer made by another session in the meantime is not overwritten"""
+        self._session.refresh(self._model)
+
     @property
     def name(self) -> str:
         return self._model.name
 
     def set_name(self, value: str) -> NameResponses:
         self._model.name = value
-        self._session.commit()
+        self._session.flush()
         return NameResponses.SUCCESS
 
     @property
@@ -101,6 +108,11 @@ class Bank(Ministry, FundReceiver, FundSender):
         self._update_treasury()
         return self._model.treasury
 
+    @property
+    def treasury(self) -> int:
+        """The funds when the bank was last accessed, without the profit made since"""
+        return self._model.treasury
+
     @property
     def national_revenue(self) -> CurrencyRate:
         income_modifier = 1 + self._player.boost.income_modifier
@@ -136,7 +148,7 @@ class Bank(Ministry, FundReceiver, FundSender):
         if value > GameplaySettings.bank.maximum_tax_rate or value < 0:
             return TaxResponses.INVALID_RATE
         self._model.tax_rate = value
-        self._session.commit()
+        self._session.flush()
         return TaxResponses.SUCCESS
 
     @property
@@ -148,9 +160,14 @@ class Bank(Ministry, FundReceiver, FundSender):
         delta = current_time - self._model.last_accessed
         if delta <= timedelta():
             return
-        self._model.treasury += int(self._retrieve_profit(delta))
         self._model.last_accessed = current_time
-        self._session.commit()
+        self._set_treasury(self._model.treasury + int(self._retrieve_profit(delta)))
+
+    def _set_treasury(self, treasury: int) -> None:
+        self._model.treasury = treasury
+        self._player.statistics.refresh("treasury")
+        self._session.add(self._model)
+        self._session.flush()
 
     def _retrieve_profit(self, delta: timedelta) -> Currency:
         return self.national_profit.amount_in_delta(delta)
@@ -158,11 +175,15 @@ class Bank(Ministry, FundReceiver, FundSender):
     def _add(self, amount: Currency) -> None:
         if amount < Currency(0):
             raise ValueError("Cannot add negative funds")
-        logging.debug(f"Adding {amount} to {self._player.name}'s treasury, Previous: {self.funds}")
+        self.refresh()
+        logger.debug(
+            "[BANK][ADD] UserId=%s, Amount=%s, Treasury=%s",
+            self._player.identifier,
+            amount,
+            Lazy(lambda: self._model.treasury),
+        )
         new_funds: Currency = self.funds + amount
-        self._model.treasury = int(new_funds)
-        self._session.add(self._model)
-        self._session.commit()
+        self._set_treasury(int(new_funds))
 
     def can_purchase(self, amount: Price) -> bool:
         return self.funds.can_afford(amount)
@@ -171,12 +192,11 @@ class Bank(Ministry, FundReceiver, FundSender):
         return self.funds >= amount
 
     def deduct(self, price: Price, force: bool = True) -> None:
+        self.refresh()
         if not self.can_purchase(price) and not force:
             raise ValueError("Insufficient funds")
         new_funds: Currency = self.funds - price
-        self._model.treasury = int(new_funds)
-        self._session.add(self._model)
-        self._session.commit()
+        self._set_treasury(int(new_funds))
 
     def send(self, amount: Price, target: FundReceiver) -> SendingResponses:
         if not self.can_purchase(amount):
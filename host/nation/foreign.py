@@ -11,7 +11,8 @@ from host.alliance import Alliance
 from host.currency import Currency, Price
 from host.nation import models
 from host.nation.ministry import Ministry
-from sqlalchemy.orm import Session
+from host.pagination import PAGE_SIZE, Page
+from sqlalchemy.orm import InstrumentedAttribute, Session
 
 if TYPE_CHECKING:
     from host.nation import Nation
@@ -138,7 +139,7 @@ class Foreign(Ministry):
         self._session.query(models.AidModel).filter(
             models.AidModel.accepted + SLOT_EXPIRY_TIME >= datetime.now()
         ).delete()
-        self._session.commit()
+        self._session.flush()
 
     @property
     def sponsored_agreements(self) -> List[AidAgreement]:
@@ -182,6 +183,49 @@ class Foreign(Ministry):
             }
         )
 
+    def _requests_page(
+        self, party: InstrumentedAttribute[int], after_id: Optional[str], limit: int
+    ) -> Page[AidRequest, str]:
+        requests = self._session.query(models.AidRequestModel).filter(
+            party == self._player.identifier
+        )
+        for expired in requests.filter(models.AidRequestModel.expires < datetime.now()).all():
+            self._cancel_request(AidRequest(expired))
+        if after_id is not None:
+            requests = requests.filter(models.AidRequestModel.aid_id > after_id)
+        rows = requests.order_by(models.AidRequestModel.aid_id).limit(limit + 1).all()
+        page = Page.from_rows(rows, limit, lambda request: request.aid_id)
+        return Page([AidRequest(request) for request in page.items], page.after)
+
+    def received_requests_page(
+        self, after_id: Optional[str] = None, limit: int = PAGE_SIZE
+    ) -> Page[AidRequest, str]:
+        """A page of the aid requests sent to the nation, ordered by their identifier. The
+        expired requests are cancelled, refunding their sponsors.
+
+        Args:
+            after_id (Optional[str]): the identifier of the last request of the previous page,
+                None for the first page
+            limit (int): the most requests on the page
+
+        Returns (Page[AidRequest, str]): the requests
+        """
+        return self._requests_page(models.AidRequestModel.recipient, after_id, limit)
+
+    def sponsorships_page(
+        self, after_id: Optional[str] = None, limit: int = PAGE_SIZE
+    ) -> Page[AidRequest, str]:
+        """A page of the aid requests sponsored by the nation, see received_requests_page
+
+        Args:
+            after_id (Optional[str]): the identifier of the last request of the previous page,
+                None for the first page
+            limit (int): the most requests on the page
+
+        Returns (Page[AidRequest, str]): the requests
+        """
+        return self._requests_page(models.AidRequestModel.sponsor, after_id, limit)
+
     def _send(self, recipient: base_types.UserId, amount: Price, reason: str) -> None:
         request = models.AidRequestModel(
             aid_id=str(uuid.uuid4()),
@@ -194,7 +238,7 @@ class Foreign(Ministry):
         )
         self._player.bank.deduct(amount)
         self._session.add(request)
-        self._session.commit()
+        self._session.flush()
 
     def _remove_expired_requests(self, requests: Set[AidRequest]) -> List[AidRequest]:
         removed_requests = set()
@@ -255,7 +299,7 @@ class Foreign(Ministry):
             return
         self._player.find_player(request.sponsor).bank.receive(request.amount)
         self._session.delete(model_request)
-        self._session.commit()
+        self._session.flush()
 
     def cancel(self, request: AidRequest) -> AidCancelCode:
         if request.sponsor != self._player.identifier:
@@ -5,6 +5,7 @@ from typing import TYPE_CHECKING
 
 from sqlalchemy.orm import Session
 
+from host.base_types import UserId
 from host.nation.ministry import Ministry
 from host.nation.models import GovernmentModel
 from host.nation.types.government import Governments, GovernmentSchema, GovernmentTypes
@@ -24,21 +25,21 @@ class Government(Ministry):
 
     def set(self, government: GovernmentTypes) -> None:
         self.model.type = government
-        self._session.commit()
+        self._player.statistics.refresh("revenue", "strength")
+        self._session.flush()
 
     @cached_property
     def model(self) -> GovernmentModel:
-        government = (
-            self._session.query(GovernmentModel).filter_by(user_id=self._player.identifier).first()
-        )
-
+        government = self._session.get(GovernmentModel, self._player.identifier)
         if government is None:
-            government = GovernmentModel(user_id=self._player.identifier, type="monarchy")
-            self._session.add(government)
-            self._session.commit()
-
+            raise ValueError(f"Government does not exist for {self._player.identifier}")
         return government
 
+    @staticmethod
+    def provision(identifier: UserId) -> GovernmentModel:
+        """The government that a nation starts with"""
+        return GovernmentModel(user_id=identifier, type="monarchy")
+
     @property
     def type(self) -> GovernmentSchema:
         return Governments[self.model.type]
@@ -46,7 +47,8 @@ class Government(Ministry):
     @type.setter
     def type(self, government_type: GovernmentTypes) -> None:
         self.model.type = government_type
-        self._session.commit()
+        self._player.statistics.refresh("revenue", "strength")
+        self._session.flush()
 
     def boost(self) -> BoostsLookup:
         return self.type.boosts
@@ -1,12 +1,21 @@
 from __future__ import annotations
 
 import dataclasses
-from typing import TYPE_CHECKING, Dict, List, Optional
+from functools import cached_property
+from typing import TYPE_CHECKING, Dict, List
 
+from host.base_types import UserId
 from host.nation.ministry import Ministry
 from host.nation.models import ImprovementModel
 from host.nation.types.boosts import BoostsLookup
-from host.nation.types.improvements import Improvements, ImprovementSchema
+from host.nation.types.improvements import (
+    IMPROVEMENT_NAMES,
+    Improvements,
+    ImprovementSchema,
+    boosts_of,
+    dense,
+    ordinal,
+)
 from host.nation.types.transactions import PurchaseResult, SellResult
 from sqlalchemy.orm import Session
 
@@ -25,75 +34,68 @@ class ImprovementCollection:
 
 
 class PublicWorks(Ministry):
+    """The improvements of a nation are stored as one count vector, indexed by the ordinal of each
+    improvement, so reading them is one primary key fetch and their boosts are a dot product"""
+
     def __init__(self, nation: Nation, session: Session):
         self._nation = nation
         self._session = session
 
+    @cached_property
+    def _model(self) -> ImprovementModel:
+        model = self._session.get(ImprovementModel, self._nation.identifier)
+        if model is None:
+            raise ValueError(f"Improvements do not exist for {self._nation.identifier}")
+        return model
+
+    @staticmethod
+    def provision(identifier: UserId) -> ImprovementModel:
+        """The improvements that a nation starts with, none"""
+        return ImprovementModel(user_id=identifier, amounts=dense([]))
+
     @property
-    def models(self) -> List[ImprovementModel]:
-        return (
-            self._session.query(ImprovementModel).filter_by(user_id=self._nation.identifier).all()
-        )
-
-    def _get_model(self, improvement: str) -> Optional[ImprovementModel]:
-        return (
-            self._session.query(ImprovementModel)
-            .filter_by(user_id=self._nation.identifier, name=improvement)
-            .first()
-        )
+    def amounts(self) -> List[int]:
+        return dense(self._model.amounts)
+
+    def _set_amounts(self, amounts: List[int]) -> None:
+        # the column is only written when a new list is assigned to it
+        self._model.amounts = amounts
+        self._nation.statistics.refresh("revenue", "strength")
+        self._session.flush()
 
     def buy(self, improvement: ImprovementSchema, amount: int) -> PurchaseResult:
-        model = self._get_model(improvement.name)
         price = improvement.price * amount
         if not self._nation.bank.can_purchase(price):
             return PurchaseResult.INSUFFICIENT_FUNDS
 
         self._nation.bank.deduct(price)
 
-        if model is None:
-            model = ImprovementModel(
-                user_id=self._nation.identifier, name=improvement.name, amount=amount
-            )
-            self._session.add(model)
-        else:
-            model.amount += amount
-        self._session.commit()
+        amounts = self.amounts
+        amounts[ordinal(improvement.name)] += amount
+        self._set_amounts(amounts)
         return PurchaseResult.SUCCESS
 
     def sell(self, improvement: ImprovementSchema, amount: int) -> SellResult:
-        model = self._get_model(improvement.name)
-        if model is None or model.amount < amount:
+        amounts = self.amounts
+        if amounts[ordinal(improvement.name)] < amount:
             return SellResult.INSUFFICIENT_AMOUNT
 
         cashback = improvement.cashback * amount
-        self._nation.bank.add(cashback)
-        if model.amount == amount:
-            self._session.delete(model)
-        else:
-            model.amount -= amount
-        self._session.commit()
+        self._nation.bank.receive(cashback)
+        amounts[ordinal(improvement.name)] -= amount
+        self._set_amounts(amounts)
         return SellResult.SUCCESS
 
     @property
     def owned(self) -> Dict[str, ImprovementCollection]:
         return {
-            improvement.name: ImprovementCollection(
-                Improvements[improvement.name], improvement.amount
-            )
-            for improvement in self.models
+            name: ImprovementCollection(Improvements[name], amount)
+            for name, amount in zip(IMPROVEMENT_NAMES, self.amounts)
+            if amount
         }
 
     def __getitem__(self, item: str) -> ImprovementCollection:
         return self.owned[item]
 
     def boost(self) -> BoostsLookup:
-        return sum(
-            (
-                ImprovementCollection(
-                    Improvements[improvement.name],
-                    improvement.amount,
-                ).boosts
-                for improvement in self.models
-            ),
-            BoostsLookup(),
-        )
+        return boosts_of(self.amounts)
@@ -4,6 +4,7 @@ import logging
 from functools import cached_property
 from typing import TYPE_CHECKING, Literal, Protocol, Type, TypeVar, cast
 
+from host.base_types import UserId
 from host.currency import Currency, Price, PriceRate, as_currency, as_daily_currency_rate
 from host.gameplay_settings import GameplaySettings
 from host.nation import models
@@ -119,7 +120,8 @@ def unit_exchange(cls: Type[Data[K]]) -> Type[UnitExchangeProtocol[K]]:
         def _set_amount(self, value: K) -> None:
             logging.debug("Setting %s to %s", self.unit.__name__, value)
             self.unit.set(self._interior, value)
-            self._session.commit()
+            self._nation.statistics.refresh()
+            self._session.flush()
             logging.debug("Set %s to %s", self.unit.__name__, value)
 
         @property
@@ -172,23 +174,22 @@ class Interior(Ministry):
 
     @property
     def _interior(self) -> models.InteriorModel:
-        interior = (
-            self._session.query(models.InteriorModel)
-            .filter_by(user_id=self._player.identifier)
-            .first()
-        )
+        interior = self._session.get(models.InteriorModel, self._player.identifier)
         if interior is None:
-            interior = models.InteriorModel(
-                user_id=self._player.identifier,
-                land=GameplaySettings.interior.starter_land,
-                infrastructure=GameplaySettings.interior.starter_infrastructure,
-                technology=GameplaySettings.interior.starter_technology,
-                spent_technology=0,
-            )
-            self._session.add(interior)
-            self._session.commit()
+            raise ValueError(f"Interior does not exist for {self._player.identifier}")
         return interior
 
+    @staticmethod
+    def provision(identifier: UserId) -> models.InteriorModel:
+        """The interior that a nation starts with"""
+        return models.InteriorModel(
+            user_id=identifier,
+            land=GameplaySettings.interior.starter_land,
+            infrastructure=GameplaySettings.interior.starter_infrastructure,
+            technology=GameplaySettings.interior.starter_technology,
+            spent_technology=0,
+        )
+
     @property
     def population(self) -> Population:
         return Population(
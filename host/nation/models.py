@@ -1,14 +1,16 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import List
 
 from host.base_models import Base
-from sqlalchemy import String
+from sqlalchemy import JSON, BigInteger, Index, String, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 
 class TradeRequestModel(Base):
     __tablename__ = "TradeRequests"
+    __table_args__ = (Index("ix_TradeRequests_recipient", "recipient", "sponsor"),)
 
     date: Mapped[datetime]
     sponsor: Mapped[int] = mapped_column(primary_key=True)
@@ -20,7 +22,7 @@ class TradeModel(Base):
 
     date: Mapped[datetime]
     sponsor: Mapped[int] = mapped_column(primary_key=True)
-    recipient: Mapped[int] = mapped_column(primary_key=True)
+    recipient: Mapped[int] = mapped_column(primary_key=True, index=True)
 
 
 class AidRequestModel(Base):
@@ -28,9 +30,9 @@ class AidRequestModel(Base):
 
     aid_id: Mapped[str] = mapped_column(primary_key=True)
     date: Mapped[datetime]
-    expires: Mapped[datetime]
-    sponsor: Mapped[int]
-    recipient: Mapped[int]
+    expires: Mapped[datetime] = mapped_column(index=True)
+    sponsor: Mapped[int] = mapped_column(index=True)
+    recipient: Mapped[int] = mapped_column(index=True)
     amount: Mapped[int]
     reason: Mapped[str] = mapped_column(String(250))
 
@@ -40,18 +42,18 @@ class AidModel(Base):
 
     aid_id: Mapped[str] = mapped_column(primary_key=True)
     date: Mapped[datetime]
-    accepted: Mapped[datetime]
-    sponsor: Mapped[int]
-    recipient: Mapped[int]
+    accepted: Mapped[datetime] = mapped_column(index=True)
+    sponsor: Mapped[int] = mapped_column(index=True)
+    recipient: Mapped[int] = mapped_column(index=True)
     amount: Mapped[int]
     reason: Mapped[str] = mapped_column(String(250))
 
 
 class ResourcesModel(Base):
-    __tablename__ = "Resources"
+    __tablename__ = "NationResources"
 
     user_id: Mapped[int] = mapped_column(primary_key=True)
-    resource: Mapped[str] = mapped_column(primary_key=True)
+    resources: Mapped[int] = mapped_column(BigInteger)
 
 
 class MetadataModel(Base):
@@ -64,6 +66,10 @@ class MetadataModel(Base):
     created: Mapped[datetime]
 
 
+Index("ux_Metadata_user_id", MetadataModel.user_id, unique=True)
+Index("ux_Metadata_nation", func.lower(MetadataModel.nation), unique=True)
+
+
 class BankModel(Base):
     __tablename__ = "Bank"
 
@@ -92,8 +98,23 @@ class GovernmentModel(Base):
 
 
 class ImprovementModel(Base):
-    __tablename__ = "Improvements"
+    __tablename__ = "NationImprovements"
 
     user_id: Mapped[int] = mapped_column(primary_key=True)
-    name: Mapped[str]
-    amount: Mapped[int]
+    amounts: Mapped[List[int]] = mapped_column(JSON)
+
+
+class NationStatsModel(Base):
+    __tablename__ = "NationStats"
+    __table_args__ = tuple(
+        Index(f"ix_NationStats_{metric}", metric, "user_id")
+        for metric in ("revenue", "population", "treasury", "technology", "land", "strength")
+    )
+
+    user_id: Mapped[int] = mapped_column(primary_key=True)
+    revenue: Mapped[int]
+    population: Mapped[int]
+    treasury: Mapped[int]
+    technology: Mapped[int]
+    land: Mapped[float]
+    strength: Mapped[float]
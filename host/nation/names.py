@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import bisect
+import heapq
+import threading
+from collections import Counter
+from datetime import timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from host.nation import models
+
+COMPLETIONS = 25
+SUGGESTIONS = 5
+GRAM = 3
+PRECOMPUTED = 2
+RELOAD_INTERVAL = timedelta(minutes=5)
+
+Ranked = Tuple[int, str, str]
+Entry = Tuple[str, Ranked]
+
+
+def _rank(name: str) -> Ranked:
+    return len(name), name.lower(), name
+
+
+def _keys(name: str) -> Iterator[str]:
+    """The name and every suffix of it that starts a word, so that typing any word of the name
+    completes it"""
+    lowered = name.lower()
+    yield lowered
+    for index, character in enumerate(lowered[:-1]):
+        if character == " " and lowered[index + 1] != " ":
+            yield lowered[index + 1 :]
+
+
+def _grams(name: str) -> Set[str]:
+    padded = "\0" * (GRAM - 1) + name.lower() + "\0" * (GRAM - 1)
+    return {padded[index : index + GRAM] for index in range(len(padded) - GRAM + 1)}
+
+
+def levenshtein(source: str, target: str, bound: int) -> Optional[int]:
+    """The edit distance between the strings, computed one row at a time so that it gives up as
+    soon as every alignment costs more than the bound
+
+    Args:
+        source (str): the first string
+        target (str): the second string
+        bound (int): the largest distance of interest
+
+    Returns (Optional[int]): the distance, or None when it is more than the bound
+    """
+    if abs(len(source) - len(target)) > bound:
+        return None
+    previous = list(range(len(target) + 1))
+    for row, source_character in enumerate(source, 1):
+        current = [row]
+        for column, target_character in enumerate(target, 1):
+            current.append(
+                min(
+                    previous[column] + 1,
+                    current[column - 1] + 1,
+                    previous[column - 1] + (source_character != target_character),
+                )
+            )
+        if min(current) > bound:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= bound else None
+
+
+class NationNames:
+    """Sorted array of the word starts of the names of the nations, which completes a prefix of any
+    word of a name with a binary search to the first key with the prefix. The best completions of
+    the prefixes shorter than PRECOMPUTED are kept, since those match most of the array, so that
+    the first keystrokes do not scan it. The index lives in the memory of the process, it is
+    reloaded every RELOAD_INTERVAL, and updated as the nations founded in this process commit.
+
+    The names are also indexed by their trigrams to suggest the names closest to a misspelt one,
+    a name within k edits of another shares all but at most 3k of its trigrams, so only the names
+    sharing enough trigrams have their edit distance computed.
+    """
+
+    def __init__(self, completions: int = COMPLETIONS):
+        self._completions = completions
+        self._entries: List[Entry] = []
+        self._top: Dict[str, List[Ranked]] = {}
+        self._grams: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def _matching(self, prefix: str) -> Iterator[Ranked]:
+        entries = self._entries
+        for index in range(bisect.bisect_left(entries, (prefix,)), len(entries)):
+            key, ranked = entries[index]
+            if not key.startswith(prefix):
+                return
+            yield ranked
+
+    def _best(self, prefix: str) -> List[Ranked]:
+        return heapq.nsmallest(self._completions, set(self._matching(prefix)))
+
+    def _precomputed(self, key: str) -> Iterator[str]:
+        return (key[:length] for length in range(min(len(key), PRECOMPUTED - 1) + 1))
+
+    def add(self, name: str) -> None:
+        ranked = _rank(name)
+        with self._lock:
+            for key in _keys(name):
+                index = bisect.bisect_left(self._entries, (key, ranked))
+                if index < len(self._entries) and self._entries[index] == (key, ranked):
+                    continue
+                self._entries.insert(index, (key, ranked))
+                for prefix in self._precomputed(key):
+                    top = self._top.setdefault(prefix, [])
+                    if ranked not in top:
+                        bisect.insort(top, ranked)
+                        del top[self._completions :]
+            for gram in _grams(name):
+                self._grams.setdefault(gram, set()).add(name)
+
+    def remove(self, name: str) -> None:
+        ranked = _rank(name)
+        with self._lock:
+            for key in _keys(name):
+                index = bisect.bisect_left(self._entries, (key, ranked))
+                if index == len(self._entries) or self._entries[index] != (key, ranked):
+                    continue
+                del self._entries[index]
+                for prefix in self._precomputed(key):
+                    if ranked in self._top.get(prefix, ()):
+                        self._top[prefix] = self._best(prefix)
+            for gram in _grams(name):
+                self._grams.get(gram, set()).discard(name)
+
+    def add_on_commit(self, session: Session, name: str) -> None:
+        """Adds the name once the transaction of the session commits, so that a nation whose
+        founding is rolled back is never completed
+
+        Args:
+            session (Session): the session that founded the nation
+            name (str): the name of the nation
+        """
+        session.info.setdefault(_PENDING, []).append((self, name))
+
+    def complete(self, prefix: str, limit: int = COMPLETIONS) -> List[str]:
+        """The names with a word that starts with the prefix, ignoring case
+
+        Args:
+            prefix (str): what the user has typed so far
+            limit (int): the most names to return, at most the completions kept per prefix
+
+        Returns (List[str]): the names, shortest first
+        """
+        lowered = prefix.lower()
+        with self._lock:
+            if len(lowered) < PRECOMPUTED:
+                best = self._top.get(lowered, [])
+            else:
+                best = self._best(lowered)
+        return [name for _, _, name in best[:limit]]
+
+    def suggest(
+        self, name: str, limit: int = SUGGESTIONS, distance: Optional[int] = None
+    ) -> List[str]:
+        """The names closest to the name, ignoring case
+
+        Args:
+            name (str): the name that was not found
+            limit (int): the most names to return
+            distance (Optional[int]): the most edits from the name, by default one per three
+                characters, between one and three
+
+        Returns (List[str]): the names, the fewest edits away first
+        """
+        lowered = name.lower()
+        bound = distance if distance is not None else max(1, min(3, len(lowered) // 3))
+        grams = _grams(lowered)
+        shared: Counter[str] = Counter()
+        with self._lock:
+            for gram in grams:
+                shared.update(self._grams.get(gram, ()))
+        threshold = len(grams) - GRAM * bound
+        ranked = []
+        for candidate, count in shared.items():
+            if count < threshold:
+                continue
+            edits = levenshtein(lowered, candidate.lower(), bound)
+            if edits is not None:
+                ranked.append(
+                    (edits, abs(len(candidate) - len(name)), candidate.lower(), candidate)
+                )
+        return [candidate for *_, candidate in heapq.nsmallest(limit, ranked)]
+
+    def rebuild(self, names: Iterable[str]) -> int:
+        """Replaces the index with one of the names, which is built before the lock is taken
+
+        Returns (int): the number of names
+        """
+        index = NationNames(self._completions)
+        ranked = {name: _rank(name) for name in names}
+        index._entries = sorted((key, rank) for name, rank in ranked.items() for key in _keys(name))
+        for key, rank in index._entries:
+            for prefix in index._precomputed(key):
+                index._top.setdefault(prefix, []).append(rank)
+        for prefix, top in index._top.items():
+            index._top[prefix] = heapq.nsmallest(self._completions, set(top))
+        for name in ranked:
+            for gram in _grams(name):
+                index._grams.setdefault(gram, set()).add(name)
+        with self._lock:
+            self._entries = index._entries
+            self._top = index._top
+            self._grams = index._grams
+        return len(ranked)
+
+    def load(self, session: Session) -> int:
+        """Rebuilds the index from every nation in the database
+
+        Returns (int): the number of nations loaded
+        """
+        return self.rebuild(fetch(session))
+
+
+def fetch(session: Session) -> List[str]:
+    """The names of every nation in the database"""
+    return list(session.scalars(select(models.MetadataModel.nation)))
+
+
+_PENDING = "nation_names"
+
+
+@event.listens_for(Session, "after_commit")
+def _add_committed(session: Session) -> None:
+    if session.in_nested_transaction():
+        return
+    for index, name in session.info.pop(_PENDING, ()):
+        index.add(name)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    if not session.in_nested_transaction():
+        session.info.pop(_PENDING, None)
+
+
+NATION_NAMES = NationNames()
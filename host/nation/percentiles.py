@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import bisect
+import threading
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import TYPE_CHECKING, Callable, Dict, List, Literal, Tuple, get_args
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from host.nation import models
+
+if TYPE_CHECKING:
+    from host.nation import Nation
+
+REBUILD_INTERVAL = timedelta(minutes=10)
+
+RankedMetric = Literal["revenue", "infrastructure", "land", "technology"]
+RANKED_METRICS: Tuple[RankedMetric, ...] = get_args(RankedMetric)
+
+_VALUES: Dict[RankedMetric, Callable[[Nation], float]] = {
+    "revenue": lambda nation: nation.statistics["revenue"],
+    "infrastructure": lambda nation: nation.interior.infrastructure.amount,
+    "land": lambda nation: nation.interior.land.amount,
+    "technology": lambda nation: nation.interior.technology.amount,
+}
+
+
+@dataclass(frozen=True)
+class Placement:
+    """Where a value places among the nations, nations with the same value share their rank
+
+    Attributes:
+        rank (int): one more than the number of nations with a higher value
+        percentile (float): the percentage of nations with a lower value
+    """
+
+    rank: int
+    percentile: float
+
+
+class Percentiles:
+    """Sorted arrays of the ranked metrics of every nation, so that the rank and percentile of a
+    value are a binary search instead of counting the nations above it. The index lives in the
+    memory of the process and is rebuilt every REBUILD_INTERVAL, so it lags behind the nations
+    that changed since, which only moves them among their neighbours.
+    """
+
+    def __init__(self) -> None:
+        self._values: Dict[RankedMetric, List[float]] = {metric: [] for metric in RANKED_METRICS}
+        self._lock = threading.Lock()
+
+    def load(self, session: Session) -> int:
+        """Rebuilds the index from every nation in the database
+
+        Returns (int): the number of nations loaded
+        """
+        rows = session.execute(
+            select(
+                models.NationStatsModel.revenue,
+                models.InteriorModel.infrastructure,
+                models.InteriorModel.land,
+                models.InteriorModel.technology,
+            ).join(
+                models.InteriorModel,
+                models.InteriorModel.user_id == models.NationStatsModel.user_id,
+            )
+        ).all()
+        values = {
+            metric: sorted(column)
+            for metric, column in zip(RANKED_METRICS, zip(*rows) if rows else [()] * 4)
+        }
+        with self._lock:
+            self._values = values
+        return len(rows)
+
+    def place(self, metric: RankedMetric, value: float) -> Placement:
+        """The placement of the value among the nations
+
+        Args:
+            metric (RankedMetric): the metric of the value
+            value (float): the value to place
+
+        Returns (Placement): its rank and percentile
+        """
+        with self._lock:
+            values = self._values[metric]
+        if not values:
+            return Placement(1, 100.0)
+        below = bisect.bisect_left(values, value)
+        above = len(values) - bisect.bisect_right(values, value)
+        return Placement(above + 1, 100 * below / len(values))
+
+    def of(self, nation: Nation) -> Dict[RankedMetric, Placement]:
+        return {metric: self.place(metric, value(nation)) for metric, value in _VALUES.items()}
+
+
+PERCENTILES = Percentiles()
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import ColumnElement, Connection, Engine, Integer, case, event, func, text, tuple_
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from host.nation import models
+from host.pagination import Page
+
+SEARCH_TABLE = "NationSearch"
+SEARCH_LIMIT = 25
+TRIGRAM_LENGTH = 3
+
+_TRIGGERS = (
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}Insert AFTER INSERT ON Metadata BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, nation) VALUES (new.user_id, new.nation);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}Delete AFTER DELETE ON Metadata BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = old.user_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}Update AFTER UPDATE OF nation ON Metadata BEGIN
+        UPDATE {SEARCH_TABLE} SET nation = new.nation WHERE rowid = old.user_id;
+    END""",
+)
+
+_indexed: WeakKeyDictionary[Engine, bool] = WeakKeyDictionary()
+
+
+def create_search_index(connection: Connection) -> bool:
+    """Creates the trigram index of the nation names, which SQLite keeps in sync with the Metadata
+    table through triggers, so every process that inserts a nation updates it. The index is
+    filled from the existing nations when it is created. Other databases, or an SQLite without
+    FTS5, fall back to LIKE.
+
+    Args:
+        connection (Connection): the connection to the database holding the Metadata table
+
+    Returns (bool): whether the index exists
+    """
+    if connection.dialect.name != "sqlite":
+        _indexed[connection.engine] = False
+        return False
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": SEARCH_TABLE}
+    ).first()
+    if exists is None:
+        try:
+            connection.execute(
+                text(f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(nation, tokenize='trigram')")
+            )
+        except OperationalError as e:
+            logging.warning("[SEARCH][INDEX][UNAVAILABLE] Error=%s", e)
+            _indexed[connection.engine] = False
+            return False
+        connection.execute(
+            text(f"INSERT INTO {SEARCH_TABLE}(rowid, nation) SELECT user_id, nation FROM Metadata")
+        )
+    for trigger in _TRIGGERS:
+        connection.execute(text(trigger))
+    _indexed[connection.engine] = True
+    return True
+
+
+@event.listens_for(models.MetadataModel.__table__, "after_create")
+def _create_search_index(_: Any, connection: Connection, **__: Any) -> None:
+    create_search_index(connection)
+
+
+@event.listens_for(models.MetadataModel.__table__, "after_drop")
+def _drop_search_index(_: Any, connection: Connection, **__: Any) -> None:
+    if connection.dialect.name == "sqlite":
+        connection.execute(text(f"DROP TABLE IF EXISTS {SEARCH_TABLE}"))
+    _indexed.pop(connection.engine, None)
+
+
+def has_search_index(session: Session) -> bool:
+    engine = session.get_bind().engine
+    if engine not in _indexed:
+        if engine.dialect.name != "sqlite":
+            _indexed[engine] = False
+        else:
+            _indexed[engine] = (
+                session.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": SEARCH_TABLE}
+                ).first()
+                is not None
+            )
+    return _indexed[engine]
+
+
+def _escape_like(name: str) -> str:
+    return name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+SearchKey = Tuple[int, int, int]
+
+
+def _relevance(name: str) -> ColumnElement[int]:
+    nation = models.MetadataModel.nation
+    return case(
+        (func.lower(nation) == name.lower(), 0),
+        (nation.ilike(f"{_escape_like(name)}%", escape="\\"), 1),
+        else_=2,
+    )
+
+
+def search_nations_page(
+    name: str, session: Session, after: Optional[SearchKey] = None, limit: int = SEARCH_LIMIT
+) -> Page[models.MetadataModel, SearchKey]:
+    """Finds a page of the nations whose name contains the name, ignoring case. The exact match
+    comes first, then the names that start with it, shortest first. The trigram index needs at
+    least three characters, so shorter names are matched with LIKE. Only the rows on the page are
+    loaded, however common the name is.
+
+    Args:
+        name (str): the part of the name to search for
+        session (Session): the session of the interaction
+        after (Optional[SearchKey]): the key of the previous page, None for the first page
+        limit (int): the most nations on the page
+
+    Returns (Page[models.MetadataModel, SearchKey]): the metadata of the matching nations
+    """
+    metadata = models.MetadataModel
+    relevance = _relevance(name)
+    length = func.length(metadata.nation)
+    query = session.query(metadata, relevance)
+    if len(name) >= TRIGRAM_LENGTH and has_search_index(session):
+        matches = text(
+            f"SELECT rowid AS user_id FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :phrase"
+        ).columns(user_id=Integer)
+        query = query.filter(metadata.user_id.in_(matches)).params(
+            phrase='"' + name.replace('"', '""') + '"'
+        )
+    else:
+        query = query.filter(metadata.nation.ilike(f"%{_escape_like(name)}%", escape="\\"))
+    if after is not None:
+        query = query.filter(tuple_(relevance, length, metadata.user_id) > tuple_(*after))
+    rows = query.order_by(relevance, length, metadata.user_id).limit(limit + 1).all()
+    page = Page.from_rows(rows, limit, lambda row: (row[1], len(row[0].nation), row[0].user_id))
+    return Page([nation for nation, _ in page.items], page.after)
+
+
+def search_nations(
+    name: str, session: Session, limit: int = SEARCH_LIMIT
+) -> List[models.MetadataModel]:
+    """The first page of the nations whose name contains the name, see search_nations_page
+
+    Args:
+        name (str): the part of the name to search for
+        session (Session): the session of the interaction
+        limit (int): the most nations to return
+
+    Returns (List[models.MetadataModel]): the metadata of the matching nations
+    """
+    return search_nations_page(name, session, limit=limit).items
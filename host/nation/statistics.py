@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cached_property
+from typing import TYPE_CHECKING, Callable, Dict, List, Literal, Optional, Tuple, get_args
+
+from sqlalchemy import delete, func, insert, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from host.base_types import UserId
+from host.currency import DAY
+from host.gameplay_settings import GameplaySettings
+from host.nation import models, strength
+from host.nation.types.government import Governments
+from host.pagination import PAGE_SIZE, Page
+
+try:
+    from host.nation.world import World
+except ImportError:  # without the world extra, the statistics are rebuilt one by one
+    World = None  # type: ignore
+
+if TYPE_CHECKING:
+    from host.nation import Nation
+
+Metric = Literal["revenue", "population", "treasury", "technology", "land", "strength"]
+METRICS: Tuple[Metric, ...] = get_args(Metric)
+LeaderboardKey = Tuple[float, int]
+
+_MEASURES: Dict[Metric, Callable[[Nation], float]] = {
+    "revenue": lambda nation: int(nation.bank.national_revenue.amount_in_delta(DAY)),
+    "population": lambda nation: nation.population,
+    "treasury": lambda nation: nation.bank.treasury,
+    "technology": lambda nation: nation.interior.technology.amount,
+    "land": lambda nation: nation.interior.land.amount,
+    "strength": lambda nation: strength.score(
+        nation.interior.infrastructure.amount,
+        nation.interior.land.amount,
+        nation.interior.technology.amount,
+        nation.public_works.amounts,
+        nation.government.boost() + nation.public_works.boost(),
+    ),
+}
+
+
+@dataclass(frozen=True)
+class Standing:
+    """A nation on a leaderboard, nations with the same value share their rank"""
+
+    rank: int
+    user_id: int
+    nation: str
+    emoji: str
+    value: float
+
+
+class Statistics:
+    """The ranked statistics of a nation, materialized in the NationStats table so that the
+    leaderboards and ranks are read through the index of each metric instead of computing every
+    nation. The ministries refresh the metrics before they flush a change to them, and rebuild
+    recomputes every nation at once."""
+
+    def __init__(self, nation: Nation, session: Session):
+        self._nation = nation
+        self._session = session
+
+    @cached_property
+    def _model(self) -> models.NationStatsModel:
+        statistics = self._session.get(models.NationStatsModel, self._nation.identifier)
+        if statistics is None:
+            raise ValueError(f"Statistics do not exist for {self._nation.identifier}")
+        return statistics
+
+    @staticmethod
+    def provision(
+        bank: models.BankModel, interior: models.InteriorModel, government: models.GovernmentModel
+    ) -> models.NationStatsModel:
+        """The statistics of a nation that was just founded with that bank, interior and government,
+        which has no revenue until it is happy and no improvements"""
+        return models.NationStatsModel(
+            user_id=interior.user_id,
+            revenue=0,
+            population=interior.infrastructure
+            * GameplaySettings.interior.population_per_infrastructure,
+            treasury=bank.treasury,
+            technology=interior.technology,
+            land=interior.land,
+            strength=strength.score(
+                interior.infrastructure,
+                interior.land,
+                interior.technology,
+                [],
+                Governments[government.type].boosts,
+            ),
+        )
+
+    def measure(self) -> Dict[Metric, float]:
+        return {metric: measure(self._nation) for metric, measure in _MEASURES.items()}
+
+    def refresh(self, *metrics: Metric) -> None:
+        """Recomputes the metrics, every metric by default. The row is written by the next flush,
+        and only when one of them changed
+
+        Args:
+            *metrics (Metric): the metrics that the change affects
+        """
+        # measured before any is set, so that loading an input does not flush half of them
+        measured = {metric: _MEASURES[metric](self._nation) for metric in metrics or METRICS}
+        statistics = self._model
+        for metric, value in measured.items():
+            setattr(statistics, metric, value)
+
+    def __getitem__(self, metric: Metric) -> float:
+        return getattr(self._model, metric)
+
+    def rank(self, metric: Metric) -> int:
+        """The rank of the nation on the leaderboard of the metric, counted through its index
+
+        Args:
+            metric (Metric): the metric to rank by
+
+        Returns (int): the rank, starting at 1
+        """
+        above = self._session.scalar(
+            select(func.count()).where(getattr(models.NationStatsModel, metric) > self[metric])
+        )
+        return (above or 0) + 1
+
+
+def leaderboard(
+    session: Session,
+    metric: Metric,
+    after: Optional[LeaderboardKey] = None,
+    limit: int = PAGE_SIZE,
+) -> Page[Standing, LeaderboardKey]:
+    """The nations with the highest value of the metric, read backwards through its index
+
+    Args:
+        session (Session): the session to query with
+        metric (Metric): the metric to rank by
+        after (Optional[LeaderboardKey]): the value and user id of the last nation of the
+            previous page, None for the first page
+        limit (int): the most nations on the page
+
+    Returns (Page[Standing, LeaderboardKey]): the standings, highest first
+    """
+    column = getattr(models.NationStatsModel, metric)
+    key = tuple_(column, models.NationStatsModel.user_id)
+    query = select(
+        models.NationStatsModel.user_id,
+        models.MetadataModel.nation,
+        models.MetadataModel.emoji,
+        column,
+    ).join(models.MetadataModel, models.MetadataModel.user_id == models.NationStatsModel.user_id)
+    if after is not None:
+        query = query.where(key < tuple_(*after))
+    rows = session.execute(
+        query.order_by(column.desc(), models.NationStatsModel.user_id.desc()).limit(limit + 1)
+    ).all()
+    standings: List[Standing] = []
+    if rows:
+        # only the first nation of the page is counted, the rest follow it in order and take the
+        # rank of the nation before them when they have the same value
+        first, value = rows[0].user_id, rows[0][-1]
+        above, before = (
+            (0, 0)
+            if after is None
+            else session.execute(
+                select(func.count().filter(column > value), func.count()).where(
+                    key > tuple_(value, first)
+                )
+            ).one()
+        )
+        rank = above + 1
+        for position, (user_id, nation, emoji, value) in enumerate(rows):
+            if position and value != standings[-1].value:
+                rank = before + position + 1
+            standings.append(Standing(rank, user_id, nation, emoji, value))
+    return Page.from_rows(standings, limit, lambda standing: (standing.value, standing.user_id))
+
+
+def _measure_world(session: Session) -> List[Dict[str, float]]:
+    if World is None:
+        from host.nation import Nation  # the package imports this module
+
+        return [
+            {"user_id": user_id, **Statistics(Nation(UserId(user_id), session), session).measure()}
+            for user_id in session.scalars(select(models.MetadataModel.user_id))
+        ]
+    world = World.load(session)
+    return [
+        dict(zip(("user_id", *METRICS), row))
+        for row in zip(
+            world.user_ids.tolist(),
+            world.national_revenue.astype(int).tolist(),
+            world.population.astype(int).tolist(),
+            world.treasury.astype(int).tolist(),
+            world.technology.astype(int).tolist(),
+            world.land.tolist(),
+            world.strength.tolist(),
+        )
+    ]
+
+
+def rebuild(session: Session) -> int:
+    """Recomputes the statistics of every nation, at once when numpy is installed and one nation
+    at a time otherwise, and writes them row by row. A nation founded by another process after the
+    nations were measured keeps the row it was founded with, and only the rows of nations that no
+    longer exist are deleted.
+
+    Args:
+        session (Session): the session of the batch job, which should not hold the statistics of
+            any nation
+
+    Returns (int): the number of nations
+    """
+    rows = _measure_world(session)
+    existing = set(session.scalars(select(models.NationStatsModel.user_id)))
+    updated = [row for row in rows if row["user_id"] in existing]
+    inserted = [row for row in rows if row["user_id"] not in existing]
+    if updated:
+        session.execute(update(models.NationStatsModel), updated)
+    if inserted:
+        session.execute(insert(models.NationStatsModel), inserted)
+    session.execute(
+        delete(models.NationStatsModel).where(
+            models.NationStatsModel.user_id.not_in(select(models.MetadataModel.user_id))
+        )
+    )
+    return len(rows)
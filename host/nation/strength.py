@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from typing import List, Sequence
+
+from host.gameplay_settings import GameplaySettings
+from host.nation.types.boosts import BoostsLookup
+from host.nation.types.improvements import Improvements
+
+IMPROVEMENT_PRICES: List[int] = [improvement.raw_price for improvement in Improvements.values()]
+
+assert set(GameplaySettings.strength.boosts) <= set(
+    BoostsLookup.model_fields
+), "STRENGTH BOOST WEIGHTS MUST NAME BOOSTS"
+
+
+def multiplier(boosts: BoostsLookup) -> float:
+    """How much the boosts scale the strength, each boost by its weight in the strength settings,
+    so that a boost without a weight, such as a cost modifier, does not count"""
+    weights = GameplaySettings.strength.boosts
+    return 1 + sum(getattr(boosts, boost) * weight for boost, weight in weights.items())
+
+
+def score(
+    infrastructure: float,
+    land: float,
+    technology: float,
+    improvements: Sequence[int],
+    boosts: BoostsLookup,
+) -> float:
+    """The strength of a nation, its interior and the worth of its improvements, weighted by the
+    strength settings, and scaled by the weighted boosts. It is rounded so that computing it from
+    the same inputs in another order gives the same score.
+
+    Args:
+        infrastructure (float): the infrastructure of the nation
+        land (float): the land of the nation
+        technology (float): the technology of the nation
+        improvements (Sequence[int]): the amount of each improvement, by ordinal
+        boosts (BoostsLookup): the boosts of its government and improvements
+
+    Returns (float): the strength
+    """
+    weights = GameplaySettings.strength
+    worth = sum(amount * price for amount, price in zip(improvements, IMPROVEMENT_PRICES))
+    base = (
+        infrastructure * weights.infrastructure
+        + land * weights.land
+        + technology * weights.technology
+        + worth * weights.improvement_price
+    )
+    return round(base * multiplier(boosts), 2)
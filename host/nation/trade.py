@@ -3,7 +3,6 @@ from __future__ import annotations
 from enum import IntEnum, auto
 import random
 from datetime import datetime, timedelta
-from itertools import chain
 from typing import TYPE_CHECKING, List, Optional, Set
 
 from host.gameplay_settings import GameplaySettings
@@ -11,6 +10,7 @@ import host.nation.types
 from host import base_types
 from host.nation import ministry, models
 from host.nation.types import resources
+from host.pagination import PAGE_SIZE, Page
 from sqlalchemy.orm import Session
 
 if TYPE_CHECKING:
@@ -132,7 +132,7 @@ def filter_expired(
             session.delete(trade)
         else:
             active_requests.append(trade)
-    session.commit()
+    session.flush()
     return active_requests
 
 
@@ -149,54 +149,55 @@ class Trade(ministry.Ministry):
     def swap_resources(self, old_resource: str, resource: str) -> TradeSelectResponses:
         if resource not in resources.RESOURCE_NAMES:
             return TradeSelectResponses.INVALID_RESOURCE
-        resource_model = (
-            self._session.query(models.ResourcesModel)
-            .filter_by(user_id=self._identifier, resource=old_resource)
-            .first()
-        )
-        if resource_model is None:
+        current = self.resources
+        if old_resource not in current:
             return TradeSelectResponses.MISSING_RESOURCE
 
-        if resource in self.resources:
+        if resource in current:
             return TradeSelectResponses.DUPLICATE_RESOURCE
 
-        resource_model.resource = resource
-        self._session.commit()
+        self._model.resources = resources.pack(
+            resource if name == old_resource else name for name in current
+        )
+        self._session.flush()
         return TradeSelectResponses.SUCCESS
 
+    @property
+    def _model(self) -> models.ResourcesModel:
+        model = self._session.get(models.ResourcesModel, self._identifier)
+        if model is None:
+            raise ValueError(f"Resources do not exist for {self._identifier}")
+        return model
+
     @property
     def resources(self) -> List[resources.ResourceName]:
-        resource_models = (
-            self._session.query(models.ResourcesModel).filter_by(user_id=self._identifier).all()
-        )
-        if not resource_models:
-            selected_resources = random.sample(
-                resources.RESOURCE_NAMES, k=GameplaySettings.trade.resources_per_nation
-            )
-            for resource in selected_resources:
-                self._session.add(
-                    models.ResourcesModel(user_id=self._identifier, resource=resource)
+        return resources.unpack(self._model.resources)
+
+    @staticmethod
+    def provision(identifier: base_types.UserId) -> models.ResourcesModel:
+        """The resources that a nation starts with, drawn at random"""
+        return models.ResourcesModel(
+            user_id=identifier,
+            resources=resources.pack(
+                random.sample(
+                    resources.RESOURCE_NAMES, k=GameplaySettings.trade.resources_per_nation
                 )
-            self._session.commit()
-            return selected_resources
-        return [resources.ResourceName(resource.resource) for resource in resource_models]
+            ),
+        )
 
     def all_resources(self) -> Set[str]:
-        return set(
-            chain(
-                self.resources,
-                (
-                    resources
-                    for agreement in self.sponsored
-                    for resources in self._player.find_player(agreement.recipient).trade.resources
-                ),
-                (
-                    resources
-                    for agreement in self.recipient
-                    for resources in self._player.find_player(agreement.sponsor).trade.resources
-                ),
-            )
+        partners = {
+            agreement.counter_party(self._identifier) for agreement in self.active_agreements
+        }
+        partner_masks = (
+            self._session.query(models.ResourcesModel.resources)
+            .filter(models.ResourcesModel.user_id.in_(partners))
+            .all()
         )
+        mask = self._model.resources
+        for (partner_mask,) in partner_masks:
+            mask |= partner_mask
+        return set(resources.unpack(mask))
 
     def bonus_resources(self) -> Set[str]:
         all_resources = self.all_resources()
@@ -236,6 +237,30 @@ class Trade(ministry.Ministry):
         )
         return [TradeRequest(request) for request in filter_expired(requests, self._session)]
 
+    def offers_received_page(
+        self, after_id: Optional[base_types.UserId] = None, limit: int = PAGE_SIZE
+    ) -> Page[TradeRequest, base_types.UserId]:
+        """A page of the trade offers received, ordered by their sponsor. The expired offers are
+        deleted in one statement instead of being loaded.
+
+        Args:
+            after_id (Optional[base_types.UserId]): the sponsor of the last offer of the previous
+                page, None for the first page
+            limit (int): the most offers on the page
+
+        Returns (Page[TradeRequest, base_types.UserId]): the offers
+        """
+        requests = self._session.query(models.TradeRequestModel).filter_by(
+            recipient=self._identifier
+        )
+        cutoff = datetime.now() - timedelta(days=GameplaySettings.trade.offer_expire_days)
+        requests.filter(models.TradeRequestModel.date < cutoff).delete()
+        if after_id is not None:
+            requests = requests.filter(models.TradeRequestModel.sponsor > after_id)
+        rows = requests.order_by(models.TradeRequestModel.sponsor).limit(limit + 1).all()
+        page = Page.from_rows(rows, limit, lambda request: base_types.UserId(request.sponsor))
+        return Page([TradeRequest(request) for request in page.items], page.after)
+
     def _send(self, recipient: base_types.UserId) -> None:
         date = datetime.now()
         trade_request = models.TradeRequestModel(
@@ -244,7 +269,7 @@ class Trade(ministry.Ministry):
             recipient=recipient,
         )
         self._session.add(trade_request)
-        self._session.commit()
+        self._session.flush()
 
     def send(self, recipient: base_types.UserId) -> TradeSentResponses:
         if self._identifier == recipient:
@@ -277,7 +302,7 @@ class Trade(ministry.Ministry):
         )
         self._session.add(trade_agreement)
         trade_request.invalidate(self._session)
-        self._session.commit()
+        self._session.flush()
 
     def fetch_request_from(self, sponsor: base_types.UserId) -> Optional[TradeRequest]:
         requests = list(filter(lambda request: request.sponsor == sponsor, self.offers_received))
@@ -319,7 +344,7 @@ class Trade(ministry.Ministry):
         if trade_request is None:
             return TradeDeclineResponses.NOT_FOUND
         trade_request.invalidate(self._session)
-        self._session.commit()
+        self._session.flush()
         return TradeDeclineResponses.SUCCESS
 
     def cancel(self, partner: base_types.UserId) -> TradeCancelResponses:
@@ -327,7 +352,7 @@ class Trade(ministry.Ministry):
         if agreement is None:
             return TradeCancelResponses.NOT_FOUND
         agreement.invalidate(self._session)
-        self._session.commit()
+        self._session.flush()
         return TradeCancelResponses.SUCCESS
 
     def boost(self) -> host.nation.types.boosts.BoostsLookup:
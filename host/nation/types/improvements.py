@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import json
-from typing import Dict
+from typing import Dict, List, Sequence
 
 import pydantic
 from host import currency
@@ -36,3 +36,39 @@ with open("objects/improvements.json", encoding="utf8", mode="r") as improvement
         identifier: ImprovementSchema.model_validate(improvement)
         for identifier, improvement in json.load(improvements_file).items()
     }
+
+IMPROVEMENT_NAMES: List[str] = list(Improvements)
+BOOST_NAMES: List[str] = list(BoostsLookup.model_fields)
+BOOST_MATRIX: List[List[float]] = [
+    [getattr(improvement.boosts, boost) for boost in BOOST_NAMES]
+    for improvement in Improvements.values()
+]
+
+
+def ordinal(name: str) -> int:
+    """The position of the improvement in the count vectors of the nations, which is its position
+    in objects/improvements.json, so new improvements must only ever be appended to it"""
+    return IMPROVEMENT_NAMES.index(name)
+
+
+def dense(amounts: Sequence[int]) -> List[int]:
+    """The count vector padded to every improvement, the vectors stored before an improvement was
+    appended are shorter"""
+    return list(amounts) + [0] * (len(IMPROVEMENT_NAMES) - len(amounts))
+
+
+def boosts_of(amounts: Sequence[int]) -> BoostsLookup:
+    """The boosts of the improvements, the dot product of the count vector with the boosts of each
+    improvement
+
+    Args:
+        amounts (Sequence[int]): the amount of each improvement, by ordinal
+
+    Returns (BoostsLookup): the combined boosts
+    """
+    totals = [0.0] * len(BOOST_NAMES)
+    for amount, row in zip(amounts, BOOST_MATRIX):
+        if amount:
+            for column, boost in enumerate(row):
+                totals[column] += amount * boost
+    return BoostsLookup(**dict(zip(BOOST_NAMES, totals)))
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import json
-from typing import Dict, List, NewType, Set
+from typing import Dict, Iterable, List, NewType, Set
 
 from host.nation.types.boosts import BoostsLookup
 from pydantic import BaseModel
@@ -34,3 +34,23 @@ with open("objects/bonus_resources.json", "r", encoding="utf8") as bonus_resourc
 
 RESOURCE_NAMES: List[ResourceName] = list(map(ResourceName, Resources.keys()))
 BONUS_RESOURCE_NAMES: List[ResourceName] = list(map(ResourceName, BonusResources.keys()))
+
+
+def pack(names: Iterable[str]) -> int:
+    """Packs the resources into a bitmask, where each resource is the bit of its position in
+    RESOURCE_NAMES, so new resources must only ever be appended to objects/resources.json
+
+    Args:
+        names (Iterable[str]): the names of the resources
+
+    Returns (int): the bitmask
+    """
+    mask = 0
+    for name in names:
+        mask |= 1 << RESOURCE_NAMES.index(ResourceName(name))
+    return mask
+
+
+def unpack(mask: int) -> List[ResourceName]:
+    """The names of the resources in the bitmask, in the order of RESOURCE_NAMES"""
+    return [name for bit, name in enumerate(RESOURCE_NAMES) if mask >> bit & 1]
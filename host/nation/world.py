@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from functools import cache, cached_property
+from typing import Callable, Dict, Type, get_args, get_type_hints
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from host.currency import SECONDS_AS_DAY, PriceRate
+from host.gameplay_settings import GameplaySettings
+from host.nation import models, strength, types
+from host.nation.ministry import Ministry
+from host.nation.types.government import Governments
+from host.nation.types.improvements import BOOST_MATRIX, BOOST_NAMES, dense
+from host.nation.types.interior import Data, InfrastructurePoints, LandPoints, TechnologyPoints
+
+GOVERNMENT_NAMES = list(Governments)
+GOVERNMENT_BOOSTS = np.array(
+    [
+        [getattr(government.boosts, boost) for boost in BOOST_NAMES]
+        for government in Governments.values()
+    ]
+)
+IMPROVEMENT_BOOSTS = np.array(BOOST_MATRIX).reshape(-1, len(BOOST_NAMES))
+IMPROVEMENT_PRICES = np.array(strength.IMPROVEMENT_PRICES, dtype=float)
+
+
+def _daily(rate: PriceRate) -> float:
+    assert rate.per_day() is rate, "BILL POINTS MUST BE DAILY RATES"
+    return float(rate._amount.amount)
+
+
+class _BillPoints:
+    """The bill points of a unit as arrays, so the bill of every level is one binary search"""
+
+    def __init__(self, unit: Type[Data]):
+        self.modifier = BOOST_NAMES.index(unit.BillModifier)
+        self.points = np.array(list(unit.BillPoints), dtype=float)
+        self.rates = np.array([_daily(rate) for rate in unit.BillPoints.values()])
+
+    def bill_at(self, levels: np.ndarray) -> np.ndarray:
+        # the first point at or above the level, past the last point the last rate applies
+        index = np.minimum(np.searchsorted(self.points, levels), len(self.points) - 1)
+        return self.rates[index] * levels
+
+
+INFRASTRUCTURE_BILLS = _BillPoints(InfrastructurePoints)
+TECHNOLOGY_BILLS = _BillPoints(TechnologyPoints)
+LAND_BILLS = _BillPoints(LandPoints)
+
+
+@dataclass(frozen=True)
+class World:
+    """The statistics of every nation at once, each column is an array ordered by the user id of
+    the nations, loaded in one query. The properties evaluate the formulas of Nation, Bank and
+    Interior over the whole array, so the amounts are the ones of the scalar path to the unit, and
+    the rates are daily.
+
+    Attributes:
+        user_ids (np.ndarray): the user id of each nation, ascending
+        infrastructure (np.ndarray): the infrastructure of each nation
+        land (np.ndarray): the land of each nation
+        technology (np.ndarray): the technology of each nation
+        governments (np.ndarray): the position of the government of each nation in
+            GOVERNMENT_NAMES
+        improvements (np.ndarray): the count vector of the improvements of each nation, one row
+            per nation
+        treasury (np.ndarray): the treasury of each nation when its bank was last accessed
+        last_accessed (np.ndarray): when the bank of each nation was last accessed
+    """
+
+    user_ids: np.ndarray
+    infrastructure: np.ndarray
+    land: np.ndarray
+    technology: np.ndarray
+    governments: np.ndarray
+    improvements: np.ndarray
+    treasury: np.ndarray
+    last_accessed: np.ndarray
+
+    @classmethod
+    def load(cls, session: Session) -> World:
+        rows = session.execute(
+            select(
+                models.InteriorModel.user_id,
+                models.InteriorModel.infrastructure,
+                models.InteriorModel.land,
+                models.InteriorModel.technology,
+                models.GovernmentModel.type,
+                models.ImprovementModel.amounts,
+                models.BankModel.treasury,
+                models.BankModel.last_accessed,
+            )
+            .join(
+                models.GovernmentModel,
+                models.GovernmentModel.user_id == models.InteriorModel.user_id,
+            )
+            .join(
+                models.ImprovementModel,
+                models.ImprovementModel.user_id == models.InteriorModel.user_id,
+            )
+            .join(models.BankModel, models.BankModel.user_id == models.InteriorModel.user_id)
+            .order_by(models.InteriorModel.user_id)
+        ).all()
+        columns = list(zip(*rows)) or [()] * 8
+        user_ids, infrastructure, land, technology, governments, amounts, treasury, accessed = (
+            columns
+        )
+        return cls(
+            user_ids=np.array(user_ids, dtype=np.int64),
+            infrastructure=np.array(infrastructure, dtype=float),
+            land=np.array(land, dtype=float),
+            technology=np.array(technology, dtype=float),
+            governments=np.array(
+                [GOVERNMENT_NAMES.index(government) for government in governments], dtype=np.intp
+            ),
+            improvements=np.array([dense(vector) for vector in amounts], dtype=float).reshape(
+                len(rows), IMPROVEMENT_BOOSTS.shape[0]
+            ),
+            treasury=np.array(treasury, dtype=float),
+            last_accessed=np.array(accessed, dtype="datetime64[us]"),
+        )
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    @cached_property
+    def boosts(self) -> np.ndarray:
+        """The boosts of each nation, one row per nation and one column per boost in BOOST_NAMES,
+        combined from the same ministries as Nation.boost"""
+        combined = np.zeros((len(self), len(BOOST_NAMES)))
+        for ministry in get_args(types.ministries.Ministries):
+            if ministry in MINISTRY_BOOSTS:
+                combined += MINISTRY_BOOSTS[ministry](self)
+        return combined
+
+    def boost(self, name: str) -> np.ndarray:
+        return self.boosts[:, BOOST_NAMES.index(name)]
+
+    @cached_property
+    def population(self) -> np.ndarray:
+        return self.infrastructure * GameplaySettings.interior.population_per_infrastructure
+
+    @cached_property
+    def happiness(self) -> np.ndarray:
+        """The happiness of each nation, combined from the same ministries as Nation.happiness.
+        A ministry that is not in MINISTRY_HAPPINESS must keep the happiness of Ministry"""
+        happiness = np.zeros(len(self))
+        for ministry in get_args(types.ministries.Ministries):
+            if ministry in MINISTRY_HAPPINESS:
+                happiness += MINISTRY_HAPPINESS[ministry](self)
+            else:
+                assert (
+                    _ministry_class(ministry).happiness is Ministry.happiness
+                ), f"THE HAPPINESS OF {ministry.upper()} MUST BE IN MINISTRY_HAPPINESS"
+        return happiness * (1 + self.boost("happiness_modifier") / 100)
+
+    @cached_property
+    def revenue(self) -> np.ndarray:
+        return self.happiness * 3 * self.population
+
+    def _unit_bill(self, bills: _BillPoints, levels: np.ndarray) -> np.ndarray:
+        return bills.bill_at(levels) * (1 - self.boosts[:, bills.modifier])
+
+    @cached_property
+    def interior_bill(self) -> np.ndarray:
+        # the rates are added as in Rate.__add__, which truncates the rate on the right
+        bill = (
+            self._unit_bill(INFRASTRUCTURE_BILLS, self.infrastructure)
+            + np.trunc(self._unit_bill(TECHNOLOGY_BILLS, self.technology))
+            + np.trunc(self._unit_bill(LAND_BILLS, self.land))
+        )
+        return bill * (1 - self.boost("bill_modifier"))
+
+    @cached_property
+    def national_revenue(self) -> np.ndarray:
+        return self.revenue * (1 + self.boost("income_modifier"))
+
+    @cached_property
+    def national_bill(self) -> np.ndarray:
+        # the interior is the only ministry with a bill
+        costs = np.trunc(self.interior_bill) - np.trunc(self.boost("bill_reduction"))
+        return costs * (1 - self.boost("bill_modifier") / 100)
+
+    @cached_property
+    def national_profit(self) -> np.ndarray:
+        return self.national_revenue - np.trunc(self.national_bill)
+
+    @cached_property
+    def strength(self) -> np.ndarray:
+        """The strength of each nation, as strength.score computes it"""
+        weights = GameplaySettings.strength
+        boosts = GOVERNMENT_BOOSTS[self.governments] + self.improvements @ IMPROVEMENT_BOOSTS
+        base = (
+            self.infrastructure * weights.infrastructure
+            + self.land * weights.land
+            + self.technology * weights.technology
+            + self.improvements @ IMPROVEMENT_PRICES * weights.improvement_price
+        )
+        boost_weights = np.array([weights.boosts.get(boost, 0.0) for boost in BOOST_NAMES])
+        return np.round(base * (1 + boosts @ boost_weights), 2)
+
+    def funds(self, at: datetime) -> np.ndarray:
+        """The treasury of each nation with the profit it made since its bank was last accessed,
+        which is what Bank.funds would read at that time
+
+        Args:
+            at (datetime): the time to read the funds at
+
+        Returns (np.ndarray): the funds of each nation
+        """
+        elapsed = (np.datetime64(at, "us") - self.last_accessed) / np.timedelta64(1, "s")
+        profit = np.trunc(self.national_profit * (elapsed / SECONDS_AS_DAY))
+        return self.treasury + np.where(elapsed > 0, profit, 0)
+
+
+@cache
+def _ministry_class(ministry: str) -> Type[Ministry]:
+    from host.nation import Nation  # the package imports this module
+
+    return get_type_hints(getattr(Nation, ministry).func)["return"]
+
+
+MINISTRY_HAPPINESS: Dict[str, Callable[[World], np.ndarray]] = {}
+"""The happiness of the ministries that make a nation happy, by the name of the ministry on Nation,
+none of them does yet"""
+
+MINISTRY_BOOSTS: Dict[str, Callable[[World], np.ndarray]] = {
+    "government": lambda world: GOVERNMENT_BOOSTS[world.governments],
+    "public_works": lambda world: world.improvements @ IMPROVEMENT_BOOSTS,
+}
+"""The boosts of the ministries that grant any, by the name of the ministry on Nation"""
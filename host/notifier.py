@@ -1,19 +1,28 @@
 from __future__ import annotations
 
 import logging
+import os
+import socket
 import threading
 import time
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from sched import scheduler
-from typing import Any, Callable, List, Optional
+from typing import Any, Callable, List, Optional, Set
 from uuid import uuid4
 
-from host.base_models import NotificationModel
+from host.base_models import LeaseModel, NotificationModel
 from host.base_types import UserId
-from sqlalchemy import Engine
+from sqlalchemy import Engine, delete, or_, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+LEASE_DURATION: timedelta = timedelta(seconds=30)
+ADOPTED_LEASE_DURATION: timedelta = LEASE_DURATION / 2
+HEARTBEAT_INTERVAL: timedelta = LEASE_DURATION / 3
+
+logger = logging.getLogger(__name__)
+
 
 @dataclass(frozen=True)
 class Notification:
@@ -32,37 +41,172 @@ class NotifierError(Exception):
     pass
 
 
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+
+
+def lease_name(partition: int) -> str:
+    return f"notifier:{partition}"
+
+
 class Notifier:
-    """Singleton class that handles the tracking and consumption of Notifications"""
+    """Singleton class that handles the tracking and consumption of Notifications
+
+    Several processes can share one database, so the notifications are split into partitions by
+    the user_id, and each partition is dispatched only by the process that holds its lease in the
+    database. The lease is renewed on every heartbeat, and taken over by another process once it
+    expires. A process contends for its own partition first, and adopts the expired partitions of
+    any other process on a shorter lease, which the process of that partition takes back as soon
+    as it contends again.
+
+    Delivery is at most once, a notification is claimed by deleting it before the hooks send it,
+    so a notification whose send fails is logged by the hook and not retried.
+    """
 
     _instance: Optional[Notifier] = None
-    _scheduler: scheduler = scheduler()
     _hooks: List[Callable[[ScheduledNotification], Any]] = []
-    _loaded: bool = False
-    _lock: threading.Lock = threading.Lock()
-    _condition: threading.Condition = threading.Condition()
 
-    def __init__(self, engine: Engine):
+    def __init__(
+        self,
+        engine: Engine,
+        partition: int = 0,
+        partitions: int = 1,
+        worker_id: Optional[str] = None,
+    ):
+        if not 0 <= partition < partitions:
+            raise NotifierError(f"Partition {partition} is not in the range of {partitions}")
         self._engine = engine
-        if not self._loaded:
+        self._partition = partition
+        self._partitions = partitions
+        self._worker_id = worker_id if worker_id is not None else default_worker_id()
+        self._held: Set[int] = set()
+        self._scheduled: Set[str] = set()
+        self._scheduler: scheduler = scheduler()
+        self._condition: threading.Condition = threading.Condition()
+
+    @property
+    def lease_name(self) -> str:
+        return lease_name(self._partition)
+
+    @property
+    def is_leader(self) -> bool:
+        return self._partition in self._held
+
+    @property
+    def held(self) -> Set[int]:
+        """The partitions that this process dispatches, its own and the ones it adopted"""
+        return set(self._held)
+
+    def owns(self, user_id: int) -> bool:
+        """Checks if the notifications of the user are dispatched by this process"""
+        return user_id % self._partitions in self._held
+
+    def _acquire_lease(self, partition: int) -> bool:
+        """Private method that takes or renews the lease of a partition, the conditional update
+        guarantees that only one process can hold an unexpired lease at a time. The lease of
+        another partition is adopted only once it expired, and for ADOPTED_LEASE_DURATION, while
+        the process of the partition takes back any lease that runs out sooner than its own would"""
+        now = datetime.now()
+        if partition == self._partition:
+            duration, contended = LEASE_DURATION, now + ADOPTED_LEASE_DURATION
+        else:
+            duration, contended = ADOPTED_LEASE_DURATION, now
+        name = lease_name(partition)
+        with Session(self._engine) as session:
+            renewed = session.execute(
+                update(LeaseModel)
+                .where(LeaseModel.name == name)
+                .where(or_(LeaseModel.holder == self._worker_id, LeaseModel.expires < contended))
+                .values(holder=self._worker_id, expires=now + duration)
+            )
+            adopted = partition != self._partition
+            if renewed.rowcount == 0:
+                if session.get(LeaseModel, name) is not None:
+                    return False
+                # a partition that no process ever held is adopted on the next heartbeat, unless
+                # its process starts by then
+                session.add(
+                    LeaseModel(
+                        name=name,
+                        holder="" if adopted else self._worker_id,
+                        expires=now if adopted else now + duration,
+                    )
+                )
+            try:
+                session.commit()
+            except IntegrityError:
+                return False
+        return renewed.rowcount > 0 or not adopted
+
+    def release(self) -> None:
+        """Gives up the leases so that other processes can take over the partitions immediately"""
+        with Session(self._engine) as session:
+            session.execute(
+                update(LeaseModel)
+                .where(LeaseModel.name.in_([lease_name(partition) for partition in self._held]))
+                .where(LeaseModel.holder == self._worker_id)
+                .values(expires=datetime.now())
+            )
+            session.commit()
+        self._demote()
+        self._held.clear()
+
+    def _demote(self) -> None:
+        with self._condition:
+            for event in self._scheduler.queue:
+                self._scheduler.cancel(event)
+            self._scheduled.clear()
+
+    def heartbeat(self) -> bool:
+        """Contends for the lease of the partition and of any expired partition, and picks up the
+        notifications of the partitions it holds that are not scheduled in this process yet
+
+        Returns (bool): whether this process is the dispatcher of its own partition
+        """
+        partitions = [self._partition] + [
+            partition for partition in range(self._partitions) if partition != self._partition
+        ]
+        held = {partition for partition in partitions if self._acquire_lease(partition)}
+
+        lost = self._held - held
+        for partition in sorted(lost):
+            logger.warning(
+                "[NOTIFIER][LEASE][LOST] Worker=%s, Lease=%s",
+                self._worker_id,
+                lease_name(partition),
+            )
+        for partition in sorted(held - self._held):
+            logger.info(
+                "[NOTIFIER][LEASE][ACQUIRED] Worker=%s, Lease=%s",
+                self._worker_id,
+                lease_name(partition),
+            )
+        if lost:
+            self._demote()
+        self._held = held
+        if held:
             self._load_notifications_from_db()
+        return self.is_leader
 
     def _load_notifications_from_db(self) -> None:
-        with self._lock:
-            if self._loaded:
-                return
-            with Session(self._engine) as session:
-                result = session.query(
-                    NotificationModel.notification_id, NotificationModel.date
-                ).all()
-                for notification in result:
-                    self._schedule(notification.notification_id, notification.date)
-                self._loaded = True
+        with Session(self._engine) as session:
+            query = session.query(NotificationModel.notification_id, NotificationModel.date)
+            if self._partitions > 1:
+                query = query.filter(
+                    (NotificationModel.user_id % self._partitions).in_(sorted(self._held))
+                )
+            result = query.all()
+        for notification in result:
+            if notification.notification_id not in self._scheduled:
+                self._schedule(notification.notification_id, notification.date)
 
     def _schedule(self, notification_id: str, date: datetime) -> None:
         """Private method that schedules a notification for consumption by the view"""
         now = datetime.now()
-        logging.info(f"Scheduling For {date - now} from now")
+        logger.debug(
+            "[NOTIFIER][SCHEDULED] NotificationId=%s, Delay=%s", notification_id, date - now
+        )
+        self._scheduled.add(notification_id)
         if date < now:
             self._display(notification_id)
             return
@@ -72,12 +216,18 @@ class Notifier:
             self._condition.notify()
 
     def _display(self, notification_id: str) -> None:
-        logging.info(f"Displaying notification: {notification_id}")
+        """Private method that claims the notification by deleting it, and fires the hooks only if
+        this process was the one to claim it, so a notification is never delivered twice. It is
+        deleted before it is sent, so a failed send is not retried"""
+        logger.debug("[NOTIFIER][DISPLAY] NotificationId=%s", notification_id)
+        self._scheduled.discard(notification_id)
         with Session(self._engine) as session:
             result = (
                 session.query(NotificationModel).filter_by(notification_id=notification_id).first()
             )
-            assert result is not None, "ScheduledNotification not found"
+            if result is None:
+                logger.debug("[NOTIFIER][SKIPPED] NotificationId=%s", notification_id)
+                return
             notification = ScheduledNotification(
                 user_id=UserId(result.user_id),
                 time=result.date,
@@ -85,12 +235,19 @@ class Notifier:
                 data=result.data,
                 notification_id=result.notification_id,
             )
+            claimed = session.execute(
+                delete(NotificationModel).where(
+                    NotificationModel.notification_id == notification_id
+                )
+            )
+            session.commit()
 
-            for hook in self._hooks:
-                hook(notification)
+        if claimed.rowcount != 1:
+            logger.debug("[NOTIFIER][SKIPPED] NotificationId=%s", notification_id)
+            return
 
-            session.delete(result)
-            session.commit()
+        for hook in self._hooks:
+            hook(notification)
 
     def _add_notification_to_db(self, notification: ScheduledNotification) -> None:
         """Private method that stores the notification in the database"""
@@ -116,21 +273,27 @@ class Notifier:
         Notifier._hooks.append(hook)
 
     def schedule(self, notification: ScheduledNotification) -> None:
-        """Method that schedules a notification for consumption by the view"""
+        """Method that schedules a notification for consumption by the view, if the notification
+        belongs to a partition of another process, then that process picks it up on its heartbeat
+        """
         self._add_notification_to_db(notification)
-        self._schedule(notification.notification_id, notification.time)
+        if self.owns(notification.user_id):
+            self._schedule(notification.notification_id, notification.time)
 
     def start(self) -> None:
         """This method is start when the view is ready, so it begins consuming updates"""
 
         def run():
+            next_heartbeat = time.time()
             with self._condition:
                 while True:
-                    now = time.time()
-                    deadline = self._scheduler.run(blocking=False)
-                    sleep_time = deadline - now if deadline is not None else None
-                    self._condition.wait(
-                        sleep_time if sleep_time is not None and sleep_time > 0 else None
-                    )
+                    if time.time() >= next_heartbeat:
+                        self.heartbeat()
+                        next_heartbeat = time.time() + HEARTBEAT_INTERVAL.total_seconds()
+                    delay = self._scheduler.run(blocking=False)
+                    sleep_time = next_heartbeat - time.time()
+                    if delay is not None:
+                        sleep_time = min(sleep_time, delay)
+                    self._condition.wait(max(sleep_time, 0))
 
         threading.Thread(target=run).start()
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Generic, List, Optional, Sequence, TypeVar
+
+PAGE_SIZE = 5
+
+T = TypeVar("T")
+K = TypeVar("K")
+
+
+@dataclass(frozen=True)
+class Page(Generic[T, K]):
+    """A page of a keyset paginated listing. The next page is the one after the key of the last
+    item, so it is fetched through an index rather than by skipping every row before it.
+
+    Attributes:
+        items (List[T]): the items on the page
+        after (Optional[K]): the key to fetch the next page after, None on the last page
+    """
+
+    items: List[T]
+    after: Optional[K] = None
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[T], limit: int, key: Callable[[T], K]) -> Page[T, K]:
+        """Builds the page from a query that fetched one more row than the limit, the extra row
+        only tells whether there is a next page
+
+        Args:
+            rows (Sequence[T]): up to limit + 1 rows, in the order of their keys
+            limit (int): the most items on the page
+            key (Callable[[T], K]): the key of a row
+
+        Returns (Page[T, K]): the page
+        """
+        items = list(rows[:limit])
+        if len(rows) <= limit:
+            return cls(items)
+        return cls(items, key(items[-1]))
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __bool__(self) -> bool:
+        return bool(self.items)
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
 import traceback
 import argparse
-from functools import wraps
+import atexit
+import asyncio
+from functools import partial, wraps
 import logging
+import multiprocessing
 import os
 import sys
 from typing import (
@@ -14,7 +19,10 @@ from typing import (
     Callable,
     Concatenate,
     Coroutine,
+    Dict,
     Generic,
+    Iterator,
+    List,
     Literal,
     Optional,
     TypeVar,
@@ -23,26 +31,43 @@ from discord.client import Coro
 import forge
 import qalib
 from qalib.interaction import QalibInteraction
-from qalib.renderer import Renderer, RenderingOptions
+from qalib.renderer import Renderer, RenderingOptions, ReturnType
+from qalib.translators import Callback
+from qalib.translators.events import EventCallbacks
 from qalib.template_engines.template_engine import TemplateEngine
 from qalib.translators.deserializer import K_contra
 from qalib.translators.view import CheckEvent
 from typing_extensions import ParamSpec
 
 import discord
+from discord import app_commands
 from discord.ext import commands
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 
-from host import base_types
-import host.base_models
+from host import base_types, metrics
 from host.base_types import UserId
-from host.nation import Nation
+from host.database import (
+    PoolMonitor,
+    PoolSettings,
+    SessionExecutor,
+    create_database_engine,
+    run_async,
+    session_factory,
+)
+from host.instrumentation import QueryInstrumentation, command_scope
+from host.logs import LoggingSettings, configure_logging
+from host.metrics import HANDLER_METRICS
+from host.migrations import migrate
+from host.nation import Nation, names, statistics, user_exists
+from host.nation.names import NATION_NAMES
+from host.nation.percentiles import PERCENTILES, REBUILD_INTERVAL
+from host.nation.search import create_search_index
 from view.notifications import NotificationRenderer
 
-cogs = "start", "economy", "search", "trade", "government", "aid"
+cogs = "start", "economy", "search", "trade", "government", "aid", "leaderboard"
 connect_to_db = False
 
 lookup_messages = Literal[
@@ -96,10 +121,75 @@ class EventProtocol(Generic[K_contra]):
     bot: LeagueOfNations
 
 
+active_session: ContextVar[Optional[Session]] = ContextVar("active_session", default=None)
+
+
+def release_session() -> None:
+    """Commits the session opened by the session decorators, which hands its connection back to the
+    pool. Any model that is read afterwards checks out a connection again, so this is called
+    before awaiting discord, whose latency would otherwise pin the connection. The interaction is
+    then committed in parts, so a handler renders only once its writes are staged, and a handler
+    that catches an error rolls back what it staged since."""
+    session = active_session.get()
+    if session is not None:
+        session.commit()
+
+
+class SessionRenderer(Renderer[K_contra]):
+    """Renderer that releases the active session as soon as the message is rendered, the templates
+    read the models while rendering, and nothing needs the database while the message is sent.
+    The callbacks and events of the message are timed under the name of the message."""
+
+    def render(
+        self,
+        key: K_contra,
+        callbacks: Optional[Dict[str, Callback]] = None,
+        keywords: Optional[Dict[str, Any]] = None,
+        events: Optional[EventCallbacks] = None,
+    ) -> ReturnType:
+        if callbacks is not None:
+            callbacks = {
+                name: HANDLER_METRICS.timed("callback", f"{key}.{name}", callback)
+                for name, callback in callbacks.items()
+            }
+        if events is not None:
+            events = {
+                event: HANDLER_METRICS.timed("event", f"{key}.{event.value}", callback)
+                for event, callback in events.items()
+            }  # type: ignore[assignment]
+        rendered = super().render(key, callbacks, keywords, events)
+        release_session()
+        return rendered
+
+
+def qalib_interaction(
+    template_engine: TemplateEngine, filename: str, *renderer_options: RenderingOptions
+) -> Callable[[Callable[..., Coro[T]]], Callable[..., Coro[T]]]:
+    """Same as qalib.qalib_interaction, but the interaction renders through a SessionRenderer"""
+    renderer_instance: Renderer[str] = SessionRenderer(template_engine, filename, *renderer_options)
+
+    def command(func: Callable[..., Coro[T]]) -> Callable[..., Coro[T]]:
+        if discord.utils.is_inside_class(func):
+
+            @wraps(func)
+            async def method(self, inter: discord.Interaction, *args: Any, **kwargs: Any) -> T:
+                return await func(self, QalibInteraction(inter, renderer_instance), *args, **kwargs)
+
+            return method
+
+        @wraps(func)
+        async def function(inter: discord.Interaction, *args: Any, **kwargs: Any) -> T:
+            return await func(QalibInteraction(inter, renderer_instance), *args, **kwargs)
+
+        return function
+
+    return command
+
+
 def qalib_event_interaction(
     template_engine: TemplateEngine, filename: str, *renderer_options: RenderingOptions
 ) -> Callable[[Callable[..., Coro[T]]], Callable[..., Coro[T]]]:
-    renderer_instance: Renderer[str] = Renderer(template_engine, filename, *renderer_options)
+    renderer_instance: Renderer[str] = SessionRenderer(template_engine, filename, *renderer_options)
 
     def command(func: Callable[..., Coro[T]]) -> Callable[..., Coro[T]]:
         @wraps(func)
@@ -115,6 +205,38 @@ def qalib_event_interaction(
     return command
 
 
+@contextmanager
+def unit_of_work(sessions: sessionmaker[Session], name: str) -> Iterator[Session]:
+    """Opens the session of one interaction, which owns its transaction. The host layer only
+    flushes its changes, so they are committed together once the interaction completes, or earlier
+    by release_session when it renders, and rolled back together if it raises.
+
+    The handler awaits discord between its reads of the models, so the session stays on the event
+    loop and is committed there, a session never crosses threads. Host layer work that should not
+    block the loop goes through LeagueOfNations.run_with_session instead.
+
+    Args:
+        sessions (sessionmaker[Session]): the factory of the session
+        name (str): the name of the handler, which the statements of the session are attributed to
+    """
+    with command_scope(name), sessions() as session:
+        token = active_session.set(session)
+        try:
+            yield session
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logging.error(
+                "[ERROR] name=%s, traceback: %s, exception: %s",
+                name,
+                traceback.format_exc(),
+                e,
+            )
+            raise e
+        finally:
+            active_session.reset(token)
+
+
 def event_with_session(
     method: Callable[Concatenate[K, Session, P], Coroutine[None, None, T]],
 ) -> Callable[Concatenate[K, P], Coroutine[None, None, T]]:
@@ -127,38 +249,22 @@ def event_with_session(
             args,
             kwargs,
         )
-        with Session(self.bot.engine) as session:
-            try:
-                return await method(self, session, *args, **kwargs)
-            except Exception as e:
-                logging.error(
-                    "[ERROR] name=%s, traceback: %s, exception: %s",
-                    method.__name__,
-                    traceback.format_exc(),
-                    e,
-                )
-                raise e
+        with unit_of_work(self.bot.sessions, method.__qualname__) as session:
+            return await method(self, session, *args, **kwargs)
 
     return wrapper
 
 
 def with_session(engine: Engine):
+    sessions = session_factory(engine)
+
     def decorator(
         function: Callable[Concatenate[Session, P], Coroutine[None, None, T]],
     ) -> Callable[P, Coroutine[None, None, T]]:
         @wraps(function)
         async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
-            with Session(engine) as session:
-                try:
-                    return await function(session, *args, **kwargs)
-                except Exception as e:
-                    logging.error(
-                        "[ERROR] name=%s, traceback: %s, exception: %s",
-                        function.__name__,
-                        traceback.format_exc(),
-                        e,
-                    )
-                    raise e
+            with unit_of_work(sessions, function.__qualname__) as session:
+                return await function(session, *args, **kwargs)
 
         return wrapper
 
@@ -175,17 +281,10 @@ def cog_with_session(
     @forge.delete("session")
     @forge.copy(method)
     async def wrapper(self, ctx: discord.Interaction, *args: P.args, **kwargs: P.kwargs) -> T:
-        with Session(self.bot.engine) as session:
-            try:
-                return await method(self, ctx, session, *args, **kwargs)
-            except Exception as e:
-                logging.error(
-                    "[ERROR] name=%s, traceback: %s, exception: %s",
-                    method.__name__,
-                    traceback.format_exc(),
-                    e,
-                )
-                raise e
+        command = getattr(ctx, "command", None)
+        name = command.qualified_name if command is not None else method.__qualname__
+        with unit_of_work(self.bot.sessions, name) as session:
+            return await method(self, ctx, session, *args, **kwargs)
 
     return wrapper
 
@@ -197,33 +296,119 @@ def user_registered(
 ):
     @wraps(method)
     async def wrapper(self, ctx: discord.Interaction, *args: P.args, **kwargs: P.kwargs) -> None:
-        with Session(self.bot.engine) as session:
-            user = Nation(base_types.UserId(ctx.user.id), session)
-            if not user.exists:
-                await ctx.response.send_message(
-                    ":x: You are not registered. Please use /start to register."
-                )
-                return
+        exists = await self.bot.run_with_session(
+            partial(user_exists, base_types.UserId(ctx.user.id))
+        )
+        if not exists:
+            await ctx.response.send_message(
+                ":x: You are not registered. Please use /start to register."
+            )
+            return
         await method(self, ctx, *args, **kwargs)
 
     return wrapper
 
 
+def command_name(data: Dict[str, Any]) -> str:
+    """The qualified name of the command that the data of an interaction invokes"""
+    names = [data.get("name", "unknown")]
+    options = data.get("options", [])
+    groups = (
+        discord.AppCommandOptionType.subcommand.value,
+        discord.AppCommandOptionType.subcommand_group.value,
+    )
+    while options and options[0].get("type") in groups:
+        names.append(options[0]["name"])
+        options = options[0].get("options", [])
+    return " ".join(names)
+
+
+class InstrumentedTree(app_commands.CommandTree):
+    """Command tree that times every application command that it dispatches. The tree handles
+    the errors of a command itself, so a command that fails is known by command_failed"""
+
+    async def _call(self, interaction: discord.Interaction) -> None:
+        if interaction.type is discord.InteractionType.autocomplete:
+            kind = "autocomplete"
+        else:
+            kind = "command"
+        name = command_name(interaction.data or {})  # type: ignore[arg-type]
+        with HANDLER_METRICS.track(kind, name):
+            await super()._call(interaction)
+        if interaction.command_failed:
+            HANDLER_METRICS.errors.inc((kind, name))
+
+
 class LeagueOfNations(commands.AutoShardedBot):
-    def __init__(self, engine: Engine):
+    def __init__(
+        self,
+        engine: Engine,
+        notifier_partition: int = 0,
+        notifier_partitions: int = 1,
+        shard_ids: Optional[List[int]] = None,
+        shard_count: Optional[int] = None,
+        async_engine: Optional[AsyncEngine] = None,
+        executor: Optional[SessionExecutor] = None,
+        pool_monitor: Optional[PoolMonitor] = None,
+        query_instrumentation: Optional[QueryInstrumentation] = None,
+        metrics_port: Optional[int] = None,
+    ):
         super().__init__(
             command_prefix="-",
             owner_id=251351879408287744,
             reconnect=True,
             case_insensitive=True,
             intents=discord.Intents.all(),
+            shard_ids=shard_ids,
+            shard_count=shard_count,
+            tree_cls=InstrumentedTree,
         )
         self.engine: Engine = engine
+        self.sessions: sessionmaker[Session] = session_factory(engine)
+        self.async_engine: Optional[AsyncEngine] = async_engine
+        self.executor: Optional[SessionExecutor] = executor
+        self.pool_monitor: Optional[PoolMonitor] = pool_monitor
+        self.query_instrumentation: Optional[QueryInstrumentation] = query_instrumentation
+        if query_instrumentation is not None and async_engine is not None:
+            query_instrumentation.attach(async_engine.sync_engine)
+        self.metrics_port: Optional[int] = metrics_port
+        self.metrics_server: Optional[asyncio.Server] = None
+        self.notifier_partition: int = notifier_partition
+        self.notifier_partitions: int = notifier_partitions
         self.notification_renderer = NotificationRenderer(self)
+        # the loop only keeps weak references to its tasks
+        self.background_tasks: List[asyncio.Task[None]] = []
 
     async def setup_hook(self) -> None:
         self.loop.create_task(self.ready())
 
+    async def close(self) -> None:
+        if self.query_instrumentation is not None:
+            self.query_instrumentation.report()
+        if self.metrics_server is not None:
+            self.metrics_server.close()
+        await super().close()
+
+    async def run_with_session(self, function: Callable[[Session], T]) -> T:
+        """Runs host layer work that needs a session, and commits it. When an async engine is
+        configured the queries are awaited through its driver, otherwise when an executor is
+        configured the work runs in one of its threads, so one slow query does not stall the
+        interactions of every other shard.
+
+        Args:
+            function (Callable[[Session], T]): the host layer work, receiving the session
+
+        Returns (T): the result of the function, any models in it remain loaded
+        """
+        if self.async_engine is not None:
+            return await run_async(self.async_engine, function)
+        if self.executor is not None:
+            return await self.executor.run(function)
+        with self.sessions() as session:
+            result = function(session)
+            session.commit()
+            return result
+
     def get_nation(self, user_id: int, session: Session) -> Nation:
         """Get the nation of the user with that user identifier
 
@@ -240,6 +425,9 @@ class LeagueOfNations(commands.AutoShardedBot):
     async def ready(self):
         await self.wait_until_ready()
 
+        self.background_tasks.append(self.loop.create_task(self.reload_nation_names()))
+        self.background_tasks.append(self.loop.create_task(self.rebuild_percentiles()))
+
         try:
             for cog in cogs:
                 await self.load_extension(f"view.cogs.{cog}")
@@ -252,6 +440,44 @@ class LeagueOfNations(commands.AutoShardedBot):
         self.notification_renderer.start()
         logging.info("*[CLIENT][NOTIFICATIONS][STATUS] READY")
 
+        if self.metrics_port is not None:
+            await self.serve_metrics(self.metrics_port)
+
+    async def reload_nation_names(self) -> None:
+        """Reloads the nation names every interval, so that the nations founded by other clusters
+        are completed too. The names are fetched through the session and indexed in a thread, so
+        the event loop is not blocked by the build"""
+        while not self.is_closed():
+            try:
+                fetched = await self.run_with_session(names.fetch)
+                nations = await asyncio.to_thread(NATION_NAMES.rebuild, fetched)
+                logging.info("*[CLIENT][NATION_NAMES][LOADED] Nations=%s", nations)
+            except Exception:
+                logging.exception("[CLIENT][NATION_NAMES][ERROR]")
+            await asyncio.sleep(names.RELOAD_INTERVAL.total_seconds())
+
+    async def rebuild_percentiles(self) -> None:
+        """Rebuilds the percentiles of the statistics pages every interval, the pages read the
+        index in between"""
+        while not self.is_closed():
+            try:
+                nations = await self.run_with_session(PERCENTILES.load)
+                logging.debug("[CLIENT][PERCENTILES][LOADED] Nations=%s", nations)
+            except Exception:
+                logging.exception("[CLIENT][PERCENTILES][ERROR]")
+            await asyncio.sleep(REBUILD_INTERVAL.total_seconds())
+
+    async def serve_metrics(self, port: int) -> None:
+        """Exports the statistics of the database alongside the latency of the handlers, and serves
+        them on the loopback interface at /metrics for a local Prometheus to scrape"""
+        if self.pool_monitor is not None:
+            metrics.REGISTRY.collector(metrics.collect_pool(self.pool_monitor))
+        if self.executor is not None:
+            metrics.REGISTRY.collector(metrics.collect_executor(self.executor))
+        if self.query_instrumentation is not None:
+            metrics.REGISTRY.collector(metrics.collect_queries(self.query_instrumentation))
+        self.metrics_server = await metrics.serve(metrics.REGISTRY, "127.0.0.1", port)
+
     def ensure_user(self, user: int) -> CheckEvent:
         async def check(_: discord.ui.View, interaction: discord.Interaction) -> bool:
             return interaction.user.id == user
@@ -259,6 +485,109 @@ class LeagueOfNations(commands.AutoShardedBot):
         return check
 
 
+def cluster_shard_ids(cluster: int, clusters: int, shard_count: int) -> List[int]:
+    """Splits the shards into contiguous ranges, one range for each cluster
+
+    Args:
+        cluster (int): the index of the cluster
+        clusters (int): the number of clusters
+        shard_count (int): the total number of shards
+
+    Returns (List[int]): the shards that the cluster connects
+
+    Raises:
+        ValueError: when the cluster is not one of the clusters, or a cluster would have no shard
+    """
+    if not 0 <= cluster < clusters:
+        raise ValueError(f"Cluster {cluster} is not in the range of {clusters}")
+    if shard_count < clusters:
+        raise ValueError(f"{shard_count} shards can not be split between {clusters} clusters")
+    return list(range(cluster * shard_count // clusters, (cluster + 1) * shard_count // clusters))
+
+
+def logging_settings_from_args(args: argparse.Namespace) -> LoggingSettings:
+    """Reads the configuration of the logs from the command line, a sample is given as
+    LOGGER=RATE, for example host.notifier=0.1 keeps one in ten of its records below WARNING"""
+    return LoggingSettings(
+        file=args.log,
+        level=args.level,
+        queue=args.log_queue,
+        structured=args.log_json,
+        sampling=dict(sample.split("=", 1) for sample in args.log_sample),
+    )
+
+
+def create_executor(engine: Engine, threads: int) -> Optional[SessionExecutor]:
+    if threads < 1:
+        return None
+    return SessionExecutor(engine, threads)
+
+
+def pool_settings_from_args(args: argparse.Namespace) -> PoolSettings:
+    """Reads the pool tuning from the command line, falling back to the environment"""
+
+    def option(value: Any, variable: str) -> Any:
+        return value if value is not None else os.getenv(variable)
+
+    return PoolSettings(
+        size=option(args.pool_size, "DATABASE_POOL_SIZE"),
+        max_overflow=option(args.pool_max_overflow, "DATABASE_POOL_MAX_OVERFLOW"),
+        timeout=option(args.pool_timeout, "DATABASE_POOL_TIMEOUT"),
+        recycle=option(args.pool_recycle, "DATABASE_POOL_RECYCLE"),
+        pre_ping=args.pool_pre_ping or os.getenv("DATABASE_POOL_PRE_PING", "false"),
+    )
+
+
+def create_async_engine_from_env(pool: PoolSettings) -> Optional[AsyncEngine]:
+    """Creates the async engine when ASYNC_DATABASE_URL is set, the url must name an async
+    driver for the same database as DATABASE_URL, for example sqlite+aiosqlite:///db.sqlite3"""
+    url = os.getenv("ASYNC_DATABASE_URL")
+    if url is None:
+        return None
+    return create_async_engine(url, echo=False, **pool.engine_arguments())
+
+
+def run_cluster(
+    cluster: int,
+    clusters: int,
+    shard_count: int,
+    token: str,
+    url: str,
+    log: LoggingSettings,
+    threads: int,
+    pool: PoolSettings,
+    slow_query: float,
+    metrics_port: Optional[int],
+) -> None:
+    """Entrypoint of a cluster process, which runs its own bot over its range of the shards and
+    dispatches its own partition of the notifications, and those of any cluster that stopped.
+    Processes share nothing but the database.
+    """
+    if log.file:
+        log = log.model_copy(update={"file": log.file.replace(".log", f".{cluster}.log")})
+    listener = configure_logging(log)
+    if listener is not None:
+        atexit.register(listener.stop)
+    shard_ids = cluster_shard_ids(cluster, clusters, shard_count)
+    logging.info("*[CLUSTER][%s][STARTING] Shards=%s", cluster, shard_ids)
+    pool_monitor = PoolMonitor()
+    engine = create_database_engine(url, pool, pool_monitor)
+    query_instrumentation = QueryInstrumentation(slow_query)
+    query_instrumentation.attach(engine)
+    LeagueOfNations(
+        engine,
+        notifier_partition=cluster,
+        notifier_partitions=clusters,
+        shard_ids=shard_ids,
+        shard_count=shard_count,
+        async_engine=create_async_engine_from_env(pool),
+        executor=create_executor(engine, threads),
+        pool_monitor=pool_monitor,
+        query_instrumentation=query_instrumentation,
+        metrics_port=metrics_port + cluster if metrics_port is not None else None,
+    ).run(token=token)
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(prog="lon", description="Run the league of nations bot")
     parser.add_argument("--log", type=str)
@@ -268,22 +597,164 @@ if __name__ == "__main__":
         choices=logging.getLevelNamesMapping().keys(),
         default="INFO",
     )
+    parser.add_argument(
+        "--log-queue",
+        action="store_true",
+        help="hand the records to a thread that writes them, off the event loop",
+    )
+    parser.add_argument("--log-json", action="store_true", help="write the records as JSON lines")
+    parser.add_argument(
+        "--log-sample",
+        action="append",
+        default=[],
+        metavar="LOGGER=RATE",
+        help="keep only that share of the records below WARNING of the logger",
+    )
     parser.add_argument("-db", "--database")
+    parser.add_argument(
+        "--notifier-partitions",
+        type=int,
+        default=1,
+        help="number of processes that share the dispatch of notifications",
+    )
+    parser.add_argument(
+        "--notifier-partition",
+        type=int,
+        default=0,
+        help="the partition of notifications that this process dispatches",
+    )
+    parser.add_argument(
+        "--clusters",
+        type=int,
+        default=1,
+        help="number of processes to run, each connecting a range of the shards",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        help="total number of shards, defaults to the number of clusters in cluster mode",
+    )
+    parser.add_argument(
+        "--db-threads",
+        type=int,
+        default=0,
+        help="number of threads that run database work off the event loop, 0 runs it inline",
+    )
+    parser.add_argument(
+        "--pool-size", type=int, help="connections kept open in the pool [DATABASE_POOL_SIZE]"
+    )
+    parser.add_argument(
+        "--pool-max-overflow",
+        type=int,
+        help="connections opened beyond the pool size under load [DATABASE_POOL_MAX_OVERFLOW]",
+    )
+    parser.add_argument(
+        "--pool-timeout",
+        type=float,
+        help="seconds to wait for a connection before failing [DATABASE_POOL_TIMEOUT]",
+    )
+    parser.add_argument(
+        "--pool-recycle",
+        type=int,
+        help="seconds after which a connection is replaced [DATABASE_POOL_RECYCLE]",
+    )
+    parser.add_argument(
+        "--pool-pre-ping",
+        action="store_true",
+        default=None,
+        help="test connections for liveness on checkout [DATABASE_POOL_PRE_PING]",
+    )
+    parser.add_argument(
+        "--slow-query",
+        type=float,
+        default=0.25,
+        help="seconds after which a statement is logged as a slow query",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="serve metrics at http://127.0.0.1:PORT/metrics, each cluster adds its index",
+    )
+    parser.add_argument(
+        "--migrate",
+        action="store_true",
+        help="upgrade the schema of the database and exit, without connecting to discord",
+    )
+    parser.add_argument(
+        "--rebuild-statistics",
+        action="store_true",
+        help="recompute the statistics of every nation and exit, run by a scheduled batch job",
+    )
 
     args = parser.parse_args()
-    if args.log:
-        assert args.log.endswith(".log"), "LOG FILE MUST END WITH .log"
-        logging.basicConfig(filename=args.log, level=logging.getLevelNamesMapping()[args.level])
-    else:
-        logging.basicConfig(stream=sys.stdout, level=logging.getLevelNamesMapping()[args.level])
+    log = logging_settings_from_args(args)
+    listener = configure_logging(log)
+    if listener is not None:
+        atexit.register(listener.stop)
     load_dotenv()
 
     TOKEN = os.getenv("DISCORD_TOKEN")
     URL = os.getenv("DATABASE_URL")
-    assert TOKEN is not None, "MISSING TOKEN IN .env FILE"
     assert URL is not None, "MISSING DATABASE_URL IN .env FILE"
 
-    engine = create_engine(URL, echo=False)
+    pool = pool_settings_from_args(args)
+    pool_monitor = PoolMonitor()
+    engine = create_database_engine(URL, pool, pool_monitor)
+    query_instrumentation = QueryInstrumentation(args.slow_query)
+    query_instrumentation.attach(engine)
+
+    applied = migrate(engine)
+    logging.info("*[DATABASE][MIGRATED] Applied=%s", applied)
+    with engine.begin() as connection:
+        create_search_index(connection)
+    if args.rebuild_statistics:
+        with Session(engine) as session, session.begin():
+            rebuilt = statistics.rebuild(session)
+        logging.info("*[DATABASE][STATISTICS][REBUILT] Nations=%s", rebuilt)
+        sys.exit(0)
+    if args.migrate:
+        sys.exit(0)
+    assert TOKEN is not None, "MISSING TOKEN IN .env FILE"
 
-    host.base_models.Base.metadata.create_all(engine)
-    LeagueOfNations(engine).run(token=TOKEN)
+    if args.clusters > 1:
+        shard_count = args.shards if args.shards is not None else args.clusters
+        assert shard_count >= args.clusters, "THERE MUST BE AT LEAST ONE SHARD PER CLUSTER"
+        engine.dispose()
+
+        context = multiprocessing.get_context("spawn")
+        processes = [
+            context.Process(
+                target=run_cluster,
+                args=(
+                    cluster,
+                    args.clusters,
+                    shard_count,
+                    TOKEN,
+                    URL,
+                    log,
+                    args.db_threads,
+                    pool,
+                    args.slow_query,
+                    args.metrics_port,
+                ),
+                name=f"cluster-{cluster}",
+            )
+            for cluster in range(args.clusters)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            logging.info("*[CLUSTER][%s][EXITED] Code=%s", process.name, process.exitcode)
+    else:
+        LeagueOfNations(
+            engine,
+            notifier_partition=args.notifier_partition,
+            notifier_partitions=args.notifier_partitions,
+            shard_count=args.shards,
+            async_engine=create_async_engine_from_env(pool),
+            executor=create_executor(engine, args.db_threads),
+            pool_monitor=pool_monitor,
+            query_instrumentation=query_instrumentation,
+            metrics_port=args.metrics_port,
+        ).run(token=TOKEN)
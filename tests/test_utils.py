@@ -1,14 +1,16 @@
 import string
-from typing import ParamSpec
+from contextlib import contextmanager
+from typing import Iterator, List, ParamSpec
 
 from sqlalchemy.pool import StaticPool
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
 
 from host.gameplay_settings import GameplaySettings
 import host.nation
 import host.base_models
 from host.base_types import UserId
+from host.database import session_factory
 
 P = ParamSpec("P")
 
@@ -19,9 +21,38 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# the tests run with the sessions of the bot, which autoflush and keep their models after commit
+TestingSessionLocal = session_factory(engine)
 host.base_models.Base.metadata.create_all(bind=engine)
 
+
+@contextmanager
+def count_queries() -> Iterator[List[str]]:
+    """Collects the statements that are sent to the testing database inside the block"""
+    statements: List[str] = []
+
+    def record(_conn, _cursor, statement, _parameters, _context, _executemany) -> None:
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+@contextmanager
+def assert_max_queries(maximum: int) -> Iterator[List[str]]:
+    """Fails when the block sends more than the maximum number of statements, which is how an N+1
+    query introduced into the host layer shows up"""
+    with count_queries() as statements:
+        yield statements
+    assert len(statements) <= maximum, (
+        f"{len(statements)} statements were sent, expected at most {maximum}:\n"
+        + "\n".join(statements)
+    )
+
+
 GameplaySettings.metadata.minimum_nation_name_length = 1
 GameplaySettings.metadata.maximum_nation_name_length = 500
 
@@ -0,0 +1,22 @@
+import pytest
+
+from lon import cluster_shard_ids
+
+
+@pytest.mark.parametrize(
+    "clusters, shard_count", [(1, 1), (2, 5), (3, 10), (4, 7), (7, 7), (3, 100)]
+)
+def test_shard_ranges_cover_every_shard_once(clusters, shard_count):
+    ranges = [cluster_shard_ids(cluster, clusters, shard_count) for cluster in range(clusters)]
+    assert [shard for shards in ranges for shard in shards] == list(range(shard_count))
+    assert all(shards == list(range(shards[0], shards[-1] + 1)) for shards in ranges)
+    sizes = [len(shards) for shards in ranges]
+    assert max(sizes) - min(sizes) <= 1
+
+
+@pytest.mark.parametrize(
+    "cluster, clusters, shard_count", [(-1, 2, 4), (2, 2, 4), (0, 0, 4), (0, 3, 2)]
+)
+def test_invalid_cluster_rejected(cluster, clusters, shard_count):
+    with pytest.raises(ValueError):
+        cluster_shard_ids(cluster, clusters, shard_count)
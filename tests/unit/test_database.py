@@ -0,0 +1,144 @@
+import asyncio
+import contextvars
+import threading
+from functools import partial
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+import host.base_models
+from host.base_types import UserId
+from host.database import (
+    PoolMonitor,
+    PoolSettings,
+    SessionExecutor,
+    create_database_engine,
+    run_async,
+)
+from host.nation import Nation, StartResponses, user_exists
+
+
+@pytest.fixture
+def async_engine(tmp_path) -> AsyncEngine:
+    pytest.importorskip("aiosqlite")
+    path = tmp_path / "lon.sqlite3"
+    host.base_models.Base.metadata.create_all(create_engine(f"sqlite:///{path}"))
+    return create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+
+def test_host_layer_runs_on_async_session(async_engine):
+    async def scenario():
+        start = partial(Nation.start, UserId(1), "Async Nation")
+        assert await run_async(async_engine, start) is StartResponses.SUCCESS
+        assert await run_async(async_engine, partial(user_exists, UserId(1)))
+        return await run_async(
+            async_engine, lambda session: Nation(UserId(1), session).bank.funds
+        )
+
+    assert asyncio.run(scenario()) is not None
+
+
+def test_returned_models_stay_loaded(async_engine):
+    async def scenario():
+        await run_async(async_engine, partial(Nation.start, UserId(1), "Loaded"))
+        return await run_async(
+            async_engine, partial(Nation.search_for_nations, "Load", with_like=True)
+        )
+
+    nations = asyncio.run(scenario())
+    assert [nation.nation for nation in nations] == ["Loaded"]
+
+
+@pytest.fixture
+def executor(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'lon.sqlite3'}")
+    host.base_models.Base.metadata.create_all(engine)
+    executor = SessionExecutor(engine, workers=1)
+    yield executor
+    executor.shutdown()
+
+
+def test_executor_runs_in_worker_thread(executor):
+    async def scenario():
+        await executor.run(partial(Nation.start, UserId(1), "Threaded"))
+        return await executor.run(
+            lambda session: (threading.current_thread().name, user_exists(UserId(1), session))
+        )
+
+    thread, exists = asyncio.run(scenario())
+    assert thread != threading.current_thread().name
+    assert exists
+
+
+def test_executor_statistics(executor):
+    release = threading.Event()
+
+    def blocking(_):
+        release.wait()
+
+    async def scenario():
+        calls = [asyncio.ensure_future(executor.run(blocking)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        assert executor.statistics.running == 1
+        assert executor.statistics.queued == 2
+        release.set()
+        await asyncio.gather(*calls)
+
+    asyncio.run(scenario())
+    assert executor.statistics.submitted == executor.statistics.completed == 3
+    assert executor.statistics.queued == executor.statistics.running == 0
+    assert executor.statistics.max_wait >= executor.statistics.mean_wait > 0
+
+
+def test_executor_keeps_context(executor):
+    variable: contextvars.ContextVar[str] = contextvars.ContextVar("variable")
+
+    async def scenario():
+        variable.set("command")
+        return await executor.run(lambda _: variable.get())
+
+    assert asyncio.run(scenario()) == "command"
+
+
+@pytest.fixture
+def monitor() -> PoolMonitor:
+    return PoolMonitor()
+
+
+@pytest.fixture
+def monitored_engine(tmp_path, monitor):
+    settings = PoolSettings(size=2, max_overflow=1, timeout=5, pre_ping=True)
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'lon.sqlite3'}", settings, monitor)
+    host.base_models.Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def test_pool_settings(monitored_engine, monitor):
+    assert monitored_engine.pool.size() == 2
+    assert monitored_engine.pool.timeout() == 5
+    assert monitor.statistics.capacity == 3
+
+
+def test_pool_saturation(monitored_engine, monitor):
+    first = monitored_engine.connect()
+    second = monitored_engine.connect()
+    assert monitor.statistics.saturation == pytest.approx(2 / 3)
+    first.close()
+    second.close()
+    assert monitor.statistics.checked_out == 0
+    assert monitor.statistics.peak_checked_out == 2
+    assert monitor.statistics.max_checkout_latency >= monitor.statistics.mean_checkout_latency > 0
+
+
+def test_connection_held_across_await(monitored_engine, monitor):
+    async def scenario():
+        with monitored_engine.connect():
+            pass
+        assert monitor.statistics.held_across_await == 0
+        with monitored_engine.connect():
+            await asyncio.sleep(0)
+        assert monitor.statistics.held_across_await == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,40 @@
+from host.nation.types.boosts import BoostsLookup
+from host.nation.types.improvements import IMPROVEMENT_NAMES, Improvements
+from host.nation.types.transactions import PurchaseResult, SellResult
+from tests.test_utils import assert_max_queries
+
+
+def test_improvements_counted_per_nation(player, session):
+    first, second = (Improvements[name] for name in IMPROVEMENT_NAMES[:2])
+    assert player.public_works.buy(first, 2) is PurchaseResult.SUCCESS
+    assert player.public_works.buy(second, 1) is PurchaseResult.SUCCESS
+    assert player.public_works.buy(first, 1) is PurchaseResult.SUCCESS
+
+    session.expire_all()
+    with assert_max_queries(1):
+        owned = player.public_works.owned
+    assert {name: collection.amount for name, collection in owned.items()} == {
+        first.name: 3,
+        second.name: 1,
+    }
+
+
+def test_boost_is_sum_of_improvement_boosts(player):
+    bought = {name: index + 1 for index, name in enumerate(IMPROVEMENT_NAMES[:4])}
+    for name, amount in bought.items():
+        player.public_works.buy(Improvements[name], amount)
+    expected = sum(
+        (Improvements[name].boosts.multiply(amount) for name, amount in bought.items()),
+        BoostsLookup(),
+    )
+    boost = player.public_works.boost()
+    for field in BoostsLookup.model_fields:
+        assert abs(getattr(boost, field) - getattr(expected, field)) < 1e-9
+
+
+def test_sell_improvements(player):
+    improvement = Improvements[IMPROVEMENT_NAMES[0]]
+    player.public_works.buy(improvement, 2)
+    assert player.public_works.sell(improvement, 3) is SellResult.INSUFFICIENT_AMOUNT
+    assert player.public_works.sell(improvement, 2) is SellResult.SUCCESS
+    assert player.public_works.owned == {}
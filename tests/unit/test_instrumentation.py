@@ -0,0 +1,50 @@
+import logging
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from host.instrumentation import UNATTRIBUTED, QueryInstrumentation, command_scope
+from tests.test_utils import engine
+
+
+@pytest.fixture
+def instrumentation():
+    instrumentation = QueryInstrumentation(slow_query=60)
+    instrumentation.attach(engine)
+    yield instrumentation
+    instrumentation.detach(engine)
+
+
+def test_statements_attributed_to_command(instrumentation):
+    with engine.connect() as connection:
+        with command_scope("balance"):
+            connection.execute(text("SELECT 1"))
+            connection.execute(text("SELECT 2"))
+        connection.execute(text("SELECT 3"))
+
+    balance = instrumentation.commands["balance"]
+    assert balance.statements == 2
+    assert balance.total_time >= balance.slowest_time > 0
+    assert balance.slowest_statement in ("SELECT 1", "SELECT 2")
+    assert instrumentation.commands[UNATTRIBUTED].statements == 1
+
+
+def test_slow_query_logged(instrumentation, caplog):
+    instrumentation.slow_query = 0
+    with caplog.at_level(logging.WARNING), engine.connect() as connection:
+        with command_scope("search nation"):
+            connection.execute(text("SELECT 1"))
+    assert "[DATABASE][SLOW_QUERY] Command=search nation" in caplog.text
+
+
+def test_failed_statement_leaves_no_start_behind(instrumentation):
+    with engine.connect() as connection:
+        with command_scope("start"):
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    connection.execute(text("SELECT * FROM missing"))
+            connection.execute(text("SELECT 1"))
+        assert "query_started" not in connection.info
+
+    assert instrumentation.commands["start"].statements == 1
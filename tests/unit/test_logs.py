@@ -0,0 +1,110 @@
+import json
+import logging
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from host.instrumentation import command_scope
+from host.logs import Lazy, LoggingSettings, SamplingFilter, configure_logging
+
+
+@pytest.fixture
+def logger():
+    logger = logging.getLogger("tests.logs")
+    logger.propagate = False
+    yield logger
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def record(name: str, level: int = logging.DEBUG) -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 0, "message", None, None)
+
+
+def test_sampling_keeps_share_of_each_logger():
+    sampling = SamplingFilter({"host.notifier": 0.25})
+    kept = [sampling.filter(record("host.notifier.lease")) for _ in range(8)]
+    assert kept.count(True) == 2
+    assert sampling.filter(record("host.notifier", logging.WARNING))
+    assert all(sampling.filter(record("host.nation")) for _ in range(8))
+
+
+def test_queue_mode_writes_json_off_the_caller_thread(logger, tmp_path):
+    path = tmp_path / "lon.log"
+    listener = configure_logging(
+        LoggingSettings(file=str(path), level="DEBUG", queue=True, structured=True), logger
+    )
+    assert listener is not None
+    writers = []
+    file_handler = listener.handlers[0]
+    emit = file_handler.emit
+    file_handler.emit = lambda entry: (writers.append(threading.get_ident()), emit(entry))
+
+    with command_scope("balance"):
+        logger.debug("[BANK][ADD] Amount=%s", 10)
+    listener.stop()
+
+    entry = json.loads(path.read_text().splitlines()[0])
+    assert entry["message"] == "[BANK][ADD] Amount=10"
+    assert entry["level"] == "DEBUG"
+    assert entry["command"] == "balance"
+    assert writers and threading.get_ident() not in writers
+
+
+def test_queue_mode_formats_on_the_caller_thread(logger, tmp_path):
+    path = tmp_path / "lon.log"
+    listener = configure_logging(
+        LoggingSettings(file=str(path), level="DEBUG", queue=True, structured=True), logger
+    )
+    assert listener is not None
+    evaluated = []
+
+    logger.debug("[BANK][ADD] Treasury=%s", Lazy(lambda: evaluated.append(threading.get_ident())))
+    try:
+        raise ValueError("unavailable")
+    except ValueError:
+        logger.exception("[BANK][ERROR]")
+    listener.stop()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert evaluated == [threading.get_ident()]
+    assert "ValueError: unavailable" in lines[1]["exception"]
+
+
+def test_queue_mode_logs_the_value_at_the_time_of_logging(logger, tmp_path):
+    path = tmp_path / "lon.log"
+    listener = configure_logging(
+        LoggingSettings(file=str(path), level="DEBUG", queue=True, structured=True), logger
+    )
+    assert listener is not None
+    model = SimpleNamespace(treasury=3000000)
+
+    model.treasury += 1000
+    logger.debug("[BANK][ADD] Treasury=%s", Lazy(lambda: model.treasury))
+    model.treasury += 1000
+    logger.debug("[BANK][ADD] Treasury=%s", Lazy(lambda: model.treasury))
+    listener.stop()
+
+    messages = [json.loads(line)["message"] for line in path.read_text().splitlines()]
+    assert messages == ["[BANK][ADD] Treasury=3001000", "[BANK][ADD] Treasury=3002000"]
+
+
+def test_direct_mode_without_queue(logger, tmp_path):
+    path = tmp_path / "lon.log"
+    assert configure_logging(LoggingSettings(file=str(path), level="INFO"), logger) is None
+    logger.debug("dropped")
+    logger.info("written")
+    assert path.read_text() == "INFO:tests.logs:written\n"
+
+
+def test_lazy_argument_evaluated_only_when_emitted(logger, tmp_path):
+    configure_logging(LoggingSettings(file=str(tmp_path / "lon.log"), level="INFO"), logger)
+    calls = []
+    treasury = Lazy(lambda: calls.append(1) or 100)
+    logger.debug("[BANK][ADD] Treasury=%s", treasury)
+    assert calls == []
+    logger.info("[BANK][ADD] Treasury=%s", treasury)
+    assert calls == [1]
+    assert (tmp_path / "lon.log").read_text() == "INFO:tests.logs:[BANK][ADD] Treasury=100\n"
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from host.database import PoolMonitor, PoolSettings, create_database_engine
+from host.metrics import HandlerMetrics, MetricsRegistry, collect_pool, serve
+from lon import command_name
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    histogram = registry.histogram("latency_seconds", "latency", ("handler",))
+    for value in (0.004, 0.02, 0.02, 20):
+        histogram.observe(("balance",), value)
+    text = registry.render()
+    assert 'latency_seconds_bucket{handler="balance",le="0.005"} 1' in text
+    assert 'latency_seconds_bucket{handler="balance",le="0.025"} 3' in text
+    assert 'latency_seconds_bucket{handler="balance",le="10.0"} 3' in text
+    assert 'latency_seconds_bucket{handler="balance",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{handler="balance"} 4' in text
+    assert "# TYPE latency_seconds histogram" in text
+
+
+def test_duplicate_metric_rejected(registry):
+    registry.counter("errors_total", "errors")
+    with pytest.raises(ValueError):
+        registry.gauge("errors_total", "errors")
+
+
+def test_handler_tracked_on_success_and_failure(registry):
+    handlers = HandlerMetrics(registry)
+
+    async def succeed() -> int:
+        assert handlers.in_flight.value(("callback", "buy.confirm")) == 1
+        return 1
+
+    async def fail() -> None:
+        raise RuntimeError("discord is unavailable")
+
+    assert asyncio.run(handlers.timed("callback", "buy.confirm", succeed)()) == 1
+    with pytest.raises(RuntimeError):
+        asyncio.run(handlers.timed("callback", "buy.confirm", fail)())
+
+    labels = ("callback", "buy.confirm")
+    assert handlers.latency.count(labels) == 2
+    assert handlers.errors.value(labels) == 1
+    assert handlers.in_flight.value(labels) == 0
+
+
+def test_command_name_of_subcommand():
+    data = {
+        "name": "aid",
+        "options": [{"name": "send", "type": 1, "options": [{"name": "amount", "type": 4}]}],
+    }
+    assert command_name(data) == "aid send"
+    assert command_name({"name": "balance"}) == "balance"
+
+
+def test_pool_statistics_collected(registry, tmp_path):
+    monitor = PoolMonitor()
+    engine = create_database_engine(
+        f"sqlite:///{tmp_path / 'lon.sqlite3'}", PoolSettings(size=2, max_overflow=0), monitor
+    )
+    registry.collector(collect_pool(monitor))
+    with engine.connect():
+        text = registry.render()
+    engine.dispose()
+    assert "lon_pool_checked_out 1.0" in text
+    assert "lon_pool_saturation 0.5" in text
+
+
+def test_metrics_served(registry):
+    registry.counter("errors_total", "errors").inc()
+
+    async def scrape(path: str) -> str:
+        server = await serve(registry, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        response = (await reader.read()).decode()
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return response
+
+    response = asyncio.run(scrape("/metrics"))
+    assert response.startswith("HTTP/1.1 200 OK")
+    assert "errors_total 1.0" in response
+    assert asyncio.run(scrape("/")).startswith("HTTP/1.1 404")
@@ -0,0 +1,198 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, delete, func, insert, inspect, select, text, tuple_
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+import host.alliance.models as alliance_models
+from host.base_models import Base, NotificationModel, SchemaVersionModel
+from host.base_types import UserId
+from host.gameplay_settings import GameplaySettings
+from host.migrations import MIGRATIONS, MigrationError, migrate, schema_version
+from host.nation import Nation, models, statistics
+from host.nation.types import resources
+from host.nation.types.improvements import IMPROVEMENT_NAMES
+from tests.test_utils import engine
+
+NOW = datetime(2024, 1, 1)
+
+HOT_QUERIES = {
+    "trades_received": select(models.TradeModel).where(models.TradeModel.recipient == 1),
+    "trade_offers_received": select(models.TradeRequestModel)
+    .where(models.TradeRequestModel.recipient == 1)
+    .order_by(models.TradeRequestModel.sponsor),
+    "aid_sponsored": select(models.AidModel).where(models.AidModel.sponsor == 1),
+    "aid_received": select(models.AidModel).where(models.AidModel.recipient == 1),
+    "aid_accepted": select(models.AidModel).where(models.AidModel.accepted < NOW),
+    "aid_requests_sponsored": select(models.AidRequestModel).where(
+        models.AidRequestModel.sponsor == 1
+    ),
+    "aid_requests_received": select(models.AidRequestModel).where(
+        models.AidRequestModel.recipient == 1
+    ),
+    "aid_requests_expired": select(models.AidRequestModel).where(
+        models.AidRequestModel.expires < NOW
+    ),
+    "notifications_due": select(NotificationModel).where(NotificationModel.date <= NOW),
+    "alliance_of_member": select(alliance_models.AllianceMemberModel).where(
+        alliance_models.AllianceMemberModel.user_id == 1
+    ),
+    "leaderboard": select(models.NationStatsModel.user_id)
+    .where(tuple_(models.NationStatsModel.revenue, models.NationStatsModel.user_id) < tuple_(10, 5))
+    .order_by(models.NationStatsModel.revenue.desc(), models.NationStatsModel.user_id.desc()),
+    "rank": select(func.count()).where(models.NationStatsModel.treasury > 10),
+    "leaderboard_offset": select(
+        func.count().filter(models.NationStatsModel.revenue > 10), func.count()
+    ).where(
+        tuple_(models.NationStatsModel.revenue, models.NationStatsModel.user_id) > tuple_(10, 5)
+    ),
+}
+
+
+def query_plan(statement) -> str:
+    compiled = statement.compile(engine)
+    parameters = tuple(compiled.params[name] for name in compiled.positiontup)
+    with engine.connect() as connection:
+        plan = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled), parameters)
+        return " ".join(row[-1] for row in plan)
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_uses_index(name):
+    plan = query_plan(HOT_QUERIES[name])
+    assert "USING INDEX" in plan or "USING COVERING INDEX" in plan, plan
+    assert "TEMP B-TREE" not in plan, plan
+
+
+def existing_database():
+    existing = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(existing)
+    with existing.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.drop(connection)
+    return existing
+
+
+def test_migrate_fresh_database():
+    fresh = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    assert migrate(fresh) == [migration.version for migration in MIGRATIONS]
+
+
+def test_migrate_adds_indexes_to_existing_database():
+    existing = existing_database()
+    assert inspect(existing).get_indexes("AidRequests") == []
+
+    assert migrate(existing) == [migration.version for migration in MIGRATIONS]
+    indexed = {index["name"] for index in inspect(existing).get_indexes("AidRequests")}
+    assert {"ix_AidRequests_sponsor", "ix_AidRequests_recipient"} <= indexed
+    with existing.connect() as connection:
+        assert schema_version(connection) == MIGRATIONS[-1].version
+
+    assert migrate(existing) == []
+
+
+def test_migrate_refuses_duplicate_nation_names():
+    existing = existing_database()
+    with existing.begin() as connection:
+        for user_id, nation in ((1, "Twinland"), (2, "twinland")):
+            connection.execute(
+                insert(models.MetadataModel).values(
+                    user_id=user_id, nation=nation, flag="", emoji="", created=NOW
+                )
+            )
+    with pytest.raises(MigrationError):
+        migrate(existing)
+    with existing.connect() as connection:
+        assert schema_version(connection) == 1
+
+
+def test_migrate_provisions_ministries_of_existing_nations():
+    existing = existing_database()
+    with existing.begin() as connection:
+        connection.execute(
+            insert(models.MetadataModel).values(
+                user_id=1, nation="Oldland", flag="", emoji="", created=NOW
+            )
+        )
+    migrate(existing)
+    with Session(existing) as session:
+        nation = Nation(UserId(1), session)
+        assert nation.bank.name
+        assert nation.government.type is not None
+        assert nation.interior.land.amount > 0
+        assert len(nation.trade.resources) == GameplaySettings.trade.resources_per_nation
+        assert nation.statistics.measure() == {
+            metric: nation.statistics[metric] for metric in statistics.METRICS
+        }
+
+
+def test_migrate_packs_resource_rows():
+    existing = existing_database()
+    names = resources.RESOURCE_NAMES
+    with existing.begin() as connection:
+        connection.execute(
+            insert(models.MetadataModel).values(
+                user_id=1, nation="Rowland", flag="", emoji="", created=NOW
+            )
+        )
+        connection.execute(text("CREATE TABLE Resources (user_id INTEGER, resource VARCHAR)"))
+        connection.execute(
+            text("INSERT INTO Resources VALUES (1, :first), (1, :last)"),
+            {"first": names[0], "last": names[-1]},
+        )
+    migrate(existing)
+    assert not inspect(existing).has_table("Resources")
+    with Session(existing) as session:
+        assert Nation(UserId(1), session).trade.resources == [names[0], names[-1]]
+
+
+def test_migrate_counts_improvement_rows():
+    existing = existing_database()
+    first, second = IMPROVEMENT_NAMES[:2]
+    with existing.begin() as connection:
+        connection.execute(
+            insert(models.MetadataModel).values(
+                user_id=1, nation="Buildland", flag="", emoji="", created=NOW
+            )
+        )
+        connection.execute(
+            text("CREATE TABLE Improvements (user_id INTEGER, name VARCHAR, amount INTEGER)")
+        )
+        connection.execute(
+            text("INSERT INTO Improvements VALUES (1, :first, 3), (1, :second, 2)"),
+            {"first": first, "second": second},
+        )
+    migrate(existing)
+    assert not inspect(existing).has_table("Improvements")
+    with Session(existing) as session:
+        owned = Nation(UserId(1), session).public_works.owned
+        assert {name: collection.amount for name, collection in owned.items()} == {
+            first: 3,
+            second: 2,
+        }
+
+
+def test_migrate_scores_strength_of_existing_statistics():
+    existing = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    migrate(existing)
+    with Session(existing) as session:
+        Nation.start(UserId(1), "Strongland", session)
+    with existing.begin() as connection:
+        connection.execute(text("DROP INDEX ix_NationStats_strength"))
+        connection.execute(text("ALTER TABLE NationStats DROP COLUMN strength"))
+        connection.execute(text("UPDATE NationImprovements SET amounts = '[2, 1]'"))
+        connection.execute(delete(SchemaVersionModel).where(SchemaVersionModel.version >= 7))
+
+    assert migrate(existing) == [7, 8]
+    with Session(existing) as session:
+        nation = Nation(UserId(1), session)
+        assert nation.strength > 0
+        assert nation.strength == nation.statistics.measure()["strength"]
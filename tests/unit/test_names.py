@@ -0,0 +1,85 @@
+from host.nation import Nation
+from host.nation.names import NATION_NAMES, NationNames, levenshtein
+from tests.test_utils import UserGenerator
+
+
+def names(*nations: str, completions: int = 25) -> NationNames:
+    index = NationNames(completions)
+    for nation in nations:
+        index.add(nation)
+    return index
+
+
+def test_completes_any_word_ignoring_case():
+    index = names("Kingdom of Vexoria", "Vexland", "Republic of Ardent")
+    assert index.complete("vex") == ["Vexland", "Kingdom of Vexoria"]
+    assert index.complete("KINGDOM") == ["Kingdom of Vexoria"]
+    assert index.complete("of ") == ["Kingdom of Vexoria", "Republic of Ardent"]
+    assert index.complete("xyz") == []
+
+
+def test_keeps_shortest_completions():
+    index = names(*(f"Nation {'i' * length}" for length in range(10, 0, -1)), completions=3)
+    assert index.complete("nation") == ["Nation i", "Nation ii", "Nation iii"]
+    assert index.complete("", limit=2) == ["Nation i", "Nation ii"]
+
+
+def test_remove_refills_completions():
+    index = names("Aa", "Aaa", "Aaaa", completions=2)
+    index.remove("Aa")
+    assert index.complete("a") == ["Aaa", "Aaaa"]
+    index.remove("Missing")
+    assert index.complete("aaa") == ["Aaa", "Aaaa"]
+
+
+def test_rebuild_matches_added_names():
+    nations = ["Kingdom of Vexoria", "Vexland", "Republic of Ardent", "Aa", "Blah Blah"]
+    built = NationNames(3)
+    assert built.rebuild(nations) == 5
+    added = names(*nations, completions=3)
+    for prefix in ("", "v", "vex", "of", "a", "blah", "r"):
+        assert built.complete(prefix) == added.complete(prefix)
+
+
+def test_repeated_words_listed_once():
+    assert names("Blah Blah").complete("blah") == ["Blah Blah"]
+
+
+def test_loaded_and_updated_on_start(session):
+    Nation.start(UserGenerator.generate_id(), "Trie Loaded Nation", session)
+    index = NationNames()
+    assert index.load(session) >= 1
+    assert index.complete("trie loaded") == ["Trie Loaded Nation"]
+
+    Nation.start(UserGenerator.generate_id(), "Trie Founded Nation", session)
+    assert NATION_NAMES.complete("trie founded") == []
+    session.commit()
+    assert NATION_NAMES.complete("trie founded") == ["Trie Founded Nation"]
+
+
+def test_rolled_back_nation_not_completed(session):
+    Nation.start(UserGenerator.generate_id(), "Trie Rolled Back Nation", session)
+    session.rollback()
+    session.commit()
+    assert NATION_NAMES.complete("trie rolled") == []
+
+
+def test_levenshtein_gives_up_past_bound():
+    assert levenshtein("vexoria", "vexoria", 1) == 0
+    assert levenshtein("vexoria", "vexrioa", 2) == 2
+    assert levenshtein("vexoria", "vexrioa", 1) is None
+    assert levenshtein("vex", "vexoria", 3) is None
+
+
+def test_suggests_closest_names_first():
+    index = names("Kingdom of Vexoria", "Vexoria", "Vexorian", "Ardent", "Vexland")
+    assert index.suggest("vexorai") == ["Vexoria", "Vexorian"]
+    assert index.suggest("Ardnet") == ["Ardent"]
+    assert index.suggest("Quarnth") == []
+    assert index.suggest("vexoria", limit=1) == ["Vexoria"]
+
+
+def test_suggestions_forget_removed_names():
+    index = names("Vexoria")
+    index.remove("Vexoria")
+    assert index.suggest("vexorai") == []
@@ -1,7 +1,9 @@
 from datetime import datetime
 
 from host.defaults import defaults
+from host.gameplay_settings import GameplaySettings
 from host.nation import Nation, StartResponses
+from tests.test_utils import UserGenerator, count_queries
 
 
 def test_starting_player(userid, name, session):
@@ -17,3 +19,38 @@ def test_default_metadata(userid, name, session):
     assert player.metadata.flag == defaults.meta.flag
     assert player.metadata.emoji == defaults.meta.emoji
     assert player.metadata.created <= datetime.now()
+
+
+def test_start_twice_already_exists(userid, name, session):
+    assert Nation.start(userid, name, session) is StartResponses.SUCCESS
+    assert Nation.start(userid, name + "a", session) is StartResponses.ALREADY_EXISTS
+    assert Nation(userid, session).name == name
+
+
+def test_start_twice_with_same_name_already_exists(userid, name, session):
+    assert Nation.start(userid, name, session) is StartResponses.SUCCESS
+    assert Nation.start(userid, name, session) is StartResponses.ALREADY_EXISTS
+
+
+def test_start_name_taken_ignoring_case(userid, name, session):
+    assert Nation.start(userid, f"Casia {name}", session) is StartResponses.SUCCESS
+    other = UserGenerator.generate_id()
+    assert Nation.start(other, f"CASIA {name}", session) is StartResponses.NAME_TAKEN
+    assert not Nation(other, session).exists
+    assert Nation(userid, session).name == f"Casia {name}"
+
+
+def test_start_provisions_every_ministry_in_one_flush(userid, name, session):
+    with count_queries() as statements:
+        assert Nation.start(userid, name, session) is StartResponses.SUCCESS
+    verbs = [statement.split()[0] for statement in statements]
+    assert verbs[0] == "SAVEPOINT" and verbs[-1] == "RELEASE"
+    assert set(verbs[1:-1]) == {"INSERT"} and len(verbs) - 2 == 7
+
+    player = Nation(userid, session)
+    with count_queries() as statements:
+        assert player.bank.name
+        assert player.interior.land.amount > 0
+        assert player.government.type is not None
+        assert len(player.trade.resources) == GameplaySettings.trade.resources_per_nation
+    assert all(statement.startswith("SELECT") for statement in statements)
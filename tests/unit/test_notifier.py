@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta
+from typing import List
+from unittest.mock import patch
+
+import pytest
+from freezegun import freeze_time
+
+from host.base_models import LeaseModel, NotificationModel
+from host.base_types import UserId
+from host.notifier import LEASE_DURATION, Notifier, NotifierError, ScheduledNotification
+from tests.test_utils import TestingSessionLocal, engine
+
+
+@pytest.fixture(autouse=True)
+def clean_notifier_tables():
+    with TestingSessionLocal() as session:
+        session.query(LeaseModel).delete()
+        session.query(NotificationModel).delete()
+        session.commit()
+
+
+@pytest.fixture
+def delivered():
+    notifications: List[ScheduledNotification] = []
+    with patch.object(Notifier, "_hooks", [notifications.append]):
+        yield notifications
+
+
+def due_notification(user_id: int) -> ScheduledNotification:
+    return ScheduledNotification(
+        user_id=UserId(user_id), message="hello", time=datetime.now() - timedelta(seconds=1)
+    )
+
+
+def test_single_leader():
+    first = Notifier(engine, worker_id="first")
+    second = Notifier(engine, worker_id="second")
+    assert first.heartbeat()
+    assert not second.heartbeat()
+    assert first.heartbeat()
+
+
+def test_leader_takeover_after_expiry():
+    first = Notifier(engine, worker_id="first")
+    second = Notifier(engine, worker_id="second")
+    assert first.heartbeat()
+    with freeze_time(datetime.now() + LEASE_DURATION + timedelta(seconds=1)):
+        assert second.heartbeat()
+        assert not first.heartbeat()
+        assert not first.is_leader
+
+
+def test_release_hands_over_lease():
+    first = Notifier(engine, worker_id="first")
+    second = Notifier(engine, worker_id="second")
+    assert first.heartbeat()
+    first.release()
+    assert second.heartbeat()
+
+
+def test_partitions_have_separate_leaders():
+    first = Notifier(engine, partition=0, partitions=2, worker_id="first")
+    second = Notifier(engine, partition=1, partitions=2, worker_id="second")
+    assert first.heartbeat()
+    assert second.heartbeat()
+    assert first.owns(4) and not first.owns(5)
+    assert second.owns(5) and not second.owns(4)
+
+
+def test_expired_partition_adopted_and_reclaimed(delivered):
+    first = Notifier(engine, partition=0, partitions=2, worker_id="first")
+    second = Notifier(engine, partition=1, partitions=2, worker_id="second")
+    assert first.heartbeat() and second.heartbeat()
+    second.schedule(due_notification(3))
+    delivered.clear()
+    first.schedule(due_notification(5))
+    assert not delivered
+
+    with freeze_time(datetime.now() + LEASE_DURATION + timedelta(seconds=1)) as frozen:
+        assert first.heartbeat()
+        assert first.held == {0, 1}
+        assert [notification.user_id for notification in delivered] == [5]
+
+        frozen.tick()
+        assert second.heartbeat()
+        assert first.heartbeat()
+        assert first.held == {0}
+
+
+def test_partition_never_held_is_adopted():
+    first = Notifier(engine, partition=0, partitions=2, worker_id="first")
+    assert first.heartbeat()
+    assert first.held == {0}
+    with freeze_time(datetime.now() + timedelta(seconds=1)):
+        assert first.heartbeat()
+        assert first.held == {0, 1}
+
+
+def test_invalid_partition():
+    with pytest.raises(NotifierError):
+        Notifier(engine, partition=2, partitions=2)
+
+
+def test_follower_does_not_dispatch(delivered):
+    leader = Notifier(engine, worker_id="leader")
+    follower = Notifier(engine, worker_id="follower")
+    assert leader.heartbeat()
+    assert not follower.heartbeat()
+    follower.schedule(due_notification(1))
+    assert not delivered
+    leader.heartbeat()
+    assert [notification.user_id for notification in delivered] == [1]
+
+
+def test_partition_dispatches_only_its_users(delivered):
+    even = Notifier(engine, partition=0, partitions=2, worker_id="even")
+    odd = Notifier(engine, partition=1, partitions=2, worker_id="odd")
+    odd.heartbeat()
+    for user_id in range(4):
+        odd.schedule(due_notification(user_id))
+    assert sorted(notification.user_id for notification in delivered) == [1, 3]
+    even.heartbeat()
+    assert sorted(notification.user_id for notification in delivered) == [0, 1, 2, 3]
+
+
+def test_notification_delivered_once(delivered):
+    first = Notifier(engine, worker_id="first")
+    second = Notifier(engine, worker_id="second")
+    notification = due_notification(1)
+    first.schedule(notification)
+    first._display(notification.notification_id)
+    second._display(notification.notification_id)
+    assert first.heartbeat()
+    assert len(delivered) == 1
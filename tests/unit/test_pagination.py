@@ -0,0 +1,74 @@
+import uuid
+from datetime import datetime, timedelta
+
+from host.currency import Currency
+from host.nation import Nation
+from host.nation.models import AidRequestModel
+from tests.test_utils import UserGenerator, assert_max_queries
+
+
+def start(session, *names: str) -> None:
+    for name in names:
+        Nation.start(UserGenerator.generate_id(), name, session)
+
+
+def test_search_pages_continue_without_overlap(session):
+    names = [f"Pagoria {'I' * count}" for count in range(1, 8)]
+    start(session, "Pagoria", *names)
+    found = []
+    after = None
+    while True:
+        with assert_max_queries(1):
+            page = Nation.search_page("pagoria", session, after, limit=3)
+        assert len(page) <= 3
+        found.extend(metadata.nation for metadata in page.items)
+        if page.after is None:
+            break
+        after = page.after
+    assert found[0] == "Pagoria"
+    assert found == ["Pagoria", *names]
+
+
+def test_search_page_loads_only_its_rows(session):
+    start(session, *(f"Loadaria {index}" for index in range(30)))
+    before = len(session.identity_map)
+    page = Nation.search_page("loadaria", session, limit=5)
+    assert len(page) == 5 and page.after is not None
+    assert len(session.identity_map) - before <= 6
+
+
+def test_trade_offers_received_pages(session, target):
+    sponsors = sorted(UserGenerator.generate_player(session).identifier for _ in range(5))
+    for sponsor in sponsors:
+        Nation(sponsor, session).trade._send(target.identifier)
+    first = target.trade.offers_received_page(limit=3)
+    assert [offer.sponsor for offer in first.items] == sponsors[:3]
+    second = target.trade.offers_received_page(first.after, limit=3)
+    assert [offer.sponsor for offer in second.items] == sponsors[3:]
+    assert second.after is None
+
+
+def test_aid_requests_page_cancels_expired(session, player, target):
+    now = datetime.now()
+    for expires in (now + timedelta(days=1), now + timedelta(days=1), now - timedelta(days=1)):
+        session.add(
+            AidRequestModel(
+                aid_id=str(uuid.uuid4()),
+                date=now,
+                expires=expires,
+                sponsor=player.identifier,
+                recipient=target.identifier,
+                amount=100,
+                reason="",
+            )
+        )
+    session.flush()
+    funds = player.bank.funds
+
+    first = target.foreign.received_requests_page(limit=1)
+    assert len(first) == 1 and first.after is not None
+    second = target.foreign.received_requests_page(first.after, limit=1)
+    assert len(second) == 1 and second.after is None
+    assert first.items[0].id < second.items[0].id
+    assert player.bank.funds >= funds + Currency(100)
+    assert len(player.foreign.sponsorships_page()) == 2
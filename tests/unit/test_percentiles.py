@@ -0,0 +1,75 @@
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+from typing import List
+from unittest.mock import patch
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+
+from host.nation import models
+from host.nation.percentiles import RANKED_METRICS, Percentiles, Placement
+from host.nation.types.basic import InfrastructureUnit
+from lon import LeagueOfNations
+from tests.test_utils import TestingSessionLocal, UserGenerator, assert_max_queries
+
+COLUMNS = {
+    "revenue": models.NationStatsModel.revenue,
+    "infrastructure": models.InteriorModel.infrastructure,
+    "land": models.InteriorModel.land,
+    "technology": models.InteriorModel.technology,
+}
+
+
+def test_placements_match_counting_the_nations():
+    with TestingSessionLocal() as session:
+        players = [UserGenerator.generate_player(session) for _ in range(3)]
+        players[0].interior.infrastructure.buy(InfrastructureUnit(50))
+        players[1].interior.land.buy(20)
+        index = Percentiles()
+        nations = index.load(session)
+
+        for player in players:
+            placements = index.of(player)
+            for metric in RANKED_METRICS:
+                value = session.scalar(
+                    select(COLUMNS[metric])
+                    .join_from(
+                        models.NationStatsModel,
+                        models.InteriorModel,
+                        models.InteriorModel.user_id == models.NationStatsModel.user_id,
+                    )
+                    .where(models.NationStatsModel.user_id == player.identifier)
+                )
+                above = session.scalar(select(func.count()).where(COLUMNS[metric] > value))
+                below = session.scalar(select(func.count()).where(COLUMNS[metric] < value))
+                assert placements[metric] == Placement(above + 1, 100 * below / nations)
+        session.rollback()
+
+
+def test_placements_are_read_from_memory(player):
+    index = Percentiles()
+    with TestingSessionLocal() as session:
+        index.load(session)
+    index.of(player)
+    with assert_max_queries(0):
+        index.of(player)
+
+
+def test_empty_index_places_first():
+    assert Percentiles().place("land", 10.0) == Placement(1, 100.0)
+
+
+def test_rebuild_task_survives_a_failed_load():
+    loads: List[object] = []
+
+    async def run_with_session(function):
+        loads.append(function)
+        if len(loads) == 1:
+            raise OperationalError("SELECT", {}, Exception("database is locked"))
+        return 0
+
+    bot = SimpleNamespace(is_closed=lambda: len(loads) == 2, run_with_session=run_with_session)
+    with patch("lon.REBUILD_INTERVAL", timedelta(0)):
+        asyncio.run(LeagueOfNations.rebuild_percentiles(bot))  # type: ignore[arg-type]
+    assert len(loads) == 2
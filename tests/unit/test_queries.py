@@ -0,0 +1,102 @@
+import logging
+
+from host.currency import Currency, Price
+from host.nation import Nation
+from host.nation.models import BankModel
+from host.nation.types.basic import InfrastructureUnit
+from tests.test_utils import (
+    TestingSessionLocal,
+    UserGenerator,
+    assert_max_queries,
+    count_queries,
+)
+
+
+def warm(nation: Nation) -> None:
+    nation.bank.funds
+    nation.interior.infrastructure.amount
+    nation.government.type
+    nation.public_works.amounts
+
+
+def test_reads_after_commit_are_not_reloaded(player):
+    warm(player)
+    player.government.set("democracy")
+    with count_queries() as statements:
+        player.government.type
+        player.bank.name
+        player.bank.tax_rate
+        player.interior.infrastructure.amount
+        player.interior.land.amount
+    assert statements == []
+
+
+def test_ministries_loaded_once_per_session(player, session):
+    warm(player)
+    same_nation = Nation(player.identifier, session)
+    with count_queries() as statements:
+        same_nation.bank.name
+        same_nation.interior.technology.amount
+        same_nation.government.type
+    assert statements == []
+
+
+def test_infrastructure_purchase_round_trips(player):
+    warm(player)
+    with count_queries() as statements:
+        player.interior.infrastructure.buy(InfrastructureUnit(1))
+    assert len(statements) <= 8
+
+
+def test_deduct_refreshes_treasury(player):
+    warm(player)
+    with TestingSessionLocal() as other:
+        bank = other.get(BankModel, player.identifier)
+        assert bank is not None
+        bank.treasury += 1000
+        other.commit()
+    funds = player.bank._model.treasury
+    player.bank.deduct(Price(0))
+    assert player.bank._model.treasury >= funds + 1000
+
+
+def test_start_query_budget(session):
+    with assert_max_queries(9):
+        Nation.start(UserGenerator.generate_id(), UserGenerator.generate_name(), session)
+
+
+def test_trade_query_budget(player, target):
+    with assert_max_queries(7):
+        player.trade.send(target.identifier)
+    with assert_max_queries(7):
+        target.trade.accept(player.identifier)
+
+
+def test_all_resources_does_not_query_per_partner(player, session):
+    player.trade.resources
+    for _ in range(4):
+        partner = UserGenerator.generate_player(session)
+        partner.trade.resources
+        partner.trade.send(player.identifier)
+        player.trade.accept(partner.identifier)
+    with assert_max_queries(4):
+        player.trade.all_resources()
+
+
+def test_foreign_query_budget(player, target):
+    warm(player)
+    with assert_max_queries(1):
+        target.foreign.received_requests
+    with assert_max_queries(2):
+        target.foreign.free_slots
+
+
+def test_receive_logs_without_queries(player, caplog):
+    warm(player)
+    with caplog.at_level(logging.INFO, logger="host.nation.bank"), count_queries() as info:
+        player.bank.receive(Currency(10))
+    with caplog.at_level(logging.DEBUG, logger="host.nation.bank"), count_queries() as debug:
+        player.bank.receive(Currency(10))
+    assert len(info) <= 4
+    assert len(debug) == len(info)
+    assert "[BANK][ADD]" in caplog.text
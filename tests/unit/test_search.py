@@ -0,0 +1,67 @@
+from typing import List
+
+from sqlalchemy import event
+
+from host.nation import Nation
+from host.nation.models import MetadataModel
+from host.nation.search import has_search_index, search_nations
+from tests.test_utils import UserGenerator, engine
+
+
+def found(name: str, session, limit: int = 25) -> List[str]:
+    return [metadata.nation for metadata in search_nations(name, session, limit)]
+
+
+def start(session, *names: str) -> None:
+    for name in names:
+        Nation.start(UserGenerator.generate_id(), name, session)
+
+
+def test_search_index_kept_in_sync(session):
+    assert has_search_index(session)
+    start(session, "Kingdom of Vexoria")
+    assert found("vexor", session) == ["Kingdom of Vexoria"]
+
+    metadata = session.query(MetadataModel).filter_by(nation="Kingdom of Vexoria").one()
+    metadata.nation = "Republic of Vexoria"
+    session.flush()
+    assert found("vexor", session) == ["Republic of Vexoria"]
+
+    session.delete(metadata)
+    session.flush()
+    assert found("vexor", session) == []
+
+
+def test_exact_match_ranked_first_and_limited(session):
+    start(session, "Greater Quarnth", "Quarnth Isles", "Quarnth", "Old Quarnthia")
+    assert found("quarnth", session)[0] == "Quarnth"
+    assert len(found("quarnth", session, limit=2)) == 2
+    assert Nation.search_for_nations("quarnth", session, with_like=True, limit=3)[0].nation == (
+        "Quarnth"
+    )
+
+
+def test_short_names_and_wildcards_fall_back_to_like(session):
+    start(session, "Zy", "Zyxonia", "Per%cent")
+    assert found("zy", session)[:2] == ["Zy", "Zyxonia"]
+    assert found("r%c", session) == ["Per%cent"]
+    assert "Zyxonia" not in found("Z%x", session)
+
+
+def test_search_does_not_scan_metadata(session):
+    executed = []
+
+    def record(_conn, _cursor, statement, parameters, *_) -> None:
+        executed.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        search_nations("quarnth", session)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    statement, parameters = executed[-1]
+    plan = session.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+    details = " ".join(row[-1] for row in plan)
+    assert "VIRTUAL TABLE INDEX" in details
+    assert "SCAN Metadata" not in details
@@ -0,0 +1,102 @@
+import asyncio
+from types import SimpleNamespace
+from typing import List
+from unittest.mock import patch
+
+import pytest
+from qalib.interaction import QalibInteraction
+from qalib.template_engines.jinja2 import Jinja2
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+import host.base_models
+from host.base_types import UserId
+from host.database import session_factory
+from host.nation import Nation
+from host.nation.types.basic import InfrastructureUnit, LandUnit
+from lon import cog_with_session, qalib_interaction, release_session
+from view.cogs.custom_jinja2 import ENVIRONMENT
+
+
+class BalanceCog:
+    def __init__(self, engine):
+        self.bot = SimpleNamespace(engine=engine, sessions=session_factory(engine))
+
+    @cog_with_session
+    @qalib_interaction(Jinja2(ENVIRONMENT), "templates/economy.xml")
+    async def balance(self, ctx: QalibInteraction, session: Session) -> None:
+        await ctx.display("balance", keywords={"nation": Nation(UserId(1), session)})
+        await ctx.display("balance", keywords={"nation": Nation(UserId(1), session)})
+
+
+class PurchaseCog:
+    def __init__(self, engine):
+        self.bot = SimpleNamespace(engine=engine, sessions=session_factory(engine))
+
+    @cog_with_session
+    async def purchase(self, ctx: QalibInteraction, session: Session, fail: bool) -> None:
+        nation = Nation(UserId(1), session)
+        nation.interior.infrastructure.buy(InfrastructureUnit(1))
+        nation.interior.land.buy(LandUnit(1))
+        if fail:
+            raise RuntimeError("discord is unavailable")
+
+
+def holdings(engine) -> tuple:
+    with session_factory(engine)() as session:
+        nation = Nation(UserId(1), session)
+        return nation.interior.infrastructure.amount, nation.interior.land.amount
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'lon.sqlite3'}")
+    host.base_models.Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        Nation.start(UserId(1), "Pooled", session)
+        session.commit()
+    yield engine
+    engine.dispose()
+
+
+def interaction() -> QalibInteraction:
+    inter = object.__new__(QalibInteraction)
+    inter._wrapped = None
+    inter._displayed = False
+    return inter
+
+
+def test_no_connection_checked_out_during_discord_io(engine):
+    checked_out: List[int] = []
+
+    async def display(*_, **__):
+        checked_out.append(engine.pool.checkedout())
+        await asyncio.sleep(0)
+
+    with patch.object(QalibInteraction, "_display", display):
+        asyncio.run(BalanceCog(engine).balance(interaction()))
+
+    assert checked_out == [0, 0]
+    assert engine.pool.checkedout() == 0
+
+
+def test_one_commit_per_interaction(engine):
+    commits: List[int] = []
+    event.listen(engine, "commit", lambda _: commits.append(1))
+    before = holdings(engine)
+    commits.clear()
+    asyncio.run(PurchaseCog(engine).purchase(interaction(), fail=False))
+    assert len(commits) == 1
+    infrastructure, land = holdings(engine)
+    assert (infrastructure, land) == (before[0] + 1, before[1] + 1)
+
+
+def test_failed_interaction_rolls_back_every_purchase(engine):
+    before = holdings(engine)
+    with pytest.raises(RuntimeError):
+        asyncio.run(PurchaseCog(engine).purchase(interaction(), fail=True))
+    assert holdings(engine) == before
+
+
+def test_release_without_active_session():
+    release_session()
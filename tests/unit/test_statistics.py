@@ -0,0 +1,116 @@
+from unittest.mock import patch
+
+from host.nation import models, statistics, strength
+from host.nation.statistics import METRICS
+from host.nation.types.basic import InfrastructureUnit
+from host.nation.types.boosts import BoostsLookup
+from host.nation.types.improvements import IMPROVEMENT_NAMES, Improvements
+from tests.test_utils import TestingSessionLocal, UserGenerator, assert_max_queries
+
+LEADING_TECHNOLOGY = 10**9
+
+
+def test_statistics_refreshed_when_nation_changes(player):
+    player.interior.infrastructure.buy(InfrastructureUnit(10))
+    assert player.statistics["population"] == player.population
+    assert player.statistics["treasury"] == player.bank.treasury
+    assert player.statistics.measure() == {metric: player.statistics[metric] for metric in METRICS}
+
+
+def test_leaderboard_pages_by_rank():
+    with TestingSessionLocal() as session:
+        leaders = [UserGenerator.generate_player(session) for _ in range(3)]
+        for offset, leader in enumerate(leaders):
+            interior = session.get(models.InteriorModel, leader.identifier)
+            interior.technology = LEADING_TECHNOLOGY - offset
+            leader.statistics.refresh("technology")
+        session.flush()
+
+        first = statistics.leaderboard(session, "technology", limit=2)
+        assert [standing.user_id for standing in first.items] == [
+            leader.identifier for leader in leaders[:2]
+        ]
+        assert [standing.rank for standing in first.items] == [1, 2]
+        assert first.after == (LEADING_TECHNOLOGY - 1, leaders[1].identifier)
+
+        second = statistics.leaderboard(session, "technology", first.after, limit=2)
+        assert second.items[0].user_id == leaders[2].identifier
+        assert second.items[0].rank == 3
+
+        with assert_max_queries(1):
+            assert leaders[2].statistics.rank("technology") == 3
+        session.rollback()
+
+
+def test_leaderboard_ties_share_rank_across_pages():
+    with TestingSessionLocal() as session:
+        leaders = [UserGenerator.generate_player(session) for _ in range(5)]
+        for leader, technology in zip(leaders, (0, 1, 1, 1, 2)):
+            interior = session.get(models.InteriorModel, leader.identifier)
+            interior.technology = LEADING_TECHNOLOGY - technology
+            leader.statistics.refresh("technology")
+        session.flush()
+
+        ranks = []
+        page = statistics.leaderboard(session, "technology", limit=2)
+        ranks.extend(standing.rank for standing in page.items)
+        for _ in range(2):
+            with assert_max_queries(2):
+                page = statistics.leaderboard(session, "technology", page.after, limit=2)
+            ranks.extend(standing.rank for standing in page.items)
+        assert ranks[:5] == [1, 2, 2, 2, 5]
+        session.rollback()
+
+
+def test_rebuild_matches_refresh():
+    with TestingSessionLocal() as session:
+        players = [UserGenerator.generate_player(session) for _ in range(2)]
+        players[0].interior.land.buy(5)
+        session.commit()
+
+        assert statistics.rebuild(session) == session.query(models.MetadataModel).count()
+        session.expire_all()
+        for player in players:
+            assert player.statistics.measure() == {
+                metric: player.statistics[metric] for metric in METRICS
+            }
+        session.commit()
+
+
+def test_rebuild_keeps_nations_it_did_not_measure():
+    with TestingSessionLocal() as session:
+        players = [UserGenerator.generate_player(session) for _ in range(2)]
+        session.commit()
+        measured = statistics._measure_world(session)
+        founded_since = [row for row in measured if row["user_id"] != players[1].identifier]
+
+        with patch.object(statistics, "_measure_world", return_value=founded_since):
+            statistics.rebuild(session)
+        assert session.get(models.NationStatsModel, players[1].identifier) is not None
+        session.rollback()
+
+
+def test_strength_scored_when_founded(player):
+    assert player.strength > 0
+    assert player.strength == player.statistics.measure()["strength"]
+
+
+def test_strength_follows_its_inputs(player):
+    strengths = [player.strength]
+    player.interior.technology.buy(1)
+    strengths.append(player.strength)
+    player.public_works.buy(Improvements[IMPROVEMENT_NAMES[0]], 1)
+    strengths.append(player.strength)
+    player.government.set("democracy")
+    strengths.append(player.strength)
+
+    assert strengths[0] < strengths[1] < strengths[2] < strengths[3]
+    assert player.strength == player.statistics.measure()["strength"]
+    assert player.statistics.rank("strength") >= 1
+
+
+def test_strength_counts_only_weighted_boosts():
+    base = strength.score(100, 50.0, 10, [], BoostsLookup())
+    factory = Improvements["Factory"].boosts
+    assert strength.score(100, 50.0, 10, [], factory) == base
+    assert strength.score(100, 50.0, 10, [], Improvements["Casino"].boosts) > base
@@ -11,7 +11,7 @@ from host.nation.trade import (
     TradeSentResponses,
 )
 
-from tests.test_utils import UserGenerator
+from tests.test_utils import UserGenerator, assert_max_queries
 from host.nation.types import resources
 
 with open("tests/objects/resources.json", "r", encoding="utf8") as resources_file:
@@ -77,7 +77,7 @@ def test_trade_decline_offer_removed(player, target):
     assert not target.trade.offers_received
 
 
-def test_bonus_resources_merged(player):
+def test_bonus_resources_merged(session):
     # replace the object in host.nation.types.resources Resources with the one defined in this file. It must propagate to other imports of the Resources object
     # but only within this scope
     with patch("host.nation.types.resources.Resources", Resources), patch(
@@ -87,6 +87,7 @@ def test_bonus_resources_merged(player):
     ):
         import host.nation.types.resources as resources
 
+        player = UserGenerator.generate_player(session)
         assert set(player.trade.resources).intersection(set(resources.RESOURCE_NAMES)) != set()
         player_resources = set(player.trade.resources)
         if "A" not in player_resources:
@@ -199,3 +200,18 @@ def test_no_offer_recipient_decline(player, target):
 
 def test_cant_trade_with_self(player):
     assert player.trade.send(player.identifier) is TradeSentResponses.CANNOT_TRADE_WITH_SELF
+
+
+def test_resources_packed_into_one_row(player, session):
+    held = player.trade.resources
+    assert len(held) == GameplaySettings.trade.resources_per_nation
+    assert resources.unpack(resources.pack(held)) == held
+
+    missing = next(name for name in resources.RESOURCE_NAMES if name not in held)
+    assert player.trade.swap_resources(missing, held[0]) is TradeSelectResponses.MISSING_RESOURCE
+    assert player.trade.swap_resources(held[0], held[1]) is TradeSelectResponses.DUPLICATE_RESOURCE
+    assert player.trade.swap_resources(held[0], missing) is TradeSelectResponses.SUCCESS
+
+    session.expire_all()
+    with assert_max_queries(1):
+        assert set(player.trade.resources) == {missing, *held[1:]}
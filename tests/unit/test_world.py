@@ -0,0 +1,100 @@
+from datetime import timedelta
+from typing import Literal
+from unittest.mock import patch
+
+import pytest
+
+from host.currency import DAY
+from host.nation import models
+from host.nation.bank import Bank
+from host.nation.types.basic import Happiness
+from host.nation.types.improvements import IMPROVEMENT_NAMES, Improvements
+from tests.test_utils import TestingSessionLocal, UserGenerator, assert_max_queries
+
+np = pytest.importorskip("numpy")
+
+from host.nation.world import World  # noqa: E402
+
+INTERIORS = [(100, 50.0, 0), (250, 137.5, 12), (2_500, 1_999.0, 640), (45_000, 9_000.0, 200_000)]
+GOVERNMENTS = ["monarchy", "democracy", "anarchy", "dictatorship"]
+
+
+def populate_world(session):
+    players = []
+    for index, ((infrastructure, land, technology), government) in enumerate(
+        zip(INTERIORS, GOVERNMENTS)
+    ):
+        player = UserGenerator.generate_player(session)
+        interior = session.get(models.InteriorModel, player.identifier)
+        interior.infrastructure, interior.land, interior.technology = (
+            infrastructure,
+            land,
+            technology,
+        )
+        player.government.set(government)
+        for name in IMPROVEMENT_NAMES[index : index + 3]:
+            player.public_works.buy(Improvements[name], index + 1)
+        players.append(player)
+    session.flush()
+    return players
+
+
+def daily(rate) -> float:
+    return float(rate.per_day()._amount.amount)
+
+
+def assert_matches_scalar_path(world, players):
+    positions = {user_id: index for index, user_id in enumerate(world.user_ids.tolist())}
+    for player in players:
+        index = positions[player.identifier]
+        assert world.population[index] == player.population
+        assert world.happiness[index] == pytest.approx(player.happiness)
+        assert world.revenue[index] == pytest.approx(daily(player.revenue))
+        assert world.interior_bill[index] == pytest.approx(daily(player.interior.bill))
+        assert world.national_revenue[index] == pytest.approx(daily(player.bank.national_revenue))
+        assert world.national_bill[index] == pytest.approx(daily(player.bank.national_bill))
+        assert world.national_profit[index] == pytest.approx(daily(player.bank.national_profit))
+        assert world.strength[index] == player.strength
+
+
+def test_world_matches_nations():
+    with TestingSessionLocal() as session:
+        players = populate_world(session)
+        with assert_max_queries(1):
+            world = World.load(session)
+        assert np.all(np.diff(world.user_ids) > 0)
+        assert_matches_scalar_path(world, players)
+
+
+def test_world_matches_nations_with_every_boost():
+    ministries = Literal["bank", "trade", "interior", "foreign", "government", "public_works"]
+    with TestingSessionLocal() as session, patch(
+        "host.nation.types.ministries.Ministries", ministries
+    ):
+        players = populate_world(session)
+        world = World.load(session)
+        assert world.boosts.any()
+        assert_matches_scalar_path(world, players)
+
+
+def test_world_refuses_happiness_it_does_not_compute():
+    with TestingSessionLocal() as session, patch.object(
+        Bank, "happiness", property(lambda _: Happiness(5))
+    ):
+        populate_world(session)
+        world = World.load(session)
+        with pytest.raises(AssertionError, match="BANK"):
+            world.happiness
+
+
+def test_world_funds_accrue_profit():
+    with TestingSessionLocal() as session:
+        players = populate_world(session)
+        world = World.load(session)
+        index = world.user_ids.tolist().index(players[-1].identifier)
+        last_accessed = players[-1].bank.last_accessed
+        profit = daily(players[-1].bank.national_profit)
+        later = last_accessed + timedelta(hours=6)
+        expected = world.treasury[index] + int(profit * (timedelta(hours=6) / DAY))
+        assert world.funds(later)[index] == expected
+        assert world.funds(last_accessed - timedelta(hours=1))[index] == world.treasury[index]
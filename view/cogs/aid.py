@@ -1,5 +1,5 @@
 import logging
-from typing import Dict, Literal, Optional, cast
+from typing import Any, Dict, Literal, Optional, cast
 import discord
 from discord.components import TextInput
 from sqlalchemy.orm import Session
@@ -8,8 +8,15 @@ from host import currency
 from host.base_types import UserId
 from host.nation import Nation
 import host.nation.foreign
-from host.nation.foreign import AidAcceptCode, AidCancelCode, AidRejectCode, AidRequestCode
+from host.nation.foreign import (
+    AidAcceptCode,
+    AidCancelCode,
+    AidRejectCode,
+    AidRequest,
+    AidRequestCode,
+)
 from host.notifier import Notification
+from host.pagination import Page
 import qalib
 import qalib.interaction
 from discord import app_commands
@@ -17,8 +24,17 @@ from discord.ext import commands
 from qalib.template_engines.jinja2 import Jinja2
 from qalib.translators.modal import ModalEvents
 
-from lon import cog_with_session, lookup_messages, LeagueOfNations, interaction_morph
+from lon import (
+    LeagueOfNations,
+    cog_with_session,
+    interaction_morph,
+    lookup_messages,
+    qalib_interaction,
+    release_session,
+    with_session,
+)
 from view.lookup import cog_find_nation
+from view.paging import KeysetPages
 from view.cogs.custom_jinja2 import ENVIRONMENT
 
 
@@ -110,7 +126,8 @@ class Aid(commands.Cog):
         recipient: Nation,
         amount: currency.Price,
     ) -> None:
-        async def on_submit(modal, interaction: discord.Interaction) -> None:
+        @with_session(self.bot.engine)
+        async def on_submit(session: Session, modal, interaction: discord.Interaction) -> None:
             reason = cast(TextInput, modal.children[0]).value
             await interaction.response.defer()
             logging.debug(
@@ -119,14 +136,20 @@ class Aid(commands.Cog):
                 amount,
                 recipient.identifier,
             )
-            result = sponsor.foreign.send(UserId(recipient.identifier), amount, reason or "")
+            result = Nation(UserId(ctx.user.id), session).foreign.send(
+                UserId(recipient.identifier), amount, reason or ""
+            )
             await ctx.display(
                 aid_request_code_mapping[result],
-                keywords={"nation": sponsor, "target": recipient, "amount": amount},
+                keywords={
+                    "nation": Nation(UserId(ctx.user.id), session),
+                    "target": Nation(recipient.identifier, session),
+                    "amount": amount,
+                },
             )
 
         @interaction_morph
-        @qalib.qalib_interaction(Jinja2(ENVIRONMENT), "templates/aid.xml")
+        @qalib_interaction(Jinja2(ENVIRONMENT), "templates/aid.xml")
         async def confirm_aid(
             confirmed_ctx: qalib.interaction.QalibInteraction[AidSelectionMessages],
         ) -> None:
@@ -139,14 +162,14 @@ class Aid(commands.Cog):
         )
 
     @aid_group.command(name="send", description="Send aid to another nation")
-    @cog_with_session
     @cog_find_nation("recipient")
-    @qalib.qalib_interaction(Jinja2(ENVIRONMENT), "templates/aid.xml")
+    @cog_with_session
+    @qalib_interaction(Jinja2(ENVIRONMENT), "templates/aid.xml")
     async def send(
         self,
         ctx: qalib.interaction.QalibInteraction[AidRequestMessages],
         session: Session,
-        recipient: Nation,
+        recipient: UserId,
     ) -> None:
         def extract_funds(raw_funds: Optional[str]) -> Optional[currency.Price]:
             if raw_funds is None:
@@ -158,7 +181,8 @@ class Aid(commands.Cog):
             else:
                 return amount
 
-        async def on_submit(modal, interaction: discord.Interaction) -> None:
+        @with_session(self.bot.engine)
+        async def on_submit(session: Session, modal, interaction: discord.Interaction) -> None:
             funds = extract_funds(cast(TextInput, modal.children[0]).value)
 
             if funds is None:
@@ -168,51 +192,71 @@ class Aid(commands.Cog):
             await self.send_aid(
                 ctx,
                 sponsor=Nation(UserId(ctx.user.id), session),
-                recipient=recipient,
+                recipient=Nation(recipient, session),
                 amount=funds,
             )
 
         await ctx.rendered_send("funds", events={ModalEvents.ON_SUBMIT: on_submit}, view=None)
 
     @aid_group.command(name="list", description="List all aid packages")
-    @cog_with_session
-    @qalib.qalib_interaction(Jinja2(ENVIRONMENT), "templates/aid.xml")
+    @qalib_interaction(Jinja2(ENVIRONMENT), "templates/aid.xml")
     async def list(
         self,
         ctx: qalib.interaction.QalibInteraction[
             Literal[AidSelectionMessages, AidAcceptMessages, AidRejectMessages]
         ],
-        session: Session,
     ) -> None:
-        nation = Nation(UserId(ctx.user.id), session)
-
-        async def on_view(item: discord.ui.Select, interaction: discord.Interaction) -> None:
-            aid_request = host.nation.foreign.AidRequest.from_id(item.values[0], self.bot.session)
+        @with_session(self.bot.engine)
+        async def on_view(
+            session: Session, item: discord.ui.Select, interaction: discord.Interaction
+        ) -> None:
+            aid_id = item.values[0]
+            aid_request = host.nation.foreign.AidRequest.from_id(aid_id, session)
             if aid_request is None:
                 await ctx.display("error", keywords={"description": "Aid package not found"})
                 return
             await interaction.response.defer()
 
-            async def on_accept(_: discord.ui.Item, interaction: discord.Interaction) -> None:
+            @with_session(self.bot.engine)
+            async def on_accept(
+                session: Session, _: discord.ui.Item, interaction: discord.Interaction
+            ) -> None:
+                nation = Nation(UserId(ctx.user.id), session)
+                aid_request = host.nation.foreign.AidRequest.from_id(aid_id, session)
+                if aid_request is None:
+                    await ctx.display("error", keywords={"description": "Aid package not found"})
+                    return
                 result, agreement = nation.foreign.accept(aid_request)
+                release_session()
                 await interaction.response.defer()
                 if result == AidAcceptCode.SUCCESS and agreement is not None:
                     notification = Notification(
                         agreement.sponsor,
-                        f"Aid package of {aid_request.amount} sent to {nation.name} has been accepted",
+                        f"Aid package of {aid_request.amount} sent to {nation.name} "
+                        "has been accepted",
                     )
+                    release_session()
                     await self.bot.notification_renderer.render(notification)
                 await ctx.display(
                     aid_accept_code_mapping[result], keywords={"nation": nation, "aid": agreement}
                 )
 
-            async def on_reject(_: discord.ui.Item, interaction: discord.Interaction) -> None:
+            @with_session(self.bot.engine)
+            async def on_reject(
+                session: Session, _: discord.ui.Item, interaction: discord.Interaction
+            ) -> None:
                 await interaction.response.defer()
+                nation = Nation(UserId(ctx.user.id), session)
+                aid_request = host.nation.foreign.AidRequest.from_id(aid_id, session)
+                if aid_request is None:
+                    await ctx.display("error", keywords={"description": "Aid package not found"})
+                    return
                 result = nation.foreign.reject(aid_request)
                 notification = Notification(
                     aid_request.sponsor,
                     f"Aid package of {aid_request.amount} sent to {nation.name} has been rejected",
                 )
+                release_session()
                 await self.bot.notification_renderer.render(notification)
                 await ctx.display(
                     aid_reject_code_mapping[result], keywords={"nation": nation, "aid": aid_request}
@@ -220,33 +264,52 @@ class Aid(commands.Cog):
 
             await ctx.display(
                 "view_aid",
-                keywords={"aid": aid_request, "nation": nation},
+                keywords={"aid": aid_request, "nation": Nation(UserId(ctx.user.id), session)},
                 callables={"accept": on_accept, "reject": on_reject},
             )
 
-        await ctx.display(
-            "requests", keywords={"nation": nation}, callables={"select-aid": on_view}
-        )
+        @with_session(self.bot.engine)
+        async def show(
+            session: Session, after: Optional[str], callables: Dict[str, Any]
+        ) -> Page[AidRequest, str]:
+            nation = Nation(UserId(ctx.user.id), session)
+            page = nation.foreign.received_requests_page(after)
+            await ctx.display(
+                "requests",
+                keywords={"nation": nation, "page": page, "first": after is None},
+                callables={"select-aid": on_view, **callables},
+            )
+            return page
+
+        await KeysetPages(show).show()
 
     @aid_group.command(name="sponsorships", description="list aid sponsorships")
-    @cog_with_session
-    @qalib.qalib_interaction(Jinja2(ENVIRONMENT), "templates/aid.xml")
+    @qalib_interaction(Jinja2(ENVIRONMENT), "templates/aid.xml")
     async def sponsorships(
         self,
         ctx: qalib.interaction.QalibInteraction[Literal[AidSelectionMessages, AidCancelMessages]],
-        session: Session,
     ) -> None:
-        nation = Nation(UserId(ctx.user.id), session)
-
-        async def on_view(item: discord.ui.Select, interaction: discord.Interaction) -> None:
-            package = host.nation.foreign.AidRequest.from_id(item.values[0], self.bot.session)
+        @with_session(self.bot.engine)
+        async def on_view(
+            session: Session, item: discord.ui.Select, interaction: discord.Interaction
+        ) -> None:
+            package_id = item.values[0]
+            package = host.nation.foreign.AidRequest.from_id(package_id, session)
             if package is None:
                 await ctx.display("error", keywords={"description": "Aid package not found"})
                 return
             await interaction.response.defer()
 
-            async def on_cancel(_: discord.ui.Item, interaction: discord.Interaction) -> None:
+            @with_session(self.bot.engine)
+            async def on_cancel(
+                session: Session, _: discord.ui.Item, interaction: discord.Interaction
+            ) -> None:
                 await interaction.response.defer()
+                nation = Nation(UserId(ctx.user.id), session)
+                package = host.nation.foreign.AidRequest.from_id(package_id, session)
+                if package is None:
+                    await ctx.display("error", keywords={"description": "Aid package not found"})
+                    return
                 result = nation.foreign.cancel(package)
                 await ctx.display(
                     aid_cancel_code_mapping[result], keywords={"nation": nation, "aid": package}
@@ -254,31 +317,43 @@ class Aid(commands.Cog):
 
             await ctx.display(
                 "view_sponsorship",
-                keywords={"aid": package, "nation": nation},
+                keywords={"aid": package, "nation": Nation(UserId(ctx.user.id), session)},
                 callables={"cancel": on_cancel},
             )
 
-        await ctx.display(
-            "sponsorships", keywords={"nation": nation}, callables={"select-aid": on_view}
-        )
+        @with_session(self.bot.engine)
+        async def show(
+            session: Session, after: Optional[str], callables: Dict[str, Any]
+        ) -> Page[AidRequest, str]:
+            nation = Nation(UserId(ctx.user.id), session)
+            page = nation.foreign.sponsorships_page(after)
+            await ctx.display(
+                "sponsorships",
+                keywords={"nation": nation, "page": page, "first": after is None},
+                callables={"select-aid": on_view, **callables},
+            )
+            return page
+
+        await KeysetPages(show).show()
 
     @aid_group.command(name="slots", description="list aid slots")
     @cog_with_session
-    @qalib.qalib_interaction(Jinja2(ENVIRONMENT), "templates/aid.xml")
+    @qalib_interaction(Jinja2(ENVIRONMENT), "templates/aid.xml")
     async def slots(
         self, ctx: qalib.interaction.QalibInteraction[AidSelectionMessages], session: Session
     ) -> None:
         nation = Nation(UserId(ctx.user.id), session)
 
-        async def on_aid_select(item: discord.ui.Select, interaction: discord.Interaction) -> None:
+        @with_session(self.bot.engine)
+        async def on_aid_select(
+            session: Session, item: discord.ui.Select, interaction: discord.Interaction
+        ) -> None:
             await interaction.response.defer()
             await ctx.display(
                 "aid_slot",
                 keywords={
-                    "nation": nation,
-                    "aid": host.nation.foreign.AidAgreement.from_id(
-                        item.values[0], self.bot.session
-                    ),
+                    "nation": Nation(UserId(ctx.user.id), session),
+                    "aid": host.nation.foreign.AidAgreement.from_id(item.values[0], session),
                 },
             )
 
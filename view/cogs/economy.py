@@ -1,4 +1,4 @@
-import traceback
+import logging
 from typing import Any, Callable, Coroutine, Dict, Literal
 
 import discord
@@ -6,12 +6,21 @@ import qalib
 from discord import app_commands
 from discord.app_commands import Choice
 from discord.ext import commands
+from sqlalchemy.orm import Session
+
+from host.base_types import as_user_id
 from host.nation import Nation
 from host.nation.interior import K, UnitExchangeProtocol
 from host.nation.types.basic import InfrastructureUnit, LandUnit, TechnologyUnit
 from host.nation.types.improvements import Improvements
 from host.nation.types.transactions import PurchaseResult, SellResult
-from lon import LeagueOfNations, interaction_morph
+from lon import (
+    LeagueOfNations,
+    cog_with_session,
+    interaction_morph,
+    qalib_interaction,
+    with_session,
+)
 from qalib.template_engines.jinja2 import Jinja2
 from view.cogs.custom_jinja2 import ENVIRONMENT
 
@@ -60,7 +69,7 @@ class Economy(commands.Cog):
                 [
                     qalib.interaction.QalibInteraction[ExchangeMessages],
                     Nation,
-                    UnitExchangeProtocol,
+                    Callable[[Nation], UnitExchangeProtocol],
                     Any,
                 ],
                 Coroutine[None, None, None],
@@ -68,21 +77,24 @@ class Economy(commands.Cog):
         ] = {"buy": self.buy, "sell": self.sell}
 
     @app_commands.command(name="balance", description="Check the balance of you Nation")
-    @qalib.qalib_interaction(Jinja2(ENVIRONMENT), "templates/economy.xml")
-    async def balance(self, ctx: qalib.interaction.QalibInteraction[EconomyMessages]) -> None:
+    @cog_with_session
+    @qalib_interaction(Jinja2(ENVIRONMENT), "templates/economy.xml")
+    async def balance(
+        self, ctx: qalib.interaction.QalibInteraction[EconomyMessages], session: Session
+    ) -> None:
         """Balance command that shows the balance of the nations funds
 
         Args:
             ctx (qalib.interaction.QalibInteraction[EconomyMessages]): The context of the interaction
         """
-        nation = self.bot.get_nation(ctx.user.id)
+        nation = self.bot.get_nation(ctx.user.id, session)
         await ctx.rendered_send("balance", keywords={"nation": nation})
 
-    @staticmethod
     async def buy(
+        self,
         ctx: qalib.interaction.QalibInteraction[PurchaseMessages],
         nation: Nation,
-        unit: UnitExchangeProtocol[K],
+        exchange: Callable[[Nation], UnitExchangeProtocol[K]],
         amount: K,
     ) -> None:
         """Buy command that buys an item
@@ -90,18 +102,20 @@ class Economy(commands.Cog):
         Args:
             ctx (qalib.interaction.QalibInteraction[EconomyMessages]): The context of the interaction
             nation (Nation): the nation that is buying the units
-            unit (UnitExchangeProtocol): The unit to buy
+            exchange (Callable[[Nation], UnitExchangeProtocol]): The unit of the nation to buy
             amount (int): The amount to buy
         """
 
-        price = unit.price_order(amount)
+        price = exchange(nation).price_order(amount)
 
         @interaction_morph
-        async def buy_confirmation(interaction: discord.Interaction) -> None:
+        @with_session(self.bot.engine)
+        async def buy_confirmation(session: Session, interaction: discord.Interaction) -> None:
             await interaction.response.defer()
+            buyer = Nation(as_user_id(ctx.user.id), session)
             await ctx.display(
-                purchase_mappings[unit.buy(amount)],
-                keywords={"nation": nation, "amount": amount, "price": price},
+                purchase_mappings[exchange(buyer).buy(amount)],
+                keywords={"nation": buyer, "amount": amount, "price": price},
             )
 
         await ctx.display(
@@ -110,11 +124,11 @@ class Economy(commands.Cog):
             callables={"confirm": buy_confirmation, "decline": delete},
         )
 
-    @staticmethod
     async def sell(
+        self,
         ctx: qalib.interaction.QalibInteraction[SellMessages],
         nation: Nation,
-        unit: UnitExchangeProtocol[K],
+        exchange: Callable[[Nation], UnitExchangeProtocol[K]],
         amount: K,
     ) -> None:
         """Sell command that sells an item
@@ -122,20 +136,22 @@ class Economy(commands.Cog):
         Args:
             ctx (qalib.interaction.QalibInteraction[EconomyMessages]): The context of the interaction
             nation (Nation): the nation that is selling the units
-            unit (UnitExchangeProtocol): The unit to sell
+            exchange (Callable[[Nation], UnitExchangeProtocol]): The unit of the nation to sell
             amount (int): The amount to sell
         """
 
-        units = unit.amount
-        cashback = unit.price_order(amount)
+        units = exchange(nation).amount
+        cashback = exchange(nation).price_order(amount)
 
         @interaction_morph
-        async def sell_confirmation(interaction: discord.Interaction) -> None:
+        @with_session(self.bot.engine)
+        async def sell_confirmation(session: Session, interaction: discord.Interaction) -> None:
             await interaction.response.defer()
+            seller = Nation(as_user_id(ctx.user.id), session)
             await ctx.display(
-                sell_mappings[unit.sell(amount)],
+                sell_mappings[exchange(seller).sell(amount)],
                 keywords={
-                    "nation": nation,
+                    "nation": seller,
                     "amount": amount,
                     "cashback": cashback,
                     "units": units,
@@ -153,18 +169,20 @@ class Economy(commands.Cog):
         action: UnitActions,
         ctx: qalib.interaction.QalibInteraction[ExchangeMessages],
         nation: Nation,
-        exchange: UnitExchangeProtocol[K],
+        exchange: Callable[[Nation], UnitExchangeProtocol[K]],
         amount: K,
     ) -> None:
-        await (self.sell, self.buy)[action == "buy"](ctx, nation, exchange, amount)
+        await self._unit_actions_mapping[action](ctx, nation, exchange, amount)
 
     @app_commands.command(
         name="infrastructure", description="handling infrastructure of the nation"
     )
-    @qalib.qalib_interaction(Jinja2(ENVIRONMENT), "templates/infrastructure.xml")
+    @cog_with_session
+    @qalib_interaction(Jinja2(ENVIRONMENT), "templates/infrastructure.xml")
     async def infrastructure(
         self,
         ctx: qalib.interaction.QalibInteraction[ExchangeMessages],
+        session: Session,
         action: UnitActions,
         amount: PositiveInteger,
     ) -> None:
@@ -175,16 +193,22 @@ class Economy(commands.Cog):
             action (UnitActions): The action to perform
             amount (int): The amount to perform the action on. Defaults to None.
         """
-        nation = self.bot.get_nation(ctx.user.id)
+        nation = self.bot.get_nation(ctx.user.id, session)
         await self.action_select(
-            action, ctx, nation, nation.interior.infrastructure, InfrastructureUnit(amount)
+            action,
+            ctx,
+            nation,
+            unit_exchange_mappings["infrastructure"],
+            InfrastructureUnit(amount),
         )
 
     @app_commands.command(name="technology", description="handling technology of the nation")
-    @qalib.qalib_interaction(Jinja2(ENVIRONMENT), "templates/technology.xml")
+    @cog_with_session
+    @qalib_interaction(Jinja2(ENVIRONMENT), "templates/technology.xml")
     async def technology(
         self,
         ctx: qalib.interaction.QalibInteraction[ExchangeMessages],
+        session: Session,
         action: UnitActions,
         amount: PositiveInteger,
     ) -> None:
@@ -195,16 +219,18 @@ class Economy(commands.Cog):
             action (UnitActions): The action to perform
             amount (int): The amount to perform the action on. Defaults to None.
         """
-        nation = self.bot.get_nation(ctx.user.id)
+        nation = self.bot.get_nation(ctx.user.id, session)
         await self.action_select(
-            action, ctx, nation, nation.interior.technology, TechnologyUnit(amount)
+            action, ctx, nation, unit_exchange_mappings["technology"], TechnologyUnit(amount)
         )
 
     @app_commands.command(name="land", description="handling land of the nation")
-    @qalib.qalib_interaction(Jinja2(ENVIRONMENT), "templates/land.xml")
+    @cog_with_session
+    @qalib_interaction(Jinja2(ENVIRONMENT), "templates/land.xml")
     async def land(
         self,
         ctx: qalib.interaction.QalibInteraction[ExchangeMessages],
+        session: Session,
         action: UnitActions,
         amount: PositiveInteger,
     ) -> None:
@@ -215,8 +241,10 @@ class Economy(commands.Cog):
             action (UnitActions): The action to perform
             amount (int): The amount to perform the action on. Defaults to None.
         """
-        nation = self.bot.get_nation(ctx.user.id)
-        await self.action_select(action, ctx, nation, nation.interior.land, LandUnit(amount))
+        nation = self.bot.get_nation(ctx.user.id, session)
+        await self.action_select(
+            action, ctx, nation, unit_exchange_mappings["land"], LandUnit(amount)
+        )
 
     improvement_group = app_commands.Group(name="improvement", description="This is a group")
 
@@ -227,7 +255,7 @@ class Economy(commands.Cog):
             for name, improvement in Improvements.items()
         ]
     )
-    @qalib.qalib_interaction(Jinja2(ENVIRONMENT), "templates/improvement.xml")
+    @qalib_interaction(Jinja2(ENVIRONMENT), "templates/improvement.xml")
     async def improvement(
         self,
         ctx: qalib.interaction.QalibInteraction[ImprovementMessages],
@@ -248,17 +276,19 @@ class Economy(commands.Cog):
         )
 
     @improvement_group.command(name="owned", description="Displaying the owned improvements")
-    @qalib.qalib_interaction(Jinja2(ENVIRONMENT), "templates/improvement.xml")
+    @cog_with_session
+    @qalib_interaction(Jinja2(ENVIRONMENT), "templates/improvement.xml")
     async def improvement_owned(
         self,
         ctx: qalib.interaction.QalibInteraction[ImprovementMessages],
+        session: Session,
     ) -> None:
         """Improvement command that shows the improvements of the nation
 
         Args:
             ctx (qalib.interaction.QalibInteraction[ImprovementMessages]): The context of the interaction
         """
-        nation = self.bot.get_nation(ctx.user.id)
+        nation = self.bot.get_nation(ctx.user.id, session)
         await ctx.display(
             "owned",
             keywords={
@@ -274,10 +304,12 @@ class Economy(commands.Cog):
             for name, improvement in Improvements.items()
         ]
     )
-    @qalib.qalib_interaction(Jinja2(ENVIRONMENT), "templates/improvement.xml")
+    @cog_with_session
+    @qalib_interaction(Jinja2(ENVIRONMENT), "templates/improvement.xml")
     async def improvement_buy(
         self,
         ctx: qalib.interaction.QalibInteraction[ImprovementMessages],
+        session: Session,
         improvement: Choice[str],
         amount: PositiveInteger,
     ) -> None:
@@ -288,19 +320,21 @@ class Economy(commands.Cog):
             improvement (Choice[str]): The improvement to buy
             amount (PositiveInteger): The amount to buy
         """
-        nation = self.bot.get_nation(ctx.user.id)
+        nation = self.bot.get_nation(ctx.user.id, session)
         improvement_class = Improvements[improvement.value]
 
         @interaction_morph
-        async def confirm(interaction: discord.Interaction) -> None:
+        @with_session(self.bot.engine)
+        async def confirm(session: Session, interaction: discord.Interaction) -> None:
             await interaction.response.defer()
-            result = nation.public_works.buy(improvement_class, amount)
+            buyer = self.bot.get_nation(ctx.user.id, session)
+            result = buyer.public_works.buy(improvement_class, amount)
             await ctx.display(
                 purchase_mappings[result],
                 keywords={
                     "improvement": improvement_class,
                     "amount": amount,
-                    "nation": nation,
+                    "nation": buyer,
                 },
             )
 
@@ -321,10 +355,12 @@ class Economy(commands.Cog):
             for name, improvement in Improvements.items()
         ]
     )
-    @qalib.qalib_interaction(Jinja2(ENVIRONMENT), "templates/improvement.xml")
+    @cog_with_session
+    @qalib_interaction(Jinja2(ENVIRONMENT), "templates/improvement.xml")
     async def improvement_sell(
         self,
         ctx: qalib.interaction.QalibInteraction[ImprovementMessages],
+        session: Session,
         improvement: Choice[str],
         amount: PositiveInteger,
     ) -> None:
@@ -335,25 +371,33 @@ class Economy(commands.Cog):
             improvement (Choice[str]): The improvement to sell
             amount (PositiveInteger): The amount to sell
         """
-        nation = self.bot.get_nation(ctx.user.id)
+        nation = self.bot.get_nation(ctx.user.id, session)
         improvement_class = Improvements[improvement.value]
 
         @interaction_morph
-        async def confirm(interaction: discord.Interaction) -> None:
+        @with_session(self.bot.engine)
+        async def confirm(session: Session, interaction: discord.Interaction) -> None:
             await interaction.response.defer()
             try:
-                result = nation.public_works.sell(improvement_class, amount)
+                seller = self.bot.get_nation(ctx.user.id, session)
+                result = seller.public_works.sell(improvement_class, amount)
                 await ctx.display(
                     sell_mappings[result],
                     keywords={
                         "improvement": improvement_class,
                         "amount": amount,
-                        "nation": nation,
+                        "nation": seller,
                     },
                 )
-            except Exception as e:
-                print(e)
-                traceback.print_tb(e.__traceback__)
+            except Exception:
+                # the sale is only committed once it rendered, anything it staged is discarded
+                session.rollback()
+                logging.exception(
+                    "[IMPROVEMENT][SELL][ERROR] UserId=%s, Improvement=%s, Amount=%s",
+                    ctx.user.id,
+                    improvement_class.name,
+                    amount,
+                )
 
         await ctx.display(
             "cashback",
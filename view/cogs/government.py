@@ -7,10 +7,17 @@ from discord import app_commands
 from discord.app_commands import Choice
 from discord.ext import commands
 from qalib.template_engines.jinja2 import Jinja2
+from sqlalchemy.orm import Session
 
 from host.nation.types.boosts import BoostsLookup
 from host.nation.government import Governments
-from lon import LeagueOfNations
+from lon import (
+    LeagueOfNations,
+    cog_with_session,
+    interaction_morph,
+    qalib_interaction,
+    with_session,
+)
 from view.cogs.custom_jinja2 import ENVIRONMENT
 
 
@@ -20,6 +27,7 @@ PositiveInteger = discord.app_commands.Range[int, 1]
 GovernmentMessages = Literal["list", "display", "set", "error", "new_government"]
 
 
+@interaction_morph
 async def delete(interaction: discord.Interaction) -> None:
     await interaction.response.defer()
     await interaction.delete_original_response()
@@ -34,7 +42,7 @@ class Government(commands.Cog):
     )
 
     @government_group.command(name="list", description="Describing the possible governments")
-    @qalib.qalib_interaction(Jinja2(ENVIRONMENT), "templates/government.xml")
+    @qalib_interaction(Jinja2(ENVIRONMENT), "templates/government.xml")
     async def government_list(
         self,
         ctx: qalib.QalibInteraction[GovernmentMessages],
@@ -53,7 +61,7 @@ class Government(commands.Cog):
             for name, government in Governments.items()
         ]
     )
-    @qalib.qalib_interaction(Jinja2(ENVIRONMENT), "templates/government.xml")
+    @qalib_interaction(Jinja2(ENVIRONMENT), "templates/government.xml")
     async def government_display(
         self,
         ctx: qalib.QalibInteraction[GovernmentMessages],
@@ -68,20 +76,25 @@ class Government(commands.Cog):
             for name, government in Governments.items()
         ]
     )
-    @qalib.qalib_interaction(Jinja2(ENVIRONMENT), "templates/government.xml")
+    @cog_with_session
+    @qalib_interaction(Jinja2(ENVIRONMENT), "templates/government.xml")
     async def government_set(
         self,
         ctx: qalib.QalibInteraction[GovernmentMessages],
+        session: Session,
         government: Choice[str],
     ) -> None:
-        nation = self.bot.get_nation(ctx.user.id)
+        nation = self.bot.get_nation(ctx.user.id, session)
         government_type = cast(GovernmentTypes, government.value)
         if not nation.exists:
             await ctx.display("error", keywords={"error": "You don't have a nation"})
             return
 
-        async def set_confirmation(interaction: discord.Interaction) -> None:
+        @interaction_morph
+        @with_session(self.bot.engine)
+        async def set_confirmation(session: Session, interaction: discord.Interaction) -> None:
             await interaction.response.defer()
+            nation = self.bot.get_nation(ctx.user.id, session)
             difference = BoostsLookup.combine(
                 Governments[government_type].boosts, nation.government.type.boosts.inverse()
             )
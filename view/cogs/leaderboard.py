@@ -0,0 +1,63 @@
+from functools import partial
+from typing import Any, Dict, Literal, Optional, Tuple
+
+import qalib
+import qalib.interaction
+from discord import app_commands
+from discord.ext import commands
+from qalib.template_engines.jinja2 import Jinja2
+from qalib.translators.view import ViewEvents
+from sqlalchemy.orm import Session
+
+from host.base_types import UserId
+from host.nation import Nation, statistics
+from host.nation.statistics import LeaderboardKey, Metric, Standing
+from host.pagination import Page
+from lon import LeagueOfNations, qalib_interaction
+from view.check import ensure_user
+from view.cogs.custom_jinja2 import ENVIRONMENT
+from view.paging import KeysetPages
+
+LeaderboardMessages = Literal["leaderboard"]
+
+
+class Leaderboard(commands.Cog):
+    def __init__(self, bot: LeagueOfNations):
+        self.bot = bot
+
+    @app_commands.command(name="leaderboard", description="The nations that lead by a statistic")
+    @qalib_interaction(Jinja2(ENVIRONMENT), "templates/leaderboard.xml")
+    async def leaderboard(
+        self,
+        ctx: qalib.interaction.QalibInteraction[LeaderboardMessages],
+        metric: Metric,
+    ) -> None:
+        def fetch(
+            after: Optional[LeaderboardKey], session: Session
+        ) -> Tuple[Page[Standing, LeaderboardKey], Optional[int]]:
+            nation = Nation(UserId(ctx.user.id), session)
+            rank = nation.statistics.rank(metric) if nation.exists else None
+            return statistics.leaderboard(session, metric, after), rank
+
+        async def show(
+            after: Optional[LeaderboardKey], callables: Dict[str, Any]
+        ) -> Page[Standing, LeaderboardKey]:
+            page, rank = await self.bot.run_with_session(partial(fetch, after))
+            await ctx.display(
+                "leaderboard",
+                keywords={
+                    "metric": metric,
+                    "page": page,
+                    "rank": rank,
+                    "first": after is None,
+                },
+                callables=callables,
+                events={ViewEvents.ON_CHECK: ensure_user(ctx.user.id)},
+            )
+            return page
+
+        await KeysetPages(show).show()
+
+
+async def setup(bot: LeagueOfNations) -> None:
+    await bot.add_cog(Leaderboard(bot))
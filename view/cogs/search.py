@@ -1,4 +1,5 @@
-from typing import Literal
+from functools import partial
+from typing import Any, Dict, List, Literal, Optional
 
 import discord
 import qalib
@@ -6,10 +7,20 @@ import qalib.interaction
 from discord import app_commands
 from discord.ext import commands
 from discord.ext.commands import BadArgument
+from qalib.translators.view import ViewEvents
+from sqlalchemy.orm import Session
+
 from host.nation import Nation
-from lon import LeagueOfNations
+from host.nation.models import MetadataModel
+from host.nation.names import NATION_NAMES
+from host.nation.percentiles import PERCENTILES
+from host.nation.search import SearchKey
+from host.pagination import PAGE_SIZE, Page
+from lon import LeagueOfNations, cog_with_session, qalib_interaction
 from qalib.template_engines.jinja2 import Jinja2
+from view.check import ensure_user
 from view.cogs.custom_jinja2 import ENVIRONMENT
+from view.paging import KeysetPages
 
 SearchMessages = Literal[
     "invalid_name", "search_results", "unrecognized", "statistics", "unrecognized_identifier"
@@ -30,7 +41,7 @@ class Search(commands.Cog):
             raise BadArgument("Name must be ASCII")
 
     @search_group.command(name="nation", description="Search for an improvement")
-    @qalib.qalib_interaction(
+    @qalib_interaction(
         Jinja2(ENVIRONMENT),
         "templates/search.xml",
     )
@@ -41,32 +52,64 @@ class Search(commands.Cog):
             await ctx.rendered_send("invalid_name", keywords={"name": name})
             return
 
-        nations = Nation.search_for_nations(name, self.bot.session, with_like=True)
-        await ctx.rendered_send("search_results", keywords={"name": name, "nations": nations})
+        async def show(
+            after: Optional[SearchKey], callables: Dict[str, Any]
+        ) -> Page[MetadataModel, SearchKey]:
+            page = await self.bot.run_with_session(
+                partial(Nation.search_page, name, after=after, limit=PAGE_SIZE)
+            )
+            await ctx.display(
+                "search_results",
+                keywords={"name": name, "page": page, "first": after is None},
+                callables=callables,
+                events={ViewEvents.ON_CHECK: ensure_user(ctx.user.id)},
+            )
+            return page
+
+        await KeysetPages(show).show()
+
+    @search.autocomplete("name")
+    async def nation_name_autocomplete(
+        self, _: discord.Interaction, current: str
+    ) -> List[app_commands.Choice[str]]:
+        return [
+            app_commands.Choice(name=name, value=name) for name in NATION_NAMES.complete(current)
+        ]
 
     @search_group.command(name="user", description="Search for a user")
-    @qalib.qalib_interaction(
+    @cog_with_session
+    @qalib_interaction(
         Jinja2(ENVIRONMENT),
         "templates/search.xml",
     )
     async def search_user(
-        self, ctx: qalib.interaction.QalibInteraction[SearchMessages], user: discord.User
+        self,
+        ctx: qalib.interaction.QalibInteraction[SearchMessages],
+        session: Session,
+        user: discord.User,
     ) -> None:
-        nation = self.bot.get_nation(user.id)
+        nation = self.bot.get_nation(user.id, session)
         if not nation.exists:
             await ctx.rendered_send("unrecognized", keywords={"user": user})
             return
-        await ctx.rendered_send("statistics", keywords={"nation": nation, "user": user.name})
+        await ctx.rendered_send(
+            "statistics",
+            keywords={"nation": nation, "user": user.name, "percentiles": PERCENTILES.of(nation)},
+        )
 
     @search_group.command(name="id", description="Search for a user")
-    @qalib.qalib_interaction(
+    @cog_with_session
+    @qalib_interaction(
         Jinja2(ENVIRONMENT),
         "templates/search.xml",
     )
     async def search_id(
-        self, ctx: qalib.interaction.QalibInteraction[SearchMessages], identifier: int
+        self,
+        ctx: qalib.interaction.QalibInteraction[SearchMessages],
+        session: Session,
+        identifier: int,
     ) -> None:
-        nation = self.bot.get_nation(identifier)
+        nation = self.bot.get_nation(identifier, session)
         if not nation.exists:
             await ctx.rendered_send("unrecognized_identifier", keywords={"identifier": identifier})
             return
@@ -75,7 +118,10 @@ class Search(commands.Cog):
             await ctx.rendered_send("unknown_player", keywords={"nation": nation})
             return
 
-        await ctx.rendered_send("statistics", keywords={"nation": nation, "user": user.name})
+        await ctx.rendered_send(
+            "statistics",
+            keywords={"nation": nation, "user": user.name, "percentiles": PERCENTILES.of(nation)},
+        )
 
 
 async def setup(bot: LeagueOfNations) -> None:
@@ -1,4 +1,5 @@
 import logging
+from functools import partial
 from typing import Dict, Literal
 
 from dataclasses import dataclass
@@ -12,9 +13,8 @@ from qalib.translators.view import ViewEvents
 from host.gameplay_settings import GameplaySettings
 from host.base_types import as_user_id
 from host.nation import Nation, StartResponses
-from lon import Event, LeagueOfNations, event_with_session
+from lon import EventWithContext, LeagueOfNations, qalib_interaction
 from qalib.template_engines.jinja2 import Jinja2
-from sqlalchemy.orm import Session
 from view.cogs.custom_jinja2 import ENVIRONMENT
 from view.check import ensure_user
 
@@ -40,14 +40,13 @@ StartMapping: Dict[StartResponses, StartMessages] = {
 
 
 @dataclass(frozen=True)
-class StartEvent(Event[StartMessages]):
+class StartEvent(EventWithContext[StartMessages]):
     nation_name: str
 
-    @event_with_session
-    async def confirm(
-        self, session: Session, _: discord.ui.Button, interaction: discord.Interaction
-    ) -> None:
-        response = Nation.start(as_user_id(interaction.user.id), self.nation_name, session)
+    async def confirm(self, _: discord.ui.Button, interaction: discord.Interaction) -> None:
+        response = await self.bot.run_with_session(
+            partial(Nation.start, as_user_id(interaction.user.id), self.nation_name)
+        )
         logging.debug(
             "[START] UserId=%s, NationName=%s Response=%s",
             interaction.user.id,
@@ -69,7 +68,7 @@ class Start(commands.Cog):
 
     @app_commands.command(name="start", description="Found Your Nation")
     @app_commands.describe(nation_name="The name of your nation")
-    @qalib.qalib_interaction(Jinja2(ENVIRONMENT), "templates/start.xml")
+    @qalib_interaction(Jinja2(ENVIRONMENT), "templates/start.xml")
     async def start(
         self,
         ctx: qalib.interaction.QalibInteraction[StartMessages],
@@ -86,7 +85,7 @@ class Start(commands.Cog):
             nation_name (str): The name of the nation
         """
 
-        event = StartEvent(ctx, self.bot, nation_name)
+        event = StartEvent(self.bot, ctx, nation_name)
 
         await ctx.display(
             "start",
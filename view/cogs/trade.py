@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from functools import partial
 import logging
-from typing import Any, Dict, Literal, ParamSpec, TypeVar
+from typing import Any, Dict, Literal, Optional, ParamSpec, TypeVar
 from discord import app_commands
 import discord
 from qalib.translators.view import ViewEvents
@@ -10,6 +10,7 @@ from host import base_types
 from host.base_types import UserId, as_user_id
 from host.nation.types.resources import BonusResources, ResourceName, Resources
 from host.notifier import Notification
+from host.pagination import Page
 import qalib
 import qalib.interaction
 from qalib.template_engines.jinja2 import Jinja2
@@ -17,6 +18,7 @@ from qalib.template_engines.jinja2 import Jinja2
 from host.nation import Nation
 from host.nation.trade import (
     TradeAcceptResponses,
+    TradeRequest,
     TradeCancelResponses,
     TradeDeclineResponses,
     TradeSelectResponses,
@@ -28,10 +30,14 @@ from lon import (
     LonCog,
     event_with_session,
     cog_with_session,
+    qalib_interaction,
+    release_session,
     user_registered,
+    with_session,
 )
 from view.check import ensure_user
 from view.lookup import cog_find_nation
+from view.paging import KeysetPages
 from view.cogs.custom_jinja2 import ENVIRONMENT
 
 
@@ -187,12 +193,14 @@ class TradeRequestView(EventWithContext[TradeRequestMessages]):
             response,
         )
 
+        release_session()
         await interaction.response.defer()
         if response is TradeAcceptResponses.SUCCESS:
             notification = Notification(
                 sponsor.identifier,
                 f"Trade Offer to {recipient.metadata.emoji} {recipient.name} has been accepted",
             )
+            release_session()
             await self.bot.notification_renderer.render(notification)
 
         await self.ctx.display(
@@ -219,6 +227,7 @@ class TradeRequestView(EventWithContext[TradeRequestMessages]):
                 sponsor.identifier,
                 f"Trade Offer to {recipient.metadata.emoji} {recipient.name} has been declined",
             )
+            release_session()
             await self.bot.notification_renderer.render(notification)
         await self.ctx.display(
             TradeDeclineMapping[response],
@@ -280,12 +289,12 @@ class TradeView(EventWithContext[TradeViewMessages | TradeCancelMessages]):
             response,
         )
         if response is TradeCancelResponses.SUCCESS:
-            await self.bot.notification_renderer.render(
-                Notification(
-                    partner.identifier,
-                    f"Trade Offer Cancelled with {nation.metadata.emoji} {nation.name}",
-                )
+            notification = Notification(
+                partner.identifier,
+                f"Trade Offer Cancelled with {nation.metadata.emoji} {nation.name}",
             )
+            release_session()
+            await self.bot.notification_renderer.render(notification)
         await self.ctx.display(
             TradeCancelMapping[response],
             keywords={"nation": nation, "partner": partner},
@@ -328,7 +337,7 @@ class Trade(LonCog):
     @trade_group.command(name="select", description="Select resources to trade")
     @user_registered
     @cog_with_session
-    @qalib.qalib_interaction(Jinja2(ENVIRONMENT), "templates/trade/select.xml")
+    @qalib_interaction(Jinja2(ENVIRONMENT), "templates/trade/select.xml")
     async def select(
         self, ctx: qalib.interaction.QalibInteraction[TradeSelectMessages], session: Session
     ) -> None:
@@ -346,7 +355,7 @@ class Trade(LonCog):
     @user_registered
     @cog_find_nation("recipient")
     @cog_with_session
-    @qalib.qalib_interaction(Jinja2(ENVIRONMENT), "templates/trade/offer.xml")
+    @qalib_interaction(Jinja2(ENVIRONMENT), "templates/trade/offer.xml")
     async def offer(
         self,
         ctx: qalib.interaction.QalibInteraction[TradeOfferMessages],
@@ -372,23 +381,33 @@ class Trade(LonCog):
 
     @trade_group.command(name="requests", description="View trade offers")
     @user_registered
-    @cog_with_session
-    @qalib.qalib_interaction(Jinja2(ENVIRONMENT), "templates/trade/request.xml")
-    async def requests(
-        self, ctx: qalib.interaction.QalibInteraction[TradeRequestMessages], session: Session
-    ) -> None:
-        nation = Nation(as_user_id(ctx.user.id), session)
-        await ctx.display(
-            "trade_requests",
-            keywords={"nation": nation, "Resources": Resources},
-            callables={"trade_identifier": TradeRequestView(self.bot, ctx)},
-            events={ViewEvents.ON_CHECK: ensure_user(ctx.user.id)},
-        )
+    @qalib_interaction(Jinja2(ENVIRONMENT), "templates/trade/request.xml")
+    async def requests(self, ctx: qalib.interaction.QalibInteraction[TradeRequestMessages]) -> None:
+        @with_session(self.bot.engine)
+        async def show(
+            session: Session, after: Optional[UserId], callables: Dict[str, Any]
+        ) -> Page[TradeRequest, UserId]:
+            nation = Nation(as_user_id(ctx.user.id), session)
+            page = nation.trade.offers_received_page(after)
+            await ctx.display(
+                "trade_requests",
+                keywords={
+                    "nation": nation,
+                    "Resources": Resources,
+                    "page": page,
+                    "first": after is None,
+                },
+                callables={"trade_identifier": TradeRequestView(self.bot, ctx), **callables},
+                events={ViewEvents.ON_CHECK: ensure_user(ctx.user.id)},
+            )
+            return page
+
+        await KeysetPages(show).show()
 
     @trade_group.command(name="view", description="Cancel a trade offer")
     @user_registered
     @cog_with_session
-    @qalib.qalib_interaction(Jinja2(ENVIRONMENT), "templates/trade/view.xml")
+    @qalib_interaction(Jinja2(ENVIRONMENT), "templates/trade/view.xml")
     async def view(
         self,
         ctx: qalib.interaction.QalibInteraction[Literal[TradeViewMessages, TradeCancelMessages]],
@@ -17,11 +17,14 @@ from sqlalchemy.orm import Session
 
 from host.base_types import UserId
 from host.nation import Nation
+from host.nation.names import NATION_NAMES
 from lon import (
     EventWithContext,
     LeagueOfNations,
     event_with_session,
     qalib_event_interaction,
+    qalib_interaction,
+    with_session,
 )
 from view.check import ensure_user
 from view.cogs.custom_jinja2 import ENVIRONMENT
@@ -173,7 +176,7 @@ class NationNameLookup(EventWithContext[lookup_messages]):
         nation_name = cast(discord.ui.TextInput, modal.children[0]).value
         assert nation_name is not None
         await interaction.response.defer()
-        await _get_user_from_nation_lookup(self.ctx, nation_name, self.selector, session)
+        await _get_user_from_nation_lookup(self.ctx, nation_name, self.selector, session, self.bot)
 
     @qalib_event_interaction(Jinja2(ENVIRONMENT), "templates/lookup.xml")
     async def __call__(
@@ -201,7 +204,7 @@ class UserSelect(EventWithContext[lookup_messages]):
         await _preview_and_return_nation(self.selector)(Nation(UserId(user.id), session), self.ctx)
 
 
-@qalib.qalib_interaction(Jinja2(ENVIRONMENT), "templates/lookup.xml")
+@qalib_interaction(Jinja2(ENVIRONMENT), "templates/lookup.xml")
 async def _get_user_target(
     ctx: QalibInteraction[lookup_messages],
     func: Callable[[UserId], Coroutine[None, None, None]],
@@ -224,24 +227,34 @@ async def _get_user_from_nation_lookup(
     nation_name: str,
     selector: UserIdClosure,
     session: Session,
+    bot: LeagueOfNations,
 ):
     nations = Nation.search_for_nations(nation_name, session)
 
     if not nations:
         await interaction.display(
-            "lookup_nation_name_not_found", keywords={"require_lookup": True}, view=None
+            "lookup_nation_name_not_found",
+            keywords={"require_lookup": True, "suggestions": NATION_NAMES.suggest(nation_name)},
+            view=None,
         )
         return
 
-    async def on_select(item: discord.ui.Select, new_interaction: discord.Interaction):
+    @with_session(bot.engine)
+    async def on_select(
+        session: Session, item: discord.ui.Select, new_interaction: discord.Interaction
+    ):
         nation = Nation(UserId(int(item.values[0])), session)
         await new_interaction.response.defer()
 
-        async def on_reject(_: discord.ui.Button, i: discord.Interaction):
+        @with_session(bot.engine)
+        async def on_reject(session: Session, _: discord.ui.Button, i: discord.Interaction):
             await i.response.defer()
             await interaction.display(
                 "nation_lookup",
-                keywords={"nations": nations, "require_lookup": True},
+                keywords={
+                    "nations": Nation.search_for_nations(nation_name, session),
+                    "require_lookup": True,
+                },
                 callables={"on_select": on_select},
                 events={ViewEvents.ON_CHECK: ensure_user(interaction.user.id)},
             )
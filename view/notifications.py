@@ -16,7 +16,11 @@ if TYPE_CHECKING:
 class NotificationRenderer:
     def __init__(self, bot: LeagueOfNations):
         self.bot = bot
-        self.notifier = Notifier(self.bot.engine)
+        self.notifier = Notifier(
+            self.bot.engine,
+            partition=self.bot.notifier_partition,
+            partitions=self.bot.notifier_partitions,
+        )
         self.notifier.hook(self.display_notification)
         self._renderer = qalib.Renderer(Jinja2(), "templates/notifications.xml")
 
@@ -0,0 +1,47 @@
+from typing import Any, Callable, Coroutine, Dict, Generic, List, Optional, TypeVar
+
+import discord
+
+from host.pagination import Page
+
+__all__ = ("KeysetPages",)
+
+K = TypeVar("K")
+
+Callback = Callable[[discord.ui.Item, discord.Interaction], Coroutine[None, None, None]]
+ShowPage = Callable[[Optional[K], Dict[str, Callback]], Coroutine[None, None, Page[Any, K]]]
+
+
+class KeysetPages(Generic[K]):
+    """Pages through a keyset paginated listing with the buttons of the page_buttons macro. Only
+    the keys of the pages shown so far are kept, to go back to them, and every page is fetched
+    again when it is shown, so a listing is never loaded whole.
+
+    The show function fetches the page after the key, None being the first page, and displays it
+    with the callables of the buttons.
+    """
+
+    def __init__(self, show: ShowPage[K]):
+        self._show = show
+        self._keys: List[Optional[K]] = [None]
+        self._after: Optional[K] = None
+        self.callables: Dict[str, Callback] = {
+            "previous_page": self._previous,
+            "next_page": self._next,
+        }
+
+    async def show(self) -> None:
+        page = await self._show(self._keys[-1], self.callables)
+        self._after = page.after
+
+    async def _previous(self, _: discord.ui.Item, interaction: discord.Interaction) -> None:
+        await interaction.response.defer()
+        if len(self._keys) > 1:
+            self._keys.pop()
+        await self.show()
+
+    async def _next(self, _: discord.ui.Item, interaction: discord.Interaction) -> None:
+        await interaction.response.defer()
+        if self._after is not None:
+            self._keys.append(self._after)
+        await self.show()